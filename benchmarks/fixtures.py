@@ -0,0 +1,125 @@
+"""벤치마크용 데이터 소스 녹화/재생
+
+pykrx, 네이버 52주 신고가 API, OpenDartReader 호출을 (함수, 인자) 단위로
+gzip 픽스처 파일에 녹화하고, 재생 시에는 네트워크 없이 녹화된 응답을 돌려준다.
+"""
+import bisect
+import gzip
+import pickle
+from datetime import datetime
+from pathlib import Path
+
+PYKRX_FUNCTIONS = [
+    'get_market_ohlcv',
+    'get_market_ohlcv_by_date',
+    'get_index_ohlcv_by_date',
+    'get_market_ticker_list',
+    'get_market_ticker_name',
+    'get_market_net_purchases_of_equities',
+    'get_market_trading_value_by_date',
+    'get_market_fundamental_by_ticker',
+]
+
+
+class FixtureMissing(KeyError):
+    """녹화되지 않은 호출"""
+    pass
+
+
+class FixtureStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.responses = {}
+        self.meta = {}
+
+    @staticmethod
+    def key(name, args, kwargs):
+        return repr((name, tuple(args), tuple(sorted(kwargs.items()))))
+
+    def load(self):
+        with gzip.open(self.path, 'rb') as f:
+            stored = pickle.load(f)
+        self.responses, self.meta = stored['responses'], stored['meta']
+        return self
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, 'wb') as f:
+            pickle.dump({'responses': self.responses, 'meta': self.meta}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _wrap(self, name, func, record):
+        """record 이면 func 결과를 저장하며 호출하고, 아니면 저장된 응답을 반환"""
+        def recorded(*args, **kwargs):
+            key = self.key(name, args, kwargs)
+            if record:
+                self.responses[key] = func(*args, **kwargs)
+            elif key not in self.responses:
+                raise FixtureMissing(f"녹화되지 않은 호출: {key}")
+            return self.responses[key]
+        return recorded
+
+    def install(self, record=False, source=None):
+        """데이터 소스 호출 지점을 녹화/재생 함수로 교체
+
+        source 가 주어지면 실제 API 대신 source 의 같은 이름 메서드를 녹화한다
+        (예: SyntheticSource).
+        """
+        from pykrx import stock
+        import reports.high52_week_report as high52_module
+        import reports.operation_profit_report as opm_module
+
+        for name in PYKRX_FUNCTIONS:
+            func = getattr(source, name) if source else getattr(stock, name)
+            setattr(stock, name, self._wrap(f"pykrx.{name}", func, record))
+
+        live_fetch = high52_module.High52WeekReport.fetch_high_52w
+        def fetch_source(page=1, page_size=100):
+            if source:
+                return source.fetch_high_52w(page=page, page_size=page_size)
+            return live_fetch(high52_module.High52WeekReport(), page=page, page_size=page_size)
+        fetch = self._wrap('naver.high52week', fetch_source, record)
+        high52_module.High52WeekReport.fetch_high_52w = lambda self, page=1, page_size=100: fetch(page=page, page_size=page_size)
+
+        live_dart = opm_module.OpenDartReader
+        store = self
+        class FixtureDart:
+            def __init__(self, api_key):
+                self._dart = source if source else (live_dart(api_key) if record else None)
+                self.finstate = store._wrap('dart.finstate', self._finstate, record)
+
+            def _finstate(self, corp, bsns_year, reprt_code='11011'):
+                return self._dart.finstate(corp, bsns_year, reprt_code=reprt_code)
+        opm_module.OpenDartReader = FixtureDart
+
+
+class SessionCalendar:
+    """녹화 시점의 거래일 목록으로 CalendarUtil 조회를 대신하는 달력"""
+    def __init__(self, sessions):
+        self.sessions = sorted(sessions)
+
+    def previous_session(self, date=None):
+        return self.sessions_before(date, 0)
+
+    def sessions_before(self, date=None, n=0):
+        position = bisect.bisect_right(self.sessions, date) - 1 - n
+        if position < 0:
+            raise ValueError(f"{date} 기준 {n}거래일 전 날짜를 찾을 수 없습니다.")
+        return self.sessions[position]
+
+    def window(self, date=None, sessions=1):
+        return self.sessions_before(date, sessions - 1), self.previous_session(date)
+
+
+def frozen_datetime(date):
+    """now()/today()가 date(YYYYMMDD) 장 마감 시각을 반환하는 datetime 대체 클래스"""
+    frozen = datetime.strptime(date, '%Y%m%d').replace(hour=16)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen
+
+        @classmethod
+        def today(cls):
+            return frozen
+    return FrozenDatetime
@@ -0,0 +1,349 @@
+"""리포트별 fetch/compute/render/publish 단계 오프라인 벤치마크
+
+녹화된 픽스처로 데이터 소스를 재생하고 텔레그램/게시판 발행은 로컬 가짜
+응답으로 대신해, 네트워크 없이 리포트 단계별 소요 시간을 측정한 뒤
+baselines.json 의 기준값과 비교한다. 적응형 요청 한도는 건너뛰며, 재생 중 조회가
+한 건이라도 실패하면 측정한 작업량이 달라진 것이므로 벤치마크를 실패로 끝낸다.
+
+    # 픽스처 녹화 (live: 실제 KRX/DART/네이버, synthetic: 합성 데이터)
+    python benchmarks/report_benchmark.py --record live
+    python benchmarks/report_benchmark.py --record synthetic
+
+    # 재생 측정 및 기준값 비교 / 갱신
+    python benchmarks/report_benchmark.py --repeat 3
+    python benchmarks/report_benchmark.py --update-baseline
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, ROOT_DIR)
+# 벤치마크 중에는 이미지 파일을 보관하지 않음
+os.environ['ARCHIVE_IMAGES'] = '0'
+
+from fixtures import FixtureStore, SessionCalendar, frozen_datetime
+from synthetic import SyntheticSource
+
+REPORTS = ['volume', 'investor', 'rs', 'high52', 'opm']
+DEFAULT_FIXTURES = os.path.join(BENCHMARK_DIR, 'fixtures', 'reports.pkl.gz')
+DEFAULT_BASELINES = os.path.join(BENCHMARK_DIR, 'baselines.json')
+SYNTHETIC_DATE = '20250110'
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    text = '{"success": true}'
+
+    def json(self):
+        return {'success': True, 'data': {'image_urls': ['benchmark']}}
+
+
+class FakePublisher:
+    """텔레그램/게시판 전송을 네트워크 없이 흉내 (이미지 해시/분할/압축은 실제로 수행)"""
+    def __init__(self):
+        from utils.telegram_util import TelegramUtil
+        from utils.api_util import ApiUtil
+
+        self.telegram_class = TelegramUtil
+        self.telegram = TelegramUtil()
+        self.telegram._request = self._telegram_request
+        self.api = ApiUtil()
+        self.api._post = lambda url, **kwargs: FakeResponse()
+        self._uploads = 0
+
+    def _telegram_request(self, method, chat_id, data, files=None):
+        count = len(json.loads(data['media'])) if method == 'sendMediaGroup' else 1
+        messages = []
+        for _ in range(count):
+            self._uploads += 1
+            messages.append({'photo': [{'file_id': f"benchmark{self._uploads}"}]})
+        return {'ok': True, 'result': messages if method == 'sendMediaGroup' else messages[0]}
+
+    def publish(self, artifacts, caption):
+        if not artifacts:
+            return
+        self.telegram_class.clear_file_ids()
+        self.telegram.send_multiple_photo(artifacts, caption, chat_ids=['benchmark'])
+        self.api.create_post(caption, caption, 'benchmark', 'benchmark', artifacts)
+
+
+def stub_renderer():
+    """wkhtmltoimage 없이 HTML 크기에 비례한 이미지를 만들어 렌더링 단계를 대신"""
+    import imgkit
+    from PIL import Image, ImageDraw
+
+    def from_string(html, output_path, options=None, config=None):
+        options = options or {}
+        width = int(options.get('width', 800))
+        height = max(200, min(4000, len(html) // 8))
+        seed = zlib.crc32(html.encode())
+        img = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(img)
+        for row in range(0, height, 24):
+            shade = (seed + row) % 200
+            draw.rectangle([10, row + 4, width - 10, row + 18], fill=(shade, 255 - shade, 180))
+            draw.text((20, row + 5), html[row % max(1, len(html) - 40):][:60], fill='black')
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG' if options.get('format') == 'jpg' else 'PNG')
+        return buffer.getvalue()
+
+    imgkit.from_string = from_string
+    imgkit.config = lambda **kwargs: None
+    os.environ.setdefault('WKHTMLTOIMAGE_PATH', 'stub')
+
+
+def freeze_time(date):
+    """리포트 모듈의 현재 시각을 픽스처 날짜로 고정하고 재시도/호출 간격 대기를 제거"""
+    import reports.volume_report
+    import reports.investor_report
+    import reports.rs_report
+    import reports.high52_week_report
+    import reports.operation_profit_report
+
+    frozen = frozen_datetime(date)
+    for module in [reports.volume_report, reports.investor_report, reports.rs_report,
+                   reports.high52_week_report, reports.operation_profit_report]:
+        module.datetime = frozen
+    time.sleep = lambda seconds: None
+
+
+def bypass_rate_limits():
+    """적응형 요청 한도(RateLimitUtil)를 건너뛰어 재생 응답을 대기 없이 바로 받음
+
+    벤치마크는 time.sleep 을 제거하므로 한도가 그대로 동작하면 다음 요청 예약 시각만
+    계속 밀려 호출 예산을 넘기고 일부 조회가 거절된다. 한도 상태도 저장하지 않는다.
+    """
+    from contextlib import contextmanager
+    from utils.rate_limit_util import RateLimitUtil
+
+    @contextmanager
+    def slot(self, source, deadline=None):
+        yield {'ok': True}
+
+    RateLimitUtil.slot = slot
+    RateLimitUtil.save = lambda self: None
+
+
+class FetchMonitor:
+    """FetchUtil.call 이 조회에 실패(FetchError: 회로 차단/시간 예산 초과 포함)한 건수를 호출별로 집계
+
+    리포트는 조회 실패를 건너뛰고 계속 진행하므로, 실패가 있으면 측정한 작업량이
+    기준값과 달라져 비교가 의미 없다. measure() 는 실패가 한 건이라도 있으면 벤치마크를 실패시킨다.
+    """
+    def __init__(self):
+        from utils.fetch_util import FetchUtil, FetchError
+
+        self.rejected = {}
+        original = FetchUtil.call
+        monitor = self
+
+        def call(fetch, source, name, *args, **kwargs):
+            try:
+                return original(fetch, source, name, *args, **kwargs)
+            except FetchError as e:
+                key = f"{source}.{name} ({type(e).__name__})"
+                monitor.rejected[key] = monitor.rejected.get(key, 0) + 1
+                raise
+
+        FetchUtil.call = call
+
+    def total(self):
+        return sum(self.rejected.values())
+
+
+def silence_alerts():
+    from utils.alert_util import AlertUtil
+    AlertUtil._send = lambda self, text: None
+
+
+def run_stages(stages):
+    """파이프라인 단계 목록을 순서대로 실행하며 단계 종류(fetch/compute/render)별 시간 합산"""
+    results, timings = {}, {}
+    for stage in stages:
+        name, func, deps = stage[:3]
+        phase = name.split('_')[0]
+        started = time.perf_counter()
+        results[name] = func(*[results[dep] for dep in deps])
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+    return results[stages[-1][0]], timings
+
+
+def run_report(name, date, calendar, publisher):
+    """리포트 하나를 실행하고 {단계 종류: 초} 반환"""
+    display = datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d')
+    if name == 'opm':
+        from reports.operation_profit_report import OperationProfitReport
+        reporter = OperationProfitReport()
+        reporter.artifact_util.archive_enabled = False
+        started = time.perf_counter()
+        reporter.run()
+        return {'run': time.perf_counter() - started}
+
+    if name == 'volume':
+        from reports.volume_report import VolumeReport
+        reporter = VolumeReport()
+        stages = reporter.pipeline_stages(date, display)
+    elif name == 'investor':
+        from reports.investor_report import InvestorReport
+        reporter = InvestorReport()
+        stages = reporter.pipeline_stages(date, calendar.sessions_before(date, InvestorReport.LOOKBACK_SESSIONS - 1))
+    elif name == 'rs':
+        from reports.rs_report import RSReport
+        reporter = RSReport()
+        reporter.calendar = calendar
+        stages = reporter.pipeline_stages(date)
+    else:
+        from reports.high52_week_report import High52WeekReport
+        reporter = High52WeekReport()
+        stages = reporter.pipeline_stages()
+    reporter.artifact_util.archive_enabled = False
+
+    artifacts, timings = run_stages(stages)
+    if name == 'volume':
+        artifacts = [artifact for artifact, _ in artifacts or []]
+    started = time.perf_counter()
+    publisher.publish(artifacts, f"{display} {name} benchmark")
+    timings['publish'] = time.perf_counter() - started
+    return timings
+
+
+def record(args):
+    store = FixtureStore(args.fixtures)
+    if args.record == 'synthetic':
+        date = args.date or SYNTHETIC_DATE
+        source = SyntheticSource(date)
+        sessions = [day.strftime('%Y%m%d') for day in source.sessions]
+    else:
+        from pykrx import stock
+        from utils.calendar_util import CalendarUtil
+        date = args.date or CalendarUtil().previous_session()
+        source = None
+        start = (datetime.strptime(date, '%Y%m%d') - timedelta(days=400)).strftime('%Y%m%d')
+        sessions = [day.strftime('%Y%m%d') for day in stock.get_index_ohlcv_by_date(start, date, '1001').index]
+        freeze_time_only = frozen_datetime(date)
+        import reports.operation_profit_report, reports.high52_week_report
+        reports.operation_profit_report.datetime = freeze_time_only
+        reports.high52_week_report.datetime = freeze_time_only
+
+    store.install(record=True, source=source)
+    if args.record == 'synthetic':
+        freeze_time(date)
+        bypass_rate_limits()
+    stub_renderer()
+    silence_alerts()
+    store.meta = {'date': date, 'sessions': sessions, 'source': args.record,
+                  'recorded_at': datetime.now().isoformat(timespec='seconds')}
+
+    calendar = SessionCalendar(sessions)
+    publisher = FakePublisher()
+    for name in args.reports:
+        print(f"[녹화] {name} ...")
+        run_report(name, date, calendar, publisher)
+    store.save()
+    print(f"픽스처 저장: {args.fixtures} ({len(store.responses)}건, 기준일 {date})")
+
+
+def measure(args):
+    store = FixtureStore(args.fixtures).load()
+    date = store.meta['date']
+    store.install(record=False)
+    freeze_time(date)
+    bypass_rate_limits()
+    monitor = FetchMonitor()
+    renderer = 'stub' if args.stub_render else 'wkhtmltoimage'
+    if args.stub_render:
+        stub_renderer()
+    silence_alerts()
+
+    calendar = SessionCalendar(store.meta['sessions'])
+    publisher = FakePublisher()
+    results = {}
+    for name in args.reports:
+        runs = [run_report(name, date, calendar, publisher) for _ in range(args.repeat)]
+        results[name] = {phase: round(statistics.median(run[phase] for run in runs), 4) for phase in runs[0]}
+
+    environment = {'fixtures': store.meta['source'], 'renderer': renderer}
+    return environment, results, monitor.rejected
+
+
+def compare(environment, results, baselines, threshold, min_delta):
+    """기준값 대비 (리포트, 단계, 기준, 측정, 변화율, 회귀 여부) 목록"""
+    rows = []
+    comparable = baselines.get('environment') == environment
+    for name, phases in results.items():
+        for phase, seconds in phases.items():
+            baseline = baselines.get('reports', {}).get(name, {}).get(phase) if comparable else None
+            if baseline is None:
+                rows.append((name, phase, None, seconds, None, False))
+                continue
+            change = (seconds - baseline) / baseline if baseline else 0.0
+            regressed = change > threshold and seconds - baseline > min_delta
+            rows.append((name, phase, baseline, seconds, change, regressed))
+    return comparable, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리포트 단계별 오프라인 벤치마크")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="픽스처 파일 경로")
+    parser.add_argument('--baselines', default=DEFAULT_BASELINES, help="기준값 파일 경로")
+    parser.add_argument('--record', choices=['live', 'synthetic'], help="측정 대신 픽스처 녹화")
+    parser.add_argument('--date', help="녹화 기준일 (YYYYMMDD)")
+    parser.add_argument('--reports', default=','.join(REPORTS), help="측정할 리포트 (쉼표 구분)")
+    parser.add_argument('--repeat', type=int, default=3, help="리포트별 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--threshold', type=float, default=0.25, help="회귀로 판단할 증가율 (기본값 25%%)")
+    parser.add_argument('--min-delta', type=float, default=0.05, help="회귀로 판단할 최소 증가 시간(초)")
+    parser.add_argument('--stub-render', action='store_true',
+                        default=not shutil.which(os.getenv('WKHTMLTOIMAGE_PATH') or 'wkhtmltoimage'),
+                        help="wkhtmltoimage 대신 합성 이미지로 렌더링 (설치되지 않은 경우 기본값)")
+    parser.add_argument('--update-baseline', action='store_true', help="측정 결과를 기준값으로 저장")
+    args = parser.parse_args()
+    args.reports = [name.strip() for name in args.reports.split(',') if name.strip()]
+
+    if args.record:
+        record(args)
+        return
+    if not os.path.exists(args.fixtures):
+        print(f"픽스처가 없습니다: {args.fixtures}\n먼저 --record live 또는 --record synthetic 으로 녹화하세요.")
+        sys.exit(2)
+
+    environment, results, rejected = measure(args)
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    comparable, rows = compare(environment, results, baselines, args.threshold, args.min_delta)
+    if baselines and not comparable:
+        print(f"기준값 환경({baselines.get('environment')})이 현재({environment})와 달라 비교를 생략합니다.")
+    print(f"{'리포트':<10} {'단계':<8} {'기준(초)':>10} {'측정(초)':>10} {'변화':>8}")
+    for name, phase, baseline, seconds, change, regressed in rows:
+        baseline_text = f"{baseline:.3f}" if baseline is not None else '-'
+        change_text = f"{change:+.0%}" if change is not None else '-'
+        print(f"{name:<10} {phase:<8} {baseline_text:>10} {seconds:>10.3f} {change_text:>8}" + ("  ← 회귀" if regressed else ""))
+
+    if rejected:
+        # 조회가 거절되면 녹화 때와 다른 작업량을 측정한 것이므로 기준값 비교/갱신 불가
+        print(f"조회 실패 {sum(rejected.values())}건 - 측정 결과를 사용할 수 없습니다:")
+        for key, count in sorted(rejected.items()):
+            print(f"  {key}: {count}건")
+        sys.exit(1)
+    if args.update_baseline:
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment, 'reports': results}, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.baselines}")
+    elif any(row[5] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""main.py 시작 시간 측정
+
+시나리오마다 새 파이썬 프로세스를 띄워 import/생성까지 걸린 시간을 측정한다.
+네트워크 조회나 리포트 실행은 포함하지 않는다.
+
+    python benchmarks/startup_benchmark.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ('import main', "import main"),
+    # 휴장일 종료 경로: 달력 규칙만으로 오늘 거래일 여부 판정
+    ('holiday check', "import main; main.CalendarUtil().is_session()"),
+    ('volume report', "import main; from reports.volume_report import VolumeReport; VolumeReport()"),
+    ('investor report', "import main; from reports.investor_report import InvestorReport; InvestorReport()"),
+    ('rs report', "import main; from reports.rs_report import RSReport; RSReport()"),
+    ('high52 report', "import main; from reports.high52_week_report import High52WeekReport; High52WeekReport()"),
+]
+TARGET_SECONDS = 1.0
+
+def measure(code):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py 시작 시간 측정")
+    parser.add_argument('--repeat', type=int, default=5, help="시나리오별 반복 횟수")
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure("pass") for _ in range(args.repeat))
+    print(f"{'시나리오':<20} {'중앙값':>10} {'최대':>10}  (인터프리터 기동 {baseline * 1000:.0f}ms 포함)")
+    slow = []
+    for name, code in SCENARIOS:
+        timings = [measure(code) for _ in range(args.repeat)]
+        median = statistics.median(timings)
+        print(f"{name:<20} {median * 1000:>8.0f}ms {max(timings) * 1000:>8.0f}ms")
+        if median > TARGET_SECONDS:
+            slow.append(name)
+
+    if slow:
+        print(f"목표({TARGET_SECONDS:.1f}초) 초과: {', '.join(slow)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
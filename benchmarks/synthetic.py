@@ -0,0 +1,140 @@
+"""KRX/DART/네이버 응답을 흉내 내는 결정적 합성 데이터 소스
+
+실제 응답을 녹화할 수 없는 환경에서 `report_benchmark.py --record synthetic` 으로
+픽스처를 만들 때 사용한다. 같은 인자에는 항상 같은 값을 돌려주며 컬럼 구성은
+pykrx/OpenDartReader/네이버 API 응답과 동일하다.
+"""
+import zlib
+import numpy as np
+import pandas as pd
+
+class SyntheticSource:
+    INVESTORS = ['금융투자', '보험', '투신', '사모', '은행', '기타금융', '연기금', '기관합계',
+                 '기타법인', '개인', '외국인', '기타외국인', '외국인합계', '전체']
+
+    def __init__(self, date, kospi=200, kosdaq=300, seed=0):
+        self.date = date
+        self.seed = seed
+        self.sessions = pd.bdate_range(end=pd.Timestamp(date), periods=300)
+        self.tickers = {
+            'KOSPI': [f"{5930 + i * 10:06d}" for i in range(kospi)],
+            'KOSDAQ': [f"{200000 + i * 10:06d}" for i in range(kosdaq)],
+        }
+
+    def _rng(self, *key):
+        return np.random.default_rng(self.seed + zlib.crc32(repr(key).encode()))
+
+    def _range(self, fromdate, todate):
+        return self.sessions[(self.sessions >= pd.Timestamp(fromdate)) & (self.sessions <= pd.Timestamp(todate))]
+
+    def _all_tickers(self, market):
+        if market == 'ALL':
+            return self.tickers['KOSPI'] + self.tickers['KOSDAQ']
+        return self.tickers[market]
+
+    def _closes(self, ticker, low=1000, high=100000, decimals=0):
+        rng = self._rng('close', ticker)
+        returns = rng.normal(0.0005, 0.02, len(self.sessions))
+        return pd.Series(rng.uniform(low, high) * np.exp(np.cumsum(returns)), index=self.sessions).round(decimals)
+
+    # pykrx.stock
+    def get_market_ticker_list(self, date=None, market='KOSPI'):
+        return list(self._all_tickers(market))
+
+    def get_market_ticker_name(self, ticker):
+        return f"종목{ticker}"
+
+    def get_market_ohlcv(self, date=None, market='KOSPI', **kwargs):
+        tickers = self._all_tickers(market)
+        rng = self._rng('ohlcv', date, market)
+        close = rng.uniform(1000, 100000, len(tickers)).round(0)
+        volume = rng.lognormal(12, 1.5, len(tickers)).astype(int)
+        return pd.DataFrame({
+            '시가': close, '고가': close * 1.02, '저가': close * 0.98, '종가': close,
+            '거래량': volume, '거래대금': (close * volume).astype('int64'),
+            '등락률': rng.normal(0, 2, len(tickers)).round(2)
+        }, index=pd.Index(tickers, name='티커'))
+
+    def get_market_ohlcv_by_date(self, fromdate, todate, ticker, *args, **kwargs):
+        return self._ohlcv(self._closes(ticker), fromdate, todate, ticker)
+
+    def _ohlcv(self, closes, fromdate, todate, ticker):
+        index = self._range(fromdate, todate)
+        close = closes[index]
+        return pd.DataFrame({
+            '시가': close, '고가': close * 1.02, '저가': close * 0.98, '종가': close,
+            '거래량': self._rng('volume', ticker).lognormal(12, 1, len(index)).astype(int),
+            '등락률': close.pct_change().fillna(0).mul(100).round(2)
+        }, index=index.rename('날짜'))
+
+    def get_index_ohlcv_by_date(self, fromdate, todate, ticker, *args, **kwargs):
+        # 실제 지수처럼 소수점 둘째 자리까지의 2,000 ~ 3,000 포인트대 종가
+        key = f"index{ticker}"
+        df = self._ohlcv(self._closes(key, 2000, 3000, decimals=2), fromdate, todate, key)
+        return df[['시가', '고가', '저가', '종가', '거래량']]
+
+    def get_market_net_purchases_of_equities(self, fromdate, todate, market, investor):
+        tickers = self._all_tickers(market)
+        rng = self._rng('net', fromdate, todate, market, investor)
+        net = (rng.normal(0, 5e9, len(tickers))).astype('int64')
+        return pd.DataFrame({
+            '종목명': [self.get_market_ticker_name(ticker) for ticker in tickers],
+            '매도거래량': rng.integers(1000, 100000, len(tickers)),
+            '매수거래량': rng.integers(1000, 100000, len(tickers)),
+            '순매수거래량': rng.integers(-50000, 50000, len(tickers)),
+            '매도거래대금': np.abs(net) + 1e9,
+            '매수거래대금': np.abs(net) + 1e9 + net,
+            '순매수거래대금': net
+        }, index=pd.Index(tickers, name='티커')).sort_values('순매수거래대금', ascending=False)
+
+    def get_market_trading_value_by_date(self, fromdate, todate, ticker, detail=True, **kwargs):
+        index = self._range(fromdate, todate)
+        rng = self._rng('trading_value', ticker, detail)
+        return pd.DataFrame({
+            investor: rng.normal(1e8, 5e8, len(index)).astype('int64') for investor in self.INVESTORS
+        }, index=index.rename('날짜'))
+
+    def get_market_fundamental_by_ticker(self, date, market='KOSPI', alternative=False):
+        tickers = self._all_tickers(market)
+        rng = self._rng('fundamental', date, market)
+        return pd.DataFrame({
+            'BPS': rng.integers(1000, 100000, len(tickers)),
+            'PER': rng.normal(12, 10, len(tickers)).round(2),
+            'PBR': rng.uniform(0.2, 5, len(tickers)).round(2),
+            'EPS': rng.integers(-5000, 10000, len(tickers)),
+            'DIV': rng.uniform(0, 6, len(tickers)).round(2),
+            'DPS': rng.integers(0, 3000, len(tickers))
+        }, index=pd.Index(tickers, name='티커'))
+
+    # 네이버 52주 신고가 API
+    def fetch_high_52w(self, page=1, page_size=100):
+        total = 130
+        rng = self._rng('high52')
+        stocks = []
+        for i in range((page - 1) * page_size, min(page * page_size, total)):
+            stocks.append({
+                'stockEndType': 'etf' if i % 7 == 0 else 'stock',
+                'stockName': f"신고가{i:03d}",
+                'itemCode': f"{100000 + i:06d}",
+                'closePrice': f"{int(rng.uniform(1000, 300000)):,}",
+                'fluctuationsRatio': f"{rng.uniform(0, 30):.2f}",
+                'marketValueHangeul': f"{int(rng.uniform(100, 50000)):,}억원",
+                'accumulatedTradingValueKrwHangeul': f"{int(rng.uniform(1, 5000)):,}억원"
+            })
+        return {'totalCount': total, 'stocks': stocks}
+
+    # OpenDartReader
+    def finstate(self, corp, bsns_year, reprt_code='11011'):
+        rng = self._rng('finstate', corp, bsns_year, reprt_code)
+        if rng.random() < 0.05:
+            return pd.DataFrame()
+        revenue = int(rng.uniform(1e10, 1e12))
+        margin = rng.uniform(0.45, 0.6) if zlib.crc32(corp.encode()) % 10 == 0 else rng.uniform(-0.1, 0.25)
+        operating_profit = int(revenue * margin)
+        rows = []
+        for fs_div in ['CFS', 'OFS']:
+            rows.append({'fs_div': fs_div, 'account_nm': '매출액',
+                         'thstrm_amount': f"{revenue:,}", 'thstrm_add_amount': f"{revenue * 2:,}"})
+            rows.append({'fs_div': fs_div, 'account_nm': '영업이익',
+                         'thstrm_amount': f"{operating_profit:,}", 'thstrm_add_amount': f"{operating_profit * 2:,}"})
+        return pd.DataFrame(rows)
@@ -1,124 +1,567 @@
+import os
 import sys
-from datetime import datetime, timedelta
-import holidays
-from reports.high52_week_report import High52WeekReport
-from reports.volume_report import VolumeReport
-from reports.investor_report import InvestorReport
-from reports.rs_report import RSReport
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from dotenv import load_dotenv
-from utils.telegram_util import TelegramUtil
-from utils.api_util import ApiUtil, ApiError
 from utils.logger_util import LoggerUtil
+from utils.calendar_util import CalendarUtil
+from utils.metrics_util import MetricsUtil
+from utils.fetch_util import FetchUtil
+from utils.rate_limit_util import RateLimitUtil
 
+# 리포트 모듈과 pandas/pykrx/PIL 등을 불러오는 유틸은 실제로 필요한 함수 안에서
+# import 해 휴장일 종료나 일부 리포트만 실행할 때 시작 시간을 줄인다.
 load_dotenv()
 
-def isTodayHoliday():
-    kr_holidays = holidays.KR()
-    today = datetime.today().date()
-    return today in kr_holidays
+def publish_report(outbox, telegram, date, caption, content, category, artifacts):
+    """텔레그램 전송과 게시글 등록을 아웃박스를 거쳐 수행
+
+    텔레그램 업로드는 전송 큐에서 비동기로 진행되므로 다음 리포트 생성이 바로 시작된다.
+    채팅방마다 별도 작업으로 기록하되, 이미지는 첫 채팅방에만 업로드되고 이후에는
+    file_id 로 재사용된다. 작업 기록(이미지 spool 포함)은 반환 전에 끝내므로 전송 큐가
+    비기 전에 프로세스가 종료되어도 발행 영수증만 남고 전송이 사라지는 일은 없다.
+    """
+    from utils.api_util import ApiError
+    from utils.outbox_util import OutboxUtil
+    from utils.alert_util import AlertUtil
+
+    telegram_jobs = []
+    for chat_id in telegram.delivery_chat_ids():
+        job_key = OutboxUtil.make_key(OutboxUtil.KIND_TELEGRAM_MEDIA, date, category, chat_id)
+        payload = {'caption': caption, 'chat_id': chat_id}
+        outbox.enqueue(OutboxUtil.KIND_TELEGRAM_MEDIA, job_key, payload, artifacts)
+        telegram_jobs.append((job_key, payload))
+
+    def send_telegram():
+        # 이미 기록된 작업을 메모리 아티팩트로 전송만 함 (완료된 작업은 publish 가 건너뜀)
+        for job_key, payload in telegram_jobs:
+            try:
+                outbox.publish(OutboxUtil.KIND_TELEGRAM_MEDIA, job_key, payload, artifacts)
+            except Exception as e:
+                AlertUtil().alert('send_multiple_photo', e, f"❌ 텔레그램 전송 오류 발생 (아웃박스 보관)\n\n{caption}\n{str(e)}")
+
+    telegram.submit(send_telegram)
+
+    try:
+        outbox.publish(
+            OutboxUtil.KIND_BOARD_POST,
+            OutboxUtil.make_key(OutboxUtil.KIND_BOARD_POST, date, category),
+            {
+                'title': caption,
+                'content': content,
+                'category': category,
+                'writer': "admin"
+            },
+            artifacts
+        )
+    except ApiError as e:
+        error_message = f"❌ API 오류 발생 (아웃박스 보관)\n\n{e.message}"
+        AlertUtil().alert('create_post', e, error_message)
+
+def flush_outbox():
+    """아웃박스에 남은 작업만 재전송"""
+    from utils.telegram_util import TelegramUtil
+    from utils.api_util import ApiUtil
+    from utils.outbox_util import OutboxUtil
+    from utils.alert_util import AlertUtil
 
-def main():
     logger = LoggerUtil().get_logger()
-    
-    if isTodayHoliday():
-        logger.info('공휴일 종료')
-        sys.exit()
+    outbox = OutboxUtil(TelegramUtil(), ApiUtil())
+    delivered, failed = outbox.flush()
+    logger.info(f"아웃박스 재전송 완료 - 성공: {delivered}, 실패: {failed}")
+    if failed:
+        AlertUtil().alert('flush_outbox', 'DeliveryFailed', f"❌ 아웃박스 재전송 실패 {failed}건")
+    AlertUtil().send_summary()
 
-    logger.info("\n=== 데이터 수집 시작 ===")
-    
-    telegram = TelegramUtil()
-    api_util = ApiUtil()
-    
-    # 날짜 설정
-    today_yyyymmdd = datetime.today().strftime('%Y%m%d')
-    # today_yyyymmdd = '20250217'  # 테스트용
-    today_dt = datetime.strptime(today_yyyymmdd, '%Y%m%d')
-    start_date = (today_dt - timedelta(days=15)).strftime('%Y%m%d')
-    today_display = today_dt.strftime('%Y-%m-%d')
-    logger.info(f"처리 날짜: {today_display}")
+def make_publisher(outbox, telegram, date, caption, content, category):
+    """렌더링 결과를 받아 발행하고 발행 영수증을 반환하는 publish 단계 함수 생성
 
-    # 1. 거래량 TOP 15 처리
-    logger.info("\n1. 전종목 거래량 TOP 15 처리 시작")
-    volume_reporter = VolumeReport()
-    volume_images = volume_reporter.create_report(today_yyyymmdd, today_display)
-    if volume_images:
-        image_paths = [img_path for img_path, _ in volume_images]
-        caption = f"{today_display} 전종목 거래량 TOP 15"
-        telegram.send_multiple_photo(image_paths, caption)
-        try:
-            api_util.create_post(
-                title=caption,
-                content="전종목 거래량 상위 15개 종목 분석 결과",
-                category="거래량",
-                writer="admin",
-                image_paths=image_paths
-            )
-        except ApiError as e:
-            error_message = f"❌ API 오류 발생\n\n{e.message}"
-            telegram.send_test_message(error_message)
-    logger.info("전종목 거래량 TOP 15 처리 완료")
-
-    # 2. 투자자 데이터 처리
-    logger.info("\n2. 투자자 데이터 처리 시작")
-    investor_reporter = InvestorReport()
-    investor_images = investor_reporter.create_report(today_yyyymmdd, start_date)
-    if investor_images:
-        caption = f"{today_display} 시장별 순매수대금 TOP 15"
-        telegram.send_multiple_photo(investor_images, caption)
-        try:
-            api_util.create_post(
-                title=caption,
+    영수증은 체크포인트로 저장되어 재실행 시 이미 발행한 리포트를 다시 올리지 않는다.
+    """
+    def publish(artifacts):
+        if artifacts:
+            publish_report(outbox, telegram, date, caption, content, category, artifacts)
+        return {
+            'category': category,
+            'images': len(artifacts or []),
+            'published_at': datetime.now().isoformat(timespec='seconds')
+        }
+    return publish
+
+REPORT_KEYS = ('volume', 'investor', 'rs', 'high52')
+# 네이버 실시간 API만 제공되어 과거 날짜로 재생성할 수 없는 리포트
+LIVE_ONLY_REPORTS = ('high52',)
+
+def build_pipeline(telegram, outbox, today_yyyymmdd, today_display, max_threads, max_processes,
+                   checkpoint=None, reports=REPORT_KEYS, publish=True, archive_dir=None, history=None,
+                   deadline=None, rolling=None, verify_rs=False):
+    """리포트별 fetch/compute/render/publish 단계를 하나의 파이프라인으로 구성
+
+    publish 가 False 이면 발행 단계 없이 렌더링까지만 수행하며, archive_dir 을
+    지정하면 모든 리포트 이미지를 해당 디렉토리에 보관한다 (백필용).
+    리포트 모듈은 reports 에 포함된 것만 불러온다. deadline(time.monotonic 기준)을
+    지정하면 그때까지 끝나지 않은 리포트의 FALLBACK_STAGES 는 직전 데이터로 대체된다.
+    rolling(종가 상태)을 지정하면 RS 는 전 거래일 상태에 당일 종가만 반영해 계산한다.
+    """
+    from utils.pipeline_util import Pipeline
+
+    pipeline = Pipeline(max_threads=max_threads, checkpoint=checkpoint, deadline=deadline)
+
+    def add_report(key, reporter, stages, publisher):
+        if archive_dir:
+            reporter.img_dir = archive_dir
+            reporter.artifact_util.archive_enabled = True
+        render = pipeline.add_stages(key, stages, fallback=getattr(reporter, 'FALLBACK_STAGES', ()))
+        if publish:
+            pipeline.add(f'{key}.publish', publisher, [render])
+
+    # 1. 거래량 TOP 15
+    if 'volume' in reports:
+        from reports.volume_report import VolumeReport
+        volume_reporter = VolumeReport()
+        volume_publish = make_publisher(
+            outbox, telegram, today_yyyymmdd,
+            caption=f"{today_display} 전종목 거래량 TOP 15",
+            content="전종목 거래량 상위 15개 종목 분석 결과",
+            category="거래량"
+        )
+        add_report(
+            'volume', volume_reporter,
+            volume_reporter.pipeline_stages(today_yyyymmdd, today_display),
+            lambda images: volume_publish([artifact for artifact, _ in images])
+        )
+
+    # 2. 투자자 데이터
+    if 'investor' in reports:
+        from reports.investor_report import InvestorReport
+        investor_reporter = InvestorReport()
+        start_date = CalendarUtil().sessions_before(today_yyyymmdd, InvestorReport.LOOKBACK_SESSIONS - 1)
+        add_report(
+            'investor', investor_reporter,
+            investor_reporter.pipeline_stages(today_yyyymmdd, start_date),
+            make_publisher(
+                outbox, telegram, today_yyyymmdd,
+                caption=f"{today_display} 시장별 순매수대금 TOP 15",
                 content="시장별 투자자 순매수대금 상위 15개 종목 분석 결과",
-                category="순매수대금",
-                writer="admin",
-                image_paths=investor_images
+                category="순매수대금"
             )
-        except ApiError as e:
-            error_message = f"❌ API 오류 발생\n\n{e.message}"
-            telegram.send_test_message(error_message)
-    logger.info("투자자 데이터 처리 완료")
-
-    # 3. RS 데이터 처리
-    logger.info("\n3. RS 데이터 처리 시작")
-    rs_reporter = RSReport()
-    rs_images = rs_reporter.create_report(today_yyyymmdd)
-    if rs_images:
-        caption = f"{today_display} 시장별 RS 랭킹 TOP 15"
-        telegram.send_multiple_photo(rs_images, caption)
-        try:
-            api_util.create_post(
-                title=caption,
+        )
+
+    # 3. RS 데이터
+    if 'rs' in reports:
+        from reports.rs_report import RSReport
+        rs_reporter = RSReport(history=history, processes=max_processes, rolling=rolling, verify=verify_rs)
+        add_report(
+            'rs', rs_reporter,
+            rs_reporter.pipeline_stages(today_yyyymmdd, checkpoint=checkpoint),
+            make_publisher(
+                outbox, telegram, today_yyyymmdd,
+                caption=f"{today_display} 시장별 RS 랭킹 TOP 15",
                 content="시장별 RS(Relative Strength) 상위 15개 종목 분석 결과",
-                category="RS랭킹",
-                writer="admin",
-                image_paths=rs_images
+                category="RS랭킹"
             )
-        except ApiError as e:
-            error_message = f"❌ API 오류 발생\n\n{e.message}"
-            telegram.send_test_message(error_message)
-    logger.info("RS 데이터 처리 완료")
-
-    # 4. 52주 신고가 종목 데이터 처리
-    logger.info("\n4. 52주 신고가 종목 데이터 처리 시작")
-    high52_week_reporter = High52WeekReport()
-    high52_week_images = high52_week_reporter.create_report()
-    if high52_week_images:
-        caption = f"{today_display} 52주 신고가 종목 리포트"
-        telegram.send_multiple_photo(high52_week_images, caption)
-        try:
-            api_util.create_post(
-                title=caption,
+        )
+
+    # 4. 52주 신고가 종목
+    if 'high52' in reports:
+        from reports.high52_week_report import High52WeekReport
+        high52_week_reporter = High52WeekReport()
+        add_report(
+            'high52', high52_week_reporter,
+            high52_week_reporter.pipeline_stages(),
+            make_publisher(
+                outbox, telegram, today_yyyymmdd,
+                caption=f"{today_display} 52주 신고가 종목 리포트",
                 content="52주 신고가 종목 리포트",
-                category="52주신고가",
-                writer="admin",
-                image_paths=high52_week_images
+                category="52주신고가"
             )
-        except ApiError as e:
-            error_message = f"❌ API 오류 발생\n\n{e.message}"
-            telegram.send_test_message(error_message)
-    logger.info("52주 신고가 종목 데이터 처리 완료")
-    
+        )
+
+    return pipeline
+
+def backfill(start_yyyymmdd, end_yyyymmdd, reports=REPORT_KEYS, workers=4, max_threads=2, profile=False):
+    """기간 내 거래일의 리포트를 병렬로 재생성해 archive/{거래일} 에 보관 (발행 없음)
+
+    여러 날짜가 하나의 종가 이력 캐시를 공유하므로 종목별 이력은 전체 기간에
+    대해 한 번만 조회된다.
+    """
+    from utils.artifact_util import ArtifactUtil
+    from utils.alert_util import AlertUtil
+    from utils.checkpoint_util import CheckpointUtil
+    from utils.price_history_util import PriceHistoryUtil
+
+    logger = LoggerUtil().get_logger()
+    skipped = [key for key in reports if key in LIVE_ONLY_REPORTS]
+    if skipped:
+        logger.warning(f"과거 데이터를 제공하지 않아 백필에서 제외: {', '.join(skipped)}")
+    reports = [key for key in reports if key not in LIVE_ONLY_REPORTS]
+
+    calendar = CalendarUtil()
+    dates = calendar.sessions_between(start_yyyymmdd, end_yyyymmdd)
+    if not dates:
+        logger.info(f"백필 대상 거래일 없음: {start_yyyymmdd}~{end_yyyymmdd}")
+        return {}
+    logger.info(f"백필 시작: {dates[0]}~{dates[-1]} ({len(dates)}거래일, 작업자 {workers}개)")
+    MetricsUtil().reset()
+    FetchUtil().start_run()
+    profiler = start_profiler() if profile else None
+
+    # RS 최대 조회 구간(120거래일)을 포함해 전체 기간 이력을 한 번에 조회하도록 예약
+    history = PriceHistoryUtil()
+    history.reserve(calendar.sessions_before(dates[0], 119), dates[-1])
+    archive_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive')
+
+    def run_date(date):
+        # 라이브 실행의 checkpoints/{거래일} 을 이어받으면 렌더링 단계가 복원되어 이미지가
+        # 보관되지 않으므로, 중단된 백필만 이어서 진행하도록 별도 위치에 저장하고 성공하면 지움
+        checkpoint = CheckpointUtil(date, base_dir=os.path.join(archive_root, 'checkpoints'))
+        pipeline = build_pipeline(
+            None, None, date,
+            datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d'),
+            max_threads, 0,
+            checkpoint=checkpoint,
+            reports=reports,
+            publish=False,
+            archive_dir=os.path.join(archive_root, date),
+            history=history
+        )
+        pipeline.run()
+        failed = [name for name, stage in pipeline.stages.items() if stage.status in ('failed', 'skipped')]
+        if not failed:
+            checkpoint.clear()
+        logger.info(f"백필 {date} 완료" + (f" (실패: {', '.join(failed)})" if failed else ""))
+        return failed
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='backfill') as executor:
+        results = dict(zip(dates, executor.map(run_date, dates)))
+
+    ArtifactUtil.wait_archived()
+    AlertUtil().send_summary()
+    MetricsUtil().write(f"backfill_{dates[0]}_{dates[-1]}", job='backfill')
+    RateLimitUtil().save()
+    if profiler:
+        profiler.write(f"backfill_{dates[0]}_{dates[-1]}")
+    failed_dates = [date for date, failed in results.items() if failed]
+    logger.info(f"백필 완료: {len(dates) - len(failed_dates)}/{len(dates)}거래일 성공")
+    return results
+
+def parse_deadline(value, now=None):
+    """실행 마감을 남은 초로 변환 ('HH:MM' 은 오늘 그 시각, 숫자는 지금부터의 분)"""
+    if not value:
+        return None
+    now = now or datetime.now()
+    if ':' in str(value):
+        hour, minute = (int(part) for part in str(value).split(':'))
+        return max(0.0, (now.replace(hour=hour, minute=minute, second=0, microsecond=0) - now).total_seconds())
+    return float(value) * 60
+
+def run_budgets(deadline):
+    """실행 마감(남은 초)을 (조회 예산 초, 파이프라인 단계 마감 시각) 으로 분배
+
+    렌더링/발행에 DEADLINE_RESERVE 초(예산의 1/4 이하)를 남겨 두고, 조회가 먼저
+    멈춘 뒤 단계가 부분 결과를 만들 수 있도록 단계 마감은 그 중간에 둔다.
+    """
+    if deadline is None:
+        return None, None
+    reserve = min(float(os.getenv('DEADLINE_RESERVE', 300)), deadline / 4)
+    fetch_budget = max(deadline - reserve, 0.001)  # 0 이면 FetchUtil 이 무제한으로 해석하므로 최소값 유지
+    return fetch_budget, time.monotonic() + deadline - reserve / 2
+
+def notify_degraded(pipeline, today_display):
+    """직전 데이터로 대체/부분 집계된 단계와 발행하지 못한 리포트를 알림"""
+    from utils.alert_util import AlertUtil
+
+    labels = {'fallback': '직전 데이터로 대체', 'partial': '일부만 집계'}
+    lines = [f"• {name}: {labels[stage.degraded]}" for name, stage in pipeline.stages.items() if stage.degraded]
+    lines += [f"• {name.partition('.')[0]}: 발행 생략 (시간 예산 초과)" for name, stage in pipeline.stages.items()
+              if name.endswith('.publish') and stage.status in ('failed', 'skipped') and stage.timed_out]
+    if lines:
+        AlertUtil().alert('run_deadline', 'Degraded', f"⚠️ {today_display} 실행 마감 초과\n\n" + '\n'.join(lines))
+
+def run_reports(today_yyyymmdd, telegram, outbox, max_threads=4, max_processes=0, fresh=False,
+                reports=REPORT_KEYS, history=None, profile=False, deadline=None, rolling=None, verify_rs=False):
+    """하루치 리포트 파이프라인 실행 (단발 실행과 데몬 모드가 공유)
+
+    deadline(남은 초)을 지정하면 그 안에 발행까지 마치도록 조회를 먼저 멈추고,
+    끝나지 않은 단계는 부분 결과나 직전 데이터로 대체하거나 알림 후 건너뛴다.
+    RS 는 cache/rolling_prices.npz 의 종가 상태에 당일 종가만 반영해 계산하며,
+    verify_rs 가 켜져 있으면 전체 재계산과 비교한다.
+    """
+    from utils.telegram_util import TelegramUtil
+    from utils.artifact_util import ArtifactUtil
+    from utils.alert_util import AlertUtil
+    from utils.checkpoint_util import CheckpointUtil
+    from utils.price_history_util import PriceHistoryUtil
+    from utils.rolling_price_util import RollingPriceUtil
+
+    logger = LoggerUtil().get_logger()
+    logger.info("\n=== 데이터 수집 시작 ===")
+    MetricsUtil().reset()
+    fetch_budget, stage_deadline = run_budgets(deadline)
+    FetchUtil().start_run(fetch_budget)
+    if deadline is not None:
+        logger.info(f"실행 마감: {deadline / 60:.1f}분 후 (조회 예산 {fetch_budget / 60:.1f}분)")
+    profiler = start_profiler() if profile else None
+
+    today_display = datetime.strptime(today_yyyymmdd, '%Y%m%d').strftime('%Y-%m-%d')
+    logger.info(f"처리 날짜: {today_display}")
+
+    # --prefetch 로 전 거래일까지 받아 둔 이력이 있으면 당일분만 추가 조회
+    if history is None and 'rs' in reports:
+        history = PriceHistoryUtil(PriceHistoryUtil.default_store_path())
+    if history is not None:
+        count, covered_until = history.coverage()
+        if count:
+            logger.info(f"미리 조회된 종가 이력 사용: {count}건 ({covered_until}까지), 이후 구간만 추가 조회")
+    if rolling is None and 'rs' in reports:
+        rolling = RollingPriceUtil()
+
+    # 같은 거래일 재실행 시 완료된 단계는 체크포인트에서 이어서 진행
+    checkpoint = CheckpointUtil(today_yyyymmdd)
+    if fresh:
+        checkpoint.clear()
+    checkpoint.cleanup()
+
+    # 서로 독립적인 리포트는 동시에 실행되며, 각 리포트 안에서는 단계 순서를 지킴
+    pipeline = build_pipeline(
+        telegram, outbox, today_yyyymmdd, today_display,
+        max_threads, max_processes, checkpoint=checkpoint, reports=reports, history=history,
+        deadline=stage_deadline, rolling=rolling, verify_rs=verify_rs
+    )
+    pipeline.run()
+    pipeline.log_summary()
+    notify_degraded(pipeline, today_display)
+    if history is not None:
+        save_history(history, today_yyyymmdd)
+
+    # 텔레그램 전송 큐가 비워진 뒤 남은 전송 실패 작업 재시도
+    TelegramUtil.wait_deliveries()
+    outbox.flush()
+    # 재전송까지 끝났으므로 이번 실행에서 업로드한 이미지의 file_id 는 더 쓰지 않음
+    TelegramUtil.clear_file_ids()
+
+    # 이미지 보관(디스크 기록)은 백그라운드에서 진행되므로 종료 전 대기
+    ArtifactUtil.wait_archived()
+    AlertUtil().send_summary()
+    MetricsUtil().write(today_yyyymmdd)
+    RateLimitUtil().save()
+    if profiler:
+        profiler.write(today_yyyymmdd)
     logger.info("\n=== 모든 데이터 처리 완료 ===")
+    return pipeline
+
+def start_profiler():
+    """리포트별 샘플링 프로파일러 시작 (profiles/ 에 pstats/collapsed 기록)"""
+    from utils.profile_util import ProfileUtil
+    return ProfileUtil().start()
+
+def save_history(history, date):
+    """RS 최대 조회 구간(120거래일) 이전 이력을 정리하고 저장소에 기록"""
+    try:
+        history.discard_before(CalendarUtil().sessions_before(date, 119))
+        history.save()
+    except Exception as e:
+        LoggerUtil().get_logger().warning(f"종가 이력 저장 실패: {str(e)}")
+
+def prefetch(reports=REPORT_KEYS, history=None, rolling=None):
+    """다음 장 마감 대상 거래일의 직전 거래일까지 이력/종가 상태를 미리 받아 저장소에 기록
+
+    장 시작 전(또는 전날 밤)이나 장중에 실행해 두면 장 마감 후 실행은 당일분만 조회한다.
+    """
+    from utils.price_history_util import PriceHistoryUtil
+    from utils.rolling_price_util import RollingPriceUtil
+    from reports.rs_report import RSReport
+
+    logger = LoggerUtil().get_logger()
+    if 'rs' not in reports:
+        logger.info("미리 조회할 리포트 없음 (RS 만 지원)")
+        return
+    MetricsUtil().reset()
+    FetchUtil().start_run()
+    target = CalendarUtil().upcoming_session()
+    logger.info(f"이력 미리 조회 시작: {target} 리포트 대상")
+    history = history or PriceHistoryUtil(PriceHistoryUtil.default_store_path())
+    RSReport(history=history, rolling=rolling or RollingPriceUtil()).prefetch(target)
+    save_history(history, target)
+    MetricsUtil().write(f"prefetch_{target}", job='prefetch')
+    RateLimitUtil().save()
+    logger.info(f"이력 미리 조회 완료: {history.coverage()[0]}건")
+
+def main(max_threads=4, max_processes=0, fresh=False, reports=REPORT_KEYS, profile=False, deadline=None,
+         verify_rs=False, date=None):
+    logger = LoggerUtil().get_logger()
+    # 기준 거래일 (기본값 오늘, 카세트 재생 시 녹화한 날짜)
+    today_yyyymmdd = date or datetime.today().strftime('%Y%m%d')
+
+    # 주말/공휴일뿐 아니라 KRX 휴장일에도 빈 리포트를 만들지 않도록 거래일 달력으로 확인
+    if not CalendarUtil().is_session(today_yyyymmdd):
+        logger.info('휴장일 종료')
+        sys.exit()
+
+    from utils.telegram_util import TelegramUtil
+    from utils.api_util import ApiUtil
+    from utils.outbox_util import OutboxUtil
+
+    telegram = TelegramUtil()
+    outbox = OutboxUtil(telegram, ApiUtil())
+    run_reports(today_yyyymmdd, telegram, outbox, max_threads, max_processes, fresh=fresh, reports=reports,
+                profile=profile, deadline=parse_deadline(deadline), verify_rs=verify_rs)
+
+def next_session_time(hhmm, now=None):
+    """now 이후 처음 돌아오는 거래일의 hhmm(HH:MM) 시각"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in hhmm.split(':'))
+    calendar = CalendarUtil()
+    today = now.strftime('%Y%m%d')
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate > now and calendar.is_session(today):
+        return candidate
+    next_day = datetime.strptime(calendar.next_session(today), '%Y%m%d')
+    return next_day.replace(hour=hour, minute=minute)
+
+def run_daemon(run_at='16:00', prefetch_at=None, max_threads=4, max_processes=0, reports=REPORT_KEYS,
+               profile=False, deadline=None, verify_rs=False):
+    """상주하며 거래일 장 마감 후 run_at 에 리포트를 실행
+
+    텔레그램/게시판 HTTP 세션, 아웃박스, 거래일 달력, 종가 이력 캐시와 종가 상태를
+    실행 간에 재사용한다. prefetch_at 을 지정하면 그 시각에 전 거래일까지의 RS 이력을 미리
+    받아 두어 장 마감 후에는 당일 하루치만 조회한다. SIGINT/SIGTERM 으로 종료한다.
+    """
+    import signal
+    import threading
+    from utils.telegram_util import TelegramUtil
+    from utils.api_util import ApiUtil
+    from utils.outbox_util import OutboxUtil
+    from utils.alert_util import AlertUtil
+    from utils.price_history_util import PriceHistoryUtil
+    from utils.rolling_price_util import RollingPriceUtil
+
+    logger = LoggerUtil().get_logger()
+    telegram = TelegramUtil()
+    outbox = OutboxUtil(telegram, ApiUtil())
+    history = PriceHistoryUtil(PriceHistoryUtil.default_store_path())
+    rolling = RollingPriceUtil()
+
+    stop = threading.Event()
+    def request_stop(signum, frame):
+        logger.info(f"[데몬] 종료 신호 수신 ({signum})")
+        stop.set()
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    def run_job():
+        today = datetime.today().strftime('%Y%m%d')
+        run_reports(today, telegram, outbox, max_threads, max_processes, reports=reports, history=history,
+                    profile=profile, deadline=parse_deadline(deadline), rolling=rolling, verify_rs=verify_rs)
+
+    def prefetch_job():
+        prefetch(reports, history=history, rolling=rolling)
+
+    jobs = [('리포트 실행', run_at, run_job)]
+    if prefetch_at and 'rs' in reports:
+        jobs.append(('이력 미리 조회', prefetch_at, prefetch_job))
+
+    logger.info(f"[데몬] 시작 - 리포트 {run_at}" + (f", 이력 미리 조회 {prefetch_at}" if prefetch_at else ""))
+    while not stop.is_set():
+        when, name, job = min((next_session_time(hhmm), name, job) for name, hhmm, job in jobs)
+        logger.info(f"[데몬] 다음 작업: {name} ({when:%Y-%m-%d %H:%M})")
+        # 절전/시계 변경에 대비해 최대 5분마다 남은 시간을 다시 계산
+        while not stop.is_set() and datetime.now() < when:
+            stop.wait(min(300, (when - datetime.now()).total_seconds()))
+        if stop.is_set():
+            break
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"[데몬] {name} 실패: {str(e)}")
+            AlertUtil().alert('run_daemon', e, f"❌ 데몬 작업 실패\n\n작업: {name}\n{str(e)}")
+            AlertUtil().send_summary()
+    logger.info("[데몬] 종료")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="주식 종목 정보 레포트 생성")
+    parser.add_argument('--flush-outbox', action='store_true',
+                        help="리포트 생성 없이 아웃박스에 남은 전송 작업만 재시도")
+    parser.add_argument('--max-threads', type=int, default=4,
+                        help="동시에 실행할 파이프라인 단계 스레드 수")
+    parser.add_argument('--max-processes', type=int, default=0,
+                        help="RS 점수 일괄 계산에 쓸 프로세스 수 (0이면 현재 프로세스에서 계산)")
+    parser.add_argument('--date', metavar='YYYYMMDD',
+                        help="리포트 기준 거래일 (기본값: 오늘, 카세트 재생 시 녹화한 날짜)")
+    parser.add_argument('--fresh', action='store_true',
+                        help="오늘 체크포인트를 지우고 처음부터 다시 실행")
+    parser.add_argument('--backfill', nargs=2, metavar=('START', 'END'),
+                        help="기간(YYYYMMDD YYYYMMDD) 내 거래일 리포트를 재생성해 archive/ 에 보관")
+    parser.add_argument('--reports', default=','.join(REPORT_KEYS),
+                        help=f"실행할 리포트 목록 (쉼표 구분, 기본값: {','.join(REPORT_KEYS)})")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="백필 시 동시에 처리할 거래일 수")
+    parser.add_argument('--prefetch', action='store_true',
+                        help="다음 장 마감 리포트에 필요한 직전 거래일까지의 이력을 미리 조회해 저장")
+    parser.add_argument('--daemon', action='store_true',
+                        help="상주하며 거래일마다 장 마감 후 리포트 실행")
+    parser.add_argument('--run-at', default=os.getenv('DAEMON_RUN_AT', '16:00'),
+                        help="데몬 모드 리포트 실행 시각 (HH:MM, 기본값: DAEMON_RUN_AT 또는 16:00)")
+    parser.add_argument('--prefetch-at', default=os.getenv('DAEMON_PREFETCH_AT') or None,
+                        help="데몬 모드 장중 이력 미리 조회 시각 (HH:MM, 기본값: DAEMON_PREFETCH_AT)")
+    parser.add_argument('--profile', action='store_true',
+                        help="리포트별 샘플링 프로파일을 profiles/ 에 기록하고 상위 함수를 로그로 출력")
+    parser.add_argument('--deadline', default=os.getenv('RUN_DEADLINE') or None,
+                        help="실행 마감 (HH:MM 시각 또는 분). 넘기면 부분 결과나 직전 데이터로 제시간에 발행 (기본값: RUN_DEADLINE)")
+    parser.add_argument('--verify-rs', action='store_true', default=os.getenv('RS_VERIFY') == '1',
+                        help="RS 증분 계산 결과를 전체 구간 재계산과 비교해 불일치를 알림 (기본값: RS_VERIFY=1)")
+    parser.add_argument('--cassette', choices=['record', 'replay'], default=os.getenv('HTTP_CASSETTE_MODE') or None,
+                        help="외부 HTTP 요청/응답을 카세트에 녹화하거나 카세트에서 재생 (기본값: HTTP_CASSETTE_MODE)")
+    parser.add_argument('--cassette-path', default=os.getenv('HTTP_CASSETTE_PATH') or None,
+                        help="카세트 파일 경로 (기본값: HTTP_CASSETTE_PATH 또는 cassettes/http.pkl.gz)")
+    parser.add_argument('--cassette-latency', default=os.getenv('HTTP_CASSETTE_LATENCY') or None,
+                        help="재생 시 응답 지연 ('recorded' 는 녹화 당시 소요 시간, 숫자는 초)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    reports = [key.strip() for key in args.reports.split(',') if key.strip()]
+    if args.cassette:
+        import tempfile
+        from utils.http_cassette_util import HttpCassetteUtil
+        # 체크포인트/아웃박스/캐시가 남아 있으면 복원된 단계, 완료된 전송, 캐시 적중으로 보내는 요청이
+        # 달라지므로 녹화와 재생 모두 빈 임시 상태 디렉토리에서 실행
+        os.environ['STATE_DIR'] = tempfile.mkdtemp(prefix=f"cassette_{args.cassette}_")
+        cassette = HttpCassetteUtil()
+        cassette.install(args.cassette, args.cassette_path, args.cassette_latency)
+        if args.cassette == 'replay':
+            args.date = args.date or cassette.meta.get('as_of')
+        else:
+            args.date = args.date or datetime.today().strftime('%Y%m%d')
+            cassette.meta['as_of'] = args.date
+        # 거래일 확정 구간(어제까지)이 실행한 날에 따라 달라지지 않도록 달력의 '오늘'도 기준 거래일로 고정
+        CalendarUtil().pin_today(args.date)
+        LoggerUtil().get_logger().info(f"[카세트] 기준 거래일 {args.date}, 상태 디렉토리 {os.environ['STATE_DIR']}")
+    if args.flush_outbox:
+        flush_outbox()
+    elif args.prefetch:
+        prefetch(reports)
+    elif args.daemon:
+        run_daemon(
+            run_at=args.run_at,
+            prefetch_at=args.prefetch_at,
+            max_threads=args.max_threads,
+            max_processes=args.max_processes,
+            reports=reports,
+            profile=args.profile,
+            deadline=args.deadline,
+            verify_rs=args.verify_rs
+        )
+    elif args.backfill:
+        backfill(
+            args.backfill[0], args.backfill[1],
+            reports=reports,
+            workers=args.workers,
+            max_threads=args.max_threads,
+            profile=args.profile
+        )
+    else:
+        main(max_threads=args.max_threads, max_processes=args.max_processes, fresh=args.fresh, reports=reports,
+             profile=args.profile, deadline=args.deadline, verify_rs=args.verify_rs, date=args.date)
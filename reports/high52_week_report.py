@@ -1,5 +1,4 @@
 import pandas as pd
-import time
 from datetime import datetime
 import os
 import imgkit
@@ -7,12 +6,22 @@ import re
 import requests
 import json
 import math
+from utils.image_util import ImageUtil
+from utils.artifact_util import ArtifactUtil
+from utils.metrics_util import MetricsUtil
+from utils.fetch_util import FetchUtil
+from utils.logger_util import LoggerUtil
 
 class High52WeekReport:
     def __init__(self):
         self.today = datetime.now().strftime('%Y-%m-%d')
         self.img_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
         self.wkhtmltoimage_path = os.getenv('WKHTMLTOIMAGE_PATH')
+        self.image_util = ImageUtil()
+        self.artifact_util = ArtifactUtil()
+        self.metrics = MetricsUtil()
+        self.fetch = FetchUtil()
+        self.logger = LoggerUtil().get_logger()
 
     def fetch_high_52w(self, page=1, page_size=100):
         url = f"https://m.stock.naver.com/api/stocks/high52week/all"
@@ -20,13 +29,16 @@ class High52WeekReport:
             "page": page,
             "pageSize": page_size,
         }
-        response = requests.get(url, params=params)
-        data = response.json()
-        return data
+        def request():
+            response = requests.get(url, params=params, timeout=(5, 30))
+            response.raise_for_status()
+            self.metrics.incr('download_bytes', len(response.content), source='naver')
+            return response.json()
+        return self.fetch.call('naver', 'high52week', request, accept=lambda data: 'stocks' in data)
 
     def get_all_52w_high_stocks(self):
         """데이터 수집"""
-        print(f"\n=== 52주 최고가 데이터 네이버 크롤링 시작 ===")
+        self.logger.info("=== 52주 최고가 데이터 네이버 크롤링 시작 ===")
 
         # 1. 첫 페이지 호출해서 전체 페이지 수 계산
         first_page = self.fetch_high_52w(page=1, page_size=100)
@@ -34,7 +46,7 @@ class High52WeekReport:
         page_size = 100
         total_pages = math.ceil(total_count / page_size)
 
-        print(f"전체 종목 수: {total_count} / 총 페이지 수: {total_pages}")
+        self.logger.info(f"전체 종목 수: {total_count} / 총 페이지 수: {total_pages}")
         all_stocks = []
 
         # 2. 모든 페이지 순회해서 종목 수집
@@ -44,9 +56,8 @@ class High52WeekReport:
 
             filtered_stocks = [s for s in stocks if s.get("stockEndType") == "stock"] #stock 종목만 추출
             all_stocks.extend(filtered_stocks)
-            time.sleep(0.2)  # 과도한 요청 방지 (200ms 간격)
 
-        print(f"수집된 종목 수: {len(all_stocks)}")
+        self.logger.info(f"수집된 종목 수: {len(all_stocks)}")
         return all_stocks[:20]
     
     def process_html(self, stocks):
@@ -169,39 +180,41 @@ class High52WeekReport:
         return html_pages
 
     def save_images_from_html(self, html_pages):
-        options = {
-            'format': 'png',
-            'encoding': "UTF-8",
-            'quality': 75,  # 품질을 75%로 낮춰서 파일 크기 감소
-            'width': 768,
-            'enable-local-file-access': None,
-            'minimum-font-size': 12,
-            'quiet': None   # 로그 레벨 조정
-        }
+        options = self.image_util.render_options(
+            768,
+            format='png',
+            **{
+                'minimum-font-size': 12,
+                'quiet': None   # 로그 레벨 조정
+            }
+        )
 
         if not self.wkhtmltoimage_path:
             message = "오류 발생\n\nWKHTMLTOIMAGE_PATH 환경변수가 설정되지 않았습니다."
-            print(message)
+            self.logger.error(message)
 
-            
-        # 이전 파일 삭제
-        for old_file in os.listdir(self.img_dir):
-            if old_file.startswith('high52_week_') and old_file.endswith('.png'):
-                os.remove(os.path.join(self.img_dir, old_file))
-                print(f"기존 파일 삭제: {old_file}")
 
         config = imgkit.config(wkhtmltoimage=self.wkhtmltoimage_path)
         
-        # HTML을 페이지별로 생성하고 이미지 저장
-        image_paths = []
+        # HTML을 페이지별로 렌더링하고 보관은 백그라운드에서 처리
+        artifacts = []
         for page_num, page_html in enumerate(html_pages, 0):
-            file_path = os.path.join(self.img_dir, f"high52_week_{self.today}_report_{page_num}p.png")
-            imgkit.from_string(page_html, file_path, options=options, config=config)
-            print(f"새 파일 저장: {file_path}")
-            image_paths.append(file_path)
+            file_name = f"high52_week_{self.today}_report_{page_num}p.png"
+            artifact = self.artifact_util.render_html(page_html, file_name, options, config)
+            self.logger.info(f"이미지 생성 완료: {artifact}")
+            artifacts.append(artifact)
 
-        return image_paths
+        self.artifact_util.archive(artifacts, self.img_dir, replace_prefix='high52_week_')
+        return artifacts
     
+    def pipeline_stages(self):
+        """파이프라인 단계 선언 (fetch → compute → render)"""
+        return [
+            ('fetch', self.get_all_52w_high_stocks, []),
+            ('compute', self.process_html, ['fetch']),
+            ('render', self.save_images_from_html, ['compute'])
+        ]
+
     def create_report(self):
         stocks = self.get_all_52w_high_stocks()
         html_pages = self.process_html(stocks)
@@ -209,7 +222,19 @@ class High52WeekReport:
         return image_paths
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="52주 신고가 리포트 생성")
+    parser.add_argument('--profile', action='store_true', help="샘플링 프로파일을 profiles/ 에 기록")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile:
+        from utils.profile_util import ProfileUtil
+        profiler = ProfileUtil().start()
     high52_week_report = High52WeekReport()
-    stocks = high52_week_report.get_all_52w_high_stocks()
-    html_pages = high52_week_report.process_html(stocks)
-    image_paths = high52_week_report.save_images_from_html(html_pages)
\ No newline at end of file
+    with high52_week_report.metrics.report('high52'):
+        stocks = high52_week_report.get_all_52w_high_stocks()
+        html_pages = high52_week_report.process_html(stocks)
+        image_paths = high52_week_report.save_images_from_html(html_pages)
+    if profiler:
+        profiler.write(f"high52_{datetime.now().strftime('%Y%m%d')}")
\ No newline at end of file
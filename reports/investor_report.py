@@ -1,15 +1,25 @@
 import pandas as pd
-from pykrx import stock
-import time
-from datetime import datetime, timedelta
-from utils.telegram_util import TelegramUtil
+from datetime import datetime
+from utils.alert_util import AlertUtil
+from utils.image_util import ImageUtil
+from utils.artifact_util import ArtifactUtil
+from utils.metrics_util import MetricsUtil
+from utils.fetch_util import FetchUtil, FetchError, non_empty
+from utils.logger_util import LoggerUtil
 import os
 import imgkit
 import re
 
 class InvestorReport:
+    LOOKBACK_SESSIONS = 10  # 연속 순매수일 계산에 사용하는 거래일 수
+
     def __init__(self):
-        self.telegram = TelegramUtil()
+        self.alert = AlertUtil()
+        self.image_util = ImageUtil()
+        self.artifact_util = ArtifactUtil()
+        self.metrics = MetricsUtil()
+        self.fetch = FetchUtil()
+        self.logger = LoggerUtil().get_logger()
         self.img_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
         self.wkhtmltoimage_path = os.getenv('WKHTMLTOIMAGE_PATH')
         
@@ -23,19 +33,13 @@ class InvestorReport:
         ]
 
     def save_combined_df_as_image(self, dfs, file_name, today_display, market_type):
-        """여러 DataFrame을 하나의 이미지로 저장하고 파일 경로 반환"""
+        """여러 DataFrame을 하나의 이미지로 렌더링하고 이미지 아티팩트 반환"""
         if not file_name.endswith('.png'):
             file_name = file_name + '.png'
             
         file_name, file_extension = os.path.splitext(file_name)
-        current_date = datetime.now().strftime('%Y%m%d')
-        new_file_path = os.path.join(self.img_dir, f"{file_name}_{current_date}{file_extension}")
-        
-        # 이전 파일 삭제
-        for old_file in os.listdir(self.img_dir):
-            if old_file.startswith(file_name) and old_file.endswith(file_extension):
-                os.remove(os.path.join(self.img_dir, old_file))
-                print(f"기존 파일 삭제: {old_file}")
+        current_date = today_display.replace('-', '')
+        new_file_name = f"{file_name}_{current_date}{file_extension}"
 
         # DataFrame 데이터 준비
         columns = []
@@ -150,80 +154,59 @@ class InvestorReport:
         </html>
         '''
 
-        options = {
-            'format': 'png',
-            'encoding': "UTF-8",
-            'quality': 100,
-            'width': 1200 if len(dfs) == 3 else 800,
-            'enable-local-file-access': None,
-            'minimum-font-size': 12
-        }
+        options = self.image_util.render_options(
+            1200 if len(dfs) == 3 else 800,
+            format='png',
+            **{'minimum-font-size': 12}
+        )
 
         try:
             if not self.wkhtmltoimage_path:
                 error_message = "❌ 오류 발생\n\nWKHTMLTOIMAGE_PATH 환경변수가 설정되지 않았습니다."
-                self.telegram.send_test_message(error_message)
+                self.alert.alert('imgkit', 'ConfigError', error_message)
                 raise ValueError("WKHTMLTOIMAGE_PATH 환경변수가 필요합니다.")
                 
             config = imgkit.config(wkhtmltoimage=self.wkhtmltoimage_path)
-            imgkit.from_string(html_str, new_file_path, options=options, config=config)
-            print(f"새 파일 저장: {new_file_path}")
+            artifact = self.artifact_util.render_html(html_str, new_file_name, options, config)
+            self.artifact_util.archive([artifact], self.img_dir, replace_prefix=file_name)
+            self.logger.info(f"이미지 생성 완료: {artifact}")
             
-            return new_file_path
+            return artifact
             
         except Exception as e:
             error_message = f"❌ 오류 발생\n\n함수: save_combined_df_as_image\n파일: {file_name}\n오류: {str(e)}"
-            self.telegram.send_test_message(error_message)
-            print(f"이미지 생성 중 오류 발생: {str(e)}")
+            self.alert.alert('save_combined_df_as_image', e, error_message)
+            self.logger.error(f"이미지 생성 중 오류 발생: {str(e)}")
             return None
 
     def get_top_stocks_by_net_buying(self, market, start_date, end_date, investor, top_n=15):
         """투자자별 순매수 상위 종목 추출"""
-        max_attempts = 5
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                df = stock.get_market_net_purchases_of_equities(start_date, end_date, market, investor)
-                if not df.empty:
-                    top_stocks = df.nlargest(top_n, '순매수거래대금')
-                    return top_stocks[['종목명', '순매수거래대금']]
-            except Exception as e:
-                print(f"데이터 조회 시도 {attempt + 1}/{max_attempts} 실패: {str(e)}")
-            
-            attempt += 1
-            if attempt < max_attempts:
-                print(f"20초 후 재시도합니다...")
-                time.sleep(20)
-        
-        error_message = f"❌ 오류 발생\n\n함수: get_top_stocks_by_net_buying\n시장: {market}\n투자자: {investor}\n기간: {start_date}~{end_date}"
-        self.telegram.send_test_message(error_message)
-        return None
+        from pykrx import stock  # import 시 KRX 로그인/폰트 설정이 일어나므로 실제 조회 시점에 불러옴
+        try:
+            df = self.fetch.call('pykrx', 'get_market_net_purchases_of_equities', stock.get_market_net_purchases_of_equities,
+                                 start_date, end_date, market, investor, accept=non_empty)
+        except FetchError as e:
+            error_message = f"❌ 오류 발생\n\n함수: get_top_stocks_by_net_buying\n시장: {market}\n투자자: {investor}\n기간: {start_date}~{end_date}\n\n{str(e)}"
+            self.alert.alert('get_top_stocks_by_net_buying', e.last_error or e, error_message)
+            return None
+
+        top_stocks = df.nlargest(top_n, '순매수거래대금')
+        return top_stocks[['종목명', '순매수거래대금']]
 
     def get_stock_trading_value_by_date(self, ticker, start_date, end_date, investor, detail=True):
         """종목별 투자자 거래 데이터 조회"""
-        max_attempts = 5
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                df = stock.get_market_trading_value_by_date(start_date, end_date, ticker, detail=detail)
-                if not df.empty:
-                    df_sorted = df.sort_index(ascending=False)
-                    investor_key = '외국인합계' if investor == '외국인' else investor
-                    consecutive_positive_days = self._check_consecutive_positive_days(df_sorted[investor_key])
-                    return consecutive_positive_days
-            except Exception as e:
-                print(f"데이터 조회 시도 {attempt + 1}/{max_attempts} 실패: {str(e)}")
-            
-            attempt += 1
-            if attempt < max_attempts:
-                print(f"20초 후 재시도합니다...")
-                time.sleep(20)
-        
-        error_message = f"❌ 오류 발생\n\n함수: get_stock_trading_value_by_date\n종목: {ticker}\n투자자: {investor}"
-        self.telegram.send_test_message(error_message)
-        return None
+        from pykrx import stock
+        try:
+            df = self.fetch.call('pykrx', 'get_market_trading_value_by_date', stock.get_market_trading_value_by_date,
+                                 start_date, end_date, ticker, detail=detail, accept=non_empty)
+        except FetchError as e:
+            error_message = f"❌ 오류 발생\n\n함수: get_stock_trading_value_by_date\n종목: {ticker}\n투자자: {investor}\n\n{str(e)}"
+            self.alert.alert('get_stock_trading_value_by_date', e.last_error or e, error_message)
+            return None
+
+        df_sorted = df.sort_index(ascending=False)
+        investor_key = '외국인합계' if investor == '외국인' else investor
+        return self._check_consecutive_positive_days(df_sorted[investor_key])
 
     def _check_consecutive_positive_days(self, series):
         """연속 순매수일 계산"""
@@ -247,49 +230,78 @@ class InvestorReport:
         df['순매수거래대금'] = (df['순매수거래대금'] / 100000000).round(2).map('{:,}'.format)
         return df[['종목명', '순매수거래대금']]
 
-    def create_report(self, date, start_date):
-        """투자자별 보고서를 생성하고 이미지 경로 리스트 반환"""
-        markets = ["KOSPI", "KOSDAQ"]
+    def fetch_data(self, market, date, start_date):
+        """시장별 투자자 그룹 순매수 상위 종목과 연속 순매수일 수집
+
+        {그룹 번호: [투자자별 상위 종목 DataFrame]} 반환
+        """
+        self.logger.info(f"=== {market} 시장 투자자 데이터 수집 시작 ===")
+        investor_groups = [
+            self.investors[:3],  # 투신/연기금/사모
+            self.investors[3:]   # 외국인/기관
+        ]
+
+        fetched = {}
+        for group_index, investor_group in enumerate(investor_groups, 1):
+            group_dfs = []
+            for investor_info in investor_group:
+                investor_name = investor_info['name']
+                self.logger.info(f"- {investor_name} 데이터 수집 중...")
+
+                top_stocks = self.get_top_stocks_by_net_buying(
+                    market, date, date, investor_name
+                )
+
+                if top_stocks is not None:
+                    for ticker in top_stocks.index:
+                        consecutive_days = self.get_stock_trading_value_by_date(
+                            ticker, start_date, date, investor_name,
+                            detail=(group_index == 1)
+                        )
+
+                        if consecutive_days is not None:
+                            top_stocks.at[ticker, '연속매수일'] = consecutive_days
+
+                    group_dfs.append(top_stocks)
+                    self.logger.info(f"- {investor_name} 수집 완료")
+            fetched[group_index] = group_dfs
+
+        self.logger.info(f"=== {market} 시장 투자자 데이터 수집 완료 ===")
+        return fetched
+
+    def compute(self, fetched_by_market):
+        """{시장: {그룹 번호: [DataFrame]}} 데이터를 리포트용 DataFrame으로 변환"""
+        return {
+            market: {
+                group_index: [self.transform_df(top_stocks) for top_stocks in group_dfs]
+                for group_index, group_dfs in fetched.items()
+            }
+            for market, fetched in fetched_by_market.items()
+        }
+
+    def render(self, computed, date):
+        """시장/그룹별 이미지를 렌더링하고 이미지 아티팩트 리스트 반환"""
         all_image_paths = []
-        
-        for market in markets:
-            print(f"\n=== {market} 시장 투자자 데이터 처리 시작 ===")
-            investor_groups = [
-                self.investors[:3],  # 투신/연기금/사모
-                self.investors[3:]   # 외국인/기관
-            ]
-            
-            for group_index, investor_group in enumerate(investor_groups, 1):
-                combined_dfs = []
-                for investor_info in investor_group:
-                    investor_name = investor_info['name']
-                    print(f"- {investor_name} 데이터 수집 중...")
-                    
-                    top_stocks = self.get_top_stocks_by_net_buying(
-                        market, date, date, investor_name
-                    )
-                    
-                    if top_stocks is not None:
-                        for ticker in top_stocks.index:
-                            consecutive_days = self.get_stock_trading_value_by_date(
-                                ticker, start_date, date, investor_name,
-                                detail=(group_index == 1)
-                            )
-                            
-                            if consecutive_days is not None:
-                                top_stocks.at[ticker, '연속매수일'] = consecutive_days
-                        
-                        transformed_df = self.transform_df(top_stocks)
-                        combined_dfs.append(transformed_df)
-                        print(f"- {investor_name} 처리 완료")
-                
+        today_display = datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d')
+        for market, groups in computed.items():
+            for group_index, combined_dfs in groups.items():
                 if combined_dfs:
-                    today_display = datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d')
                     file_name = f'combined_investors_{group_index}_{market.lower()}.png'
-                    img_path = self.save_combined_df_as_image(combined_dfs, file_name, today_display, market)
-                    if img_path:
-                        all_image_paths.append(img_path)
-            
-            print(f"=== {market} 시장 투자자 데이터 처리 완료 ===")
-        
-        return all_image_paths
\ No newline at end of file
+                    artifact = self.save_combined_df_as_image(combined_dfs, file_name, today_display, market)
+                    if artifact:
+                        all_image_paths.append(artifact)
+        return all_image_paths
+
+    def pipeline_stages(self, date, start_date):
+        """파이프라인 단계 선언 (시장별 fetch 병렬 → compute → render)"""
+        return [
+            ('fetch_kospi', lambda: self.fetch_data("KOSPI", date, start_date), []),
+            ('fetch_kosdaq', lambda: self.fetch_data("KOSDAQ", date, start_date), []),
+            ('compute', lambda kospi, kosdaq: self.compute({"KOSPI": kospi, "KOSDAQ": kosdaq}), ['fetch_kospi', 'fetch_kosdaq']),
+            ('render', lambda computed: self.render(computed, date), ['compute'])
+        ]
+
+    def create_report(self, date, start_date):
+        """투자자별 보고서를 생성하고 이미지 아티팩트 리스트 반환"""
+        fetched = {market: self.fetch_data(market, date, start_date) for market in ["KOSPI", "KOSDAQ"]}
+        return self.render(self.compute(fetched), date)
@@ -5,6 +5,11 @@ import imgkit
 import os
 from pykrx import stock
 from dotenv import load_dotenv
+from utils.image_util import ImageUtil
+from utils.artifact_util import ArtifactUtil
+from utils.metrics_util import MetricsUtil
+from utils.fetch_util import FetchUtil, non_empty
+from utils.logger_util import LoggerUtil
 
 # .env 파일 로드
 load_dotenv()
@@ -19,6 +24,11 @@ class OperationProfitReport:
         }
         self.min_operating_profit_margin = 30  # 최소 평균 영업이익률 (%)
         self.img_dir = 'img'
+        self.image_util = ImageUtil()
+        self.artifact_util = ArtifactUtil()
+        self.metrics = MetricsUtil()
+        self.fetch = FetchUtil()
+        self.logger = LoggerUtil().get_logger()
         if not os.path.exists(self.img_dir):
             os.makedirs(self.img_dir)
         
@@ -33,8 +43,10 @@ class OperationProfitReport:
         today = datetime.now().strftime('%Y%m%d')
         
         try:
-            kospi_fundamental = stock.get_market_fundamental_by_ticker(today, market="KOSPI", alternative=True)
-            kosdaq_fundamental = stock.get_market_fundamental_by_ticker(today, market="KOSDAQ", alternative=True)
+            kospi_fundamental = self.fetch.call('pykrx', 'get_market_fundamental_by_ticker', stock.get_market_fundamental_by_ticker,
+                                                today, market="KOSPI", alternative=True, accept=non_empty)
+            kosdaq_fundamental = self.fetch.call('pykrx', 'get_market_fundamental_by_ticker', stock.get_market_fundamental_by_ticker,
+                                                 today, market="KOSDAQ", alternative=True, accept=non_empty)
             
             kospi_list = [
                 {'code': ticker, 'name': stock.get_market_ticker_name(ticker)}
@@ -48,13 +60,12 @@ class OperationProfitReport:
                 if kosdaq_fundamental.loc[ticker, 'PER'] > 0
             ]
             
-            print(f"KOSPI 종목 수: {len(kospi_list)}")
-            print(f"KOSDAQ 종목 수: {len(kosdaq_list)}")
+            self.logger.info(f"KOSPI 종목 수: {len(kospi_list)}, KOSDAQ 종목 수: {len(kosdaq_list)}")
             
             return kospi_list, kosdaq_list
             
         except Exception as e:
-            print(f"종목 리스트 가져오기 실패: {e}")
+            self.logger.error(f"종목 리스트 가져오기 실패: {e}")
             return None, None
 
     def get_revenue(self, data, quarter, prev_quarter_data=None):
@@ -150,7 +161,8 @@ class OperationProfitReport:
             
             for _ in range(4):  # 4개 분기 데이터 수집
                 try:
-                    quarter_data = self.dart.finstate(company_code, year, reprt_code=self.quarter_codes[quarter])
+                    quarter_data = self.fetch.call('dart', 'finstate', self.dart.finstate,
+                                                   company_code, year, reprt_code=self.quarter_codes[quarter])
                     
                     if quarter_data is not None and not quarter_data.empty and not isinstance(quarter_data, dict):
                         cfs_data = quarter_data[quarter_data['fs_div'] == 'CFS']
@@ -163,7 +175,8 @@ class OperationProfitReport:
                                 if prev_quarter < 1:
                                     prev_quarter = 4
                                     prev_year -= 1
-                                prev_data = self.dart.finstate(company_code, prev_year, reprt_code=self.quarter_codes[prev_quarter])
+                                prev_data = self.fetch.call('dart', 'finstate', self.dart.finstate,
+                                                            company_code, prev_year, reprt_code=self.quarter_codes[prev_quarter])
                                 if prev_data is not None and not prev_data.empty:
                                     prev_quarter_data = prev_data[prev_data['fs_div'] == 'CFS']
                         
@@ -185,7 +198,7 @@ class OperationProfitReport:
                         year -= 1
                     
                 except Exception as e:
-                    print(f"Error processing {company_name} for {year} Q{quarter}: {e}")
+                    self.logger.warning(f"{company_name} {year}년 {quarter}분기 처리 중 오류 발생: {e}")
                     continue
             
             if len(quarters_data) == 4:  # 4개 분기 데이터가 모두 있는 경우만 처리
@@ -198,7 +211,7 @@ class OperationProfitReport:
                 }
                                 
         except Exception as e:
-            print(f"\n{company_name}({company_code}) 처리 중 오류 발생: {str(e)}")
+            self.logger.warning(f"{company_name}({company_code}) 처리 중 오류 발생: {str(e)}")
         
         return None
 
@@ -350,25 +363,28 @@ class OperationProfitReport:
         """HTML을 이미지로 변환합니다."""
         wkhtmltoimage_path = os.getenv('WKHTMLTOIMAGE_PATH')
         config = imgkit.config(wkhtmltoimage=wkhtmltoimage_path)
-        options = {
-            'width': 800,
-            'enable-local-file-access': None,
-            'encoding': 'UTF-8',
-            'custom-header': [
-                ('Content-Type', 'text/html; charset=UTF-8'),
-            ]
-        }
+        options = self.image_util.render_options(
+            800,
+            format='jpg',
+            **{
+                'custom-header': [
+                    ('Content-Type', 'text/html; charset=UTF-8'),
+                ]
+            }
+        )
 
         try:
-            imgkit.from_string(html_content, output_path, options=options, config=config)
-            print(f"이미지가 {output_path}로 저장되었습니다.")
+            artifact = self.artifact_util.render_html(html_content, os.path.basename(output_path), options, config)
+            self.artifact_util.archive([artifact], os.path.dirname(output_path))
+            self.logger.info(f"이미지가 {output_path}로 저장되었습니다.")
+            return artifact
         except Exception as e:
-            print(f"이미지 변환 중 오류 발생: {e}")
+            self.logger.error(f"이미지 변환 중 오류 발생: {e}")
 
     def process_market_data(self, market_list, market_type):
         """특정 시장(코스피/코스닥)의 데이터를 처리합니다."""
         if not market_list:
-            print(f"{market_type} 종목 리스트를 가져오는데 실패했습니다.")
+            self.logger.error(f"{market_type} 종목 리스트를 가져오는데 실패했습니다.")
             return
             
         total_companies = len(market_list)
@@ -378,7 +394,8 @@ class OperationProfitReport:
         high_opm_count = 0
         
         for idx, company in enumerate(market_list, 1):
-            print(f"[{idx}/{total_companies}] {company['name']} 조회 중... (성공: {success_count}, 실패: {error_count})")
+            LoggerUtil().progress(f"opm.{market_type}", idx, total_companies,
+                                  f"{market_type} 조회 중... (성공: {success_count}, 실패: {error_count})")
             
             data = self.get_company_metrics(company['code'], company['name'])
             if data:
@@ -389,10 +406,10 @@ class OperationProfitReport:
             else:
                 error_count += 1
         
-        print(f"\n{market_type} 데이터 조회 완료!")
-        print(f"전체 종목 수: {total_companies}")
-        print(f"성공: {success_count}, 실패: {error_count}")
-        print(f"영업이익률 {self.min_operating_profit_margin}% 이상 기업 수: {high_opm_count}개")
+        self.logger.info(
+            f"{market_type} 데이터 조회 완료! 전체 종목 수: {total_companies}, 성공: {success_count}, 실패: {error_count}, "
+            f"영업이익률 {self.min_operating_profit_margin}% 이상 기업 수: {high_opm_count}개"
+        )
 
         companies_data.sort(key=lambda x: x['avg_opm'], reverse=True)
 
@@ -407,13 +424,25 @@ class OperationProfitReport:
         kospi_list, kosdaq_list = self.get_stock_market_list()
         self.process_market_data(kospi_list, "KOSPI")
         self.process_market_data(kosdaq_list, "KOSDAQ")
+        self.artifact_util.wait_archived()
+        self.metrics.write(f"opm_{datetime.now().strftime('%Y%m%d')}", job='opm')
 
 # 메인 실행 코드는 그대로 유지
-def main():
+def main(profile=False):
+    profiler = None
+    if profile:
+        from utils.profile_util import ProfileUtil
+        profiler = ProfileUtil().start()
     report = OperationProfitReport()
-    report.run()
+    with report.metrics.report('opm'):
+        report.run()
+    if profiler:
+        profiler.write(f"opm_{datetime.now().strftime('%Y%m%d')}")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="영업이익률 리포트 생성")
+    parser.add_argument('--profile', action='store_true', help="샘플링 프로파일을 profiles/ 에 기록")
+    main(profile=parser.parse_args().profile)
 
 
@@ -1,84 +1,144 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from pykrx import stock
-import matplotlib.pyplot as plt
-from matplotlib import font_manager, rc
-from utils.telegram_util import TelegramUtil
+from datetime import datetime
+from utils.alert_util import AlertUtil
+from utils.image_util import ImageUtil
+from utils.artifact_util import ArtifactUtil
+from utils.metrics_util import MetricsUtil
+from utils.logger_util import LoggerUtil
+from utils.price_history_util import PriceHistoryUtil
+from utils.calendar_util import CalendarUtil
+from utils.fetch_util import FetchUtil, FetchError, CircuitOpenError, DeadlineExceeded, non_empty
+from utils.pipeline_util import degraded_note
+from utils.price_matrix_util import PriceMatrix
 import os
-import time
 import imgkit
 
+def relative_strength(values, benchmark, period):
+    """종목 × 거래일 종가 배열의 마지막 period 거래일 RS 를 한 번에 계산
+
+    (구간 누적 수익률 + 1) 은 구간 마지막 종가 / 첫 종가이므로 종목별 cumprod 없이
+    행 단위로 계산한다. 구간 안에 빈 값/0 종가가 있는 행은 NaN 으로 두고
+    regular=False 로 표시한다 (호출한 쪽에서 종목별 계산으로 처리).
+    """
+    window = np.asarray(values[:, -period:], dtype=np.float64)
+    benchmark = np.asarray(benchmark[-period:], dtype=np.float64)
+    regular = (window > 0).all(axis=1) & (window.shape[1] > 1) & (benchmark > 0).all()
+    rs = np.full(len(window), np.nan)
+    if regular.any():
+        rs[regular] = (window[regular, -1] / window[regular, 0]) / (benchmark[-1] / benchmark[0])
+    return rs, regular
+
+def _relative_strength_rows(handle, benchmark, period, start, stop):
+    """프로세스 작업자: 공유 메모리 가격 행렬의 [start, stop) 행 RS 계산"""
+    matrix = PriceMatrix.attach(handle)
+    try:
+        return relative_strength(matrix.values[start:stop], benchmark, period)
+    finally:
+        matrix.close()
+
 class RSReport:
-    def __init__(self):
-        self.telegram = TelegramUtil()
+    # 시간 예산 초과 시 직전 거래일 랭킹으로 대체할 수 있는 단계
+    FALLBACK_STAGES = ('compute_kospi', 'compute_kosdaq')
+    # 시간 예산 초과 시 처리한 종목 비율이 이 이상이면 부분 랭킹을 사용
+    PARTIAL_MIN_COVERAGE = float(os.getenv('RS_PARTIAL_MIN_COVERAGE', 0.8))
+    # 가격 행렬이 이 행 수 이상이면 processes 개 프로세스로 나눠 계산
+    # (시장 전체를 한 번에 계산하므로 KOSPI 약 950, KOSDAQ 약 1,700 종목 모두 해당)
+    PROCESS_MIN_ROWS = 500
+    VERIFY_TOLERANCE = 1e-6  # 증분 계산 검증 시 허용하는 정규화 점수 차이
+
+    def __init__(self, history=None, processes=0, rolling=None, verify=False):
+        self.alert = AlertUtil()
+        self.image_util = ImageUtil()
+        self.artifact_util = ArtifactUtil()
+        self.metrics = MetricsUtil()
+        self.fetch = FetchUtil()
+        self.logger = LoggerUtil().get_logger()
         self.img_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
         self.wkhtmltoimage_path = os.getenv('WKHTMLTOIMAGE_PATH')
         self.kospi_benchmark = '1001'  # KOSPI 지수
         self.kosdaq_benchmark = '2001'  # KOSDAQ 지수
-        self.update_market_lists()
+        self.kospi_tickers = None
+        self.kosdaq_tickers = None
+        self.checkpoint = None  # 설정 시 종목별 조회 진행 상황을 주기적으로 저장
+        self.checkpoint_interval = 100  # 진행 상황 저장 간격 (조회한 종목 수)
+        self.as_of = None  # 기준일 (YYYYMMDD), None 이면 오늘
+        # 종목/지수 종가 이력 캐시 (백필 시 여러 날짜가 공유)
+        self.history = history or PriceHistoryUtil()
+        self.calendar = CalendarUtil()
+        self.processes = processes  # RS 일괄 계산에 쓸 프로세스 수 (0/1 이면 현재 프로세스)
+        # 종가 상태(RollingPriceUtil), 지정 시 전 거래일 상태에 당일 종가만 반영해 RS 계산
+        self.rolling = rolling
+        self.verify = verify  # 증분 계산 결과를 전체 재계산과 비교
+
+    def _as_of_date(self):
+        return datetime.strptime(self.as_of, '%Y%m%d') if self.as_of else datetime.today()
 
     def update_market_lists(self):
         """KOSPI와 KOSDAQ 종목 리스트를 업데이트합니다."""
-        self.kospi_tickers = set(stock.get_market_ticker_list(market="KOSPI"))
-        self.kosdaq_tickers = set(stock.get_market_ticker_list(market="KOSDAQ"))
+        from pykrx import stock  # import 시 KRX 로그인/폰트 설정이 일어나므로 실제 조회 시점에 불러옴
+        date = self._as_of_date().strftime('%Y%m%d')
+        self.kospi_tickers = set(self.fetch.call('pykrx', 'get_market_ticker_list', stock.get_market_ticker_list,
+                                                 date, market="KOSPI", accept=bool))
+        self.kosdaq_tickers = set(self.fetch.call('pykrx', 'get_market_ticker_list', stock.get_market_ticker_list,
+                                                  date, market="KOSDAQ", accept=bool))
 
     def _get_market_type(self, ticker):
         """주어진 티커의 시장 유형(KOSPI/KOSDAQ)을 판단합니다."""
+        if self.kospi_tickers is None or self.kosdaq_tickers is None:
+            self.update_market_lists()
         if ticker in self.kospi_tickers:
             return 'KOSPI', self.kospi_benchmark
         elif ticker in self.kosdaq_tickers:
             return 'KOSDAQ', self.kosdaq_benchmark
         else:
-            print(f"경고: {ticker}에 대한 시장을 찾을 수 없습니다. KOSPI를 기본값으로 사용합니다.")
+            self.logger.warning(f"{ticker}에 대한 시장을 찾을 수 없습니다. KOSPI를 기본값으로 사용합니다.")
             return 'UNKNOWN', self.kospi_benchmark
 
     def _get_data(self, ticker, start_date, end_date):
-        """주어진 기간 동안의 종목 가격 데이터를 가져옵니다."""
-        max_attempts = 5
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                df = stock.get_market_ohlcv_by_date(start_date, end_date, ticker)
-                if not df.empty:
-                    return df['종가']
-            except Exception as e:
-                print(f"데이터 조회 시도 {attempt + 1}/{max_attempts} 실패: {str(e)}")
-            
-            attempt += 1
-            if attempt < max_attempts:
-                print(f"20초 후 재시도합니다...")
-                time.sleep(20)
-        
-        error_message = f"❌ 오류 발생\n\n함수: _get_data\n종목: {ticker}\n기간: {start_date}~{end_date}\n\n5회 재시도 모두 실패"
-        self.telegram.send_test_message(error_message)
-        return None
+        """주어진 기간 동안의 종목 가격 데이터를 가져옵니다. (이력 캐시 경유)"""
+        return self.history.get(('stock', ticker), start_date, end_date,
+                                lambda start, end: self._fetch_data(ticker, start, end))
 
     def _get_index_data(self, index_code, start_date, end_date):
-        """주어진 기간 동안의 지수 데이터를 가져옵니다."""
-        max_attempts = 5
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                df = stock.get_index_ohlcv_by_date(start_date, end_date, index_code)
-                if not df.empty:
-                    return df['종가']
-            except Exception as e:
-                print(f"데이터 조회 시도 {attempt + 1}/{max_attempts} 실패: {str(e)}")
-            
-            attempt += 1
-            if attempt < max_attempts:
-                print(f"20초 후 재시도합니다...")
-                time.sleep(20)
-        
-        error_message = f"❌ 오류 발생\n\n함수: _get_index_data\n지수: {index_code}\n기간: {start_date}~{end_date}\n\n5회 재시도 모두 실패"
-        self.telegram.send_test_message(error_message)
-        return None
+        """주어진 기간 동안의 지수 데이터를 가져옵니다. (이력 캐시 경유)"""
+        return self.history.get(('index', index_code), start_date, end_date,
+                                lambda start, end: self._fetch_index_data(index_code, start, end))
+
+    def _fetch_data(self, ticker, start_date, end_date):
+        """주어진 기간 동안의 종목 가격 데이터를 조회합니다.
+
+        회로 차단/시간 예산 초과는 종목 하나의 실패가 아니므로 호출한 쪽으로 넘긴다.
+        """
+        from pykrx import stock
+        try:
+            df = self.fetch.call('pykrx', 'get_market_ohlcv_by_date', stock.get_market_ohlcv_by_date,
+                                 start_date, end_date, ticker, accept=non_empty)
+            return df['종가']
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except FetchError as e:
+            error_message = f"❌ 오류 발생\n\n함수: _get_data\n종목: {ticker}\n기간: {start_date}~{end_date}\n\n{str(e)}"
+            self.alert.alert('_get_data', e.last_error or e, error_message)
+            return None
+
+    def _fetch_index_data(self, index_code, start_date, end_date):
+        """주어진 기간 동안의 지수 데이터를 조회합니다."""
+        from pykrx import stock
+        try:
+            df = self.fetch.call('pykrx', 'get_index_ohlcv_by_date', stock.get_index_ohlcv_by_date,
+                                 start_date, end_date, index_code, accept=non_empty)
+            return df['종가']
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except FetchError as e:
+            error_message = f"❌ 오류 발생\n\n함수: _get_index_data\n지수: {index_code}\n기간: {start_date}~{end_date}\n\n{str(e)}"
+            self.alert.alert('_get_index_data', e.last_error or e, error_message)
+            return None
 
     def get_stock_name(self, ticker):
         """주식 코드에 해당하는 종목명을 반환합니다."""
+        from pykrx import stock
         try:
             return stock.get_market_ticker_name(ticker)
         except:
@@ -106,9 +166,8 @@ class RSReport:
 
     def calculate_rs(self, ticker, periods=[20, 60, 120]):
         """주어진 기간들에 대해 RS 값을 계산합니다."""
-        end_date = datetime.today().strftime('%Y%m%d')
-        max_period = max(periods)
-        start_date = (datetime.today() - timedelta(days=max_period * 2)).strftime('%Y%m%d')
+        # 가장 긴 기간에 필요한 거래일만 정확히 조회
+        start_date, end_date = self.calendar.window(self._as_of_date().strftime('%Y%m%d'), max(periods))
 
         market_type, benchmark_ticker = self._get_market_type(ticker)
         
@@ -133,77 +192,327 @@ class RSReport:
             return rs_scores, market_type
         return None, market_type
 
-    def get_market_rs_ranking(self, market, period=20, top_n=15):
-        """특정 시장의 RS 랭킹을 계산합니다."""
-        max_attempts = 5
-        attempt = 0
-        
-        while attempt < max_attempts:
+    def _relative_strength(self, tickers, benchmark_data, period):
+        """가격을 받아 둔 종목들의 RS 를 공통 날짜의 float32 가격 행렬로 한 번에 계산
+
+        행렬이 크고 processes 가 2 이상이면 공유 메모리에 만들어 행 구간별로
+        프로세스 작업자에게 나눈다. 빈 값/0 종가가 섞인 종목만 종목별로 계산한다.
+        """
+        start_date, end_date = self.calendar.window(self._as_of_date().strftime('%Y%m%d'), period)
+        benchmark = benchmark_data.to_numpy(np.float64)
+        shared = self.processes > 1 and len(tickers) >= self.PROCESS_MIN_ROWS
+        with self.history.matrix([('stock', ticker) for ticker in tickers], benchmark_data.index,
+                                 labels=tickers, shared=shared) as matrix:
+            if shared:
+                rs_values, regular = self._relative_strength_parallel(matrix, benchmark, period)
+            else:
+                rs_values, regular = relative_strength(matrix.values, benchmark, period)
+
+        for row in np.flatnonzero(~regular):
+            stock_data = self._get_data(tickers[row], start_date, end_date)
             try:
-                print(f"\n{market} 시장 {period}일 RS 점수 계산 시작...")
-                
-                # 해당 시장의 모든 종목 코드 가져오기
-                tickers = stock.get_market_ticker_list(market=market)
-                if not tickers:
-                    raise Exception("종목 리스트를 가져오는데 실패했습니다.")
-                
-                results = []
-                for i, ticker in enumerate(tickers, 1):
-                    try:
-                        if i % 50 == 0:
-                            print(f"진행중... {i}/{len(tickers)} 종목 처리완료")
-                        
-                        rs_scores, _ = self.calculate_rs_with_score(ticker, [period])
-                        if rs_scores:
-                            stock_name = self.get_stock_name(ticker)
-                            results.append({
-                                '종목코드': ticker,
-                                '종목명': stock_name,
-                                'RS점수': rs_scores[period]
-                            })
-                        
-                        time.sleep(0.1)  # API 호출 제한 방지
-                        
-                    except Exception as e:
-                        print(f"종목 {ticker} 처리 중 오류 발생: {str(e)}")
-                        continue
-                
-                df = pd.DataFrame(results)
-                if not df.empty:
-                    df = df.sort_values('RS점수', ascending=False)
-                    df['RS점수'] = df['RS점수'].round(2)
-                    return df.head(top_n)
-                
-                return pd.DataFrame()
-                
+                rs_values[row] = self._calculate_single_rs(stock_data, benchmark_data, period)
             except Exception as e:
-                print(f"데이터 조회 시도 {attempt + 1}/{max_attempts} 실패: {str(e)}")
-                
-            attempt += 1
-            if attempt < max_attempts:
-                print(f"20초 후 재시도합니다...")
-                time.sleep(20)
-        
-        error_message = f"❌ 오류 발생\n\n함수: get_market_rs_ranking\n시장: {market}\n기간: {period}\n\n5회 재시도 모두 실패"
-        self.telegram.send_test_message(error_message)
-        return None
+                self.logger.warning(f"종목 {tickers[row]} RS 계산 중 오류 발생: {str(e)}")
+        return rs_values
+
+    def _relative_strength_parallel(self, matrix, benchmark, period):
+        """공유 메모리 가격 행렬을 행 구간으로 나눠 프로세스 작업자에서 RS 계산"""
+        from concurrent.futures import ProcessPoolExecutor
+        handle = matrix.handle()
+        bounds = np.linspace(0, len(matrix.tickers), self.processes + 1).astype(int)
+        count = len(bounds) - 1
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            parts = list(executor.map(_relative_strength_rows, [handle] * count, [benchmark] * count,
+                                      [period] * count, bounds[:-1], bounds[1:]))
+        return np.concatenate([rs for rs, _ in parts]), np.concatenate([regular for _, regular in parts])
+
+    def _score(self, tickers, period):
+        """가격을 받아 둔 종목들의 정규화 RS 점수 결과 목록 (지수별로 묶어 일괄 계산)"""
+        start_date, end_date = self.calendar.window(self._as_of_date().strftime('%Y%m%d'), period)
+        by_benchmark = {}
+        for ticker in tickers:
+            by_benchmark.setdefault(self._get_market_type(ticker)[1], []).append(ticker)
+
+        results = []
+        for benchmark_ticker, group in by_benchmark.items():
+            benchmark_data = self._get_index_data(benchmark_ticker, start_date, end_date)
+            if benchmark_data is None:
+                continue
+            for ticker, rs in zip(group, self._relative_strength(group, benchmark_data, period)):
+                results.append({
+                    '종목코드': ticker,
+                    '종목명': self.get_stock_name(ticker),
+                    'RS점수': self.normalize_rs(rs)
+                })
+        return results
+
+    def _advance_rolling(self, date):
+        """종가 상태를 date 까지 반영 (전 거래일까지의 상태가 없으면 False)
+
+        전 종목 당일 종가는 시장 전체 조회 1회로, 지수는 당일 하루치만 조회한다.
+        """
+        from pykrx import stock
+        rolling = self.rolling
+        with rolling.lock:
+            if rolling.last_session == date:
+                return True
+            if rolling.last_session is None or rolling.last_session != self.calendar.sessions_before(date, 1):
+                self.logger.info(f"종가 상태가 전 거래일 기준이 아니어서 전체 계산 ({rolling.last_session or '없음'})")
+                return False
+            ohlcv = self.fetch.call('pykrx', 'get_market_ohlcv', stock.get_market_ohlcv, date=date, market="ALL",
+                                    accept=lambda df: not df.empty and {'종가', '등락률'}.issubset(df.columns))
+            closes = ohlcv['종가'].astype(float).rename(lambda ticker: rolling.label('stock', ticker))
+            changes = ohlcv['등락률'].rename(lambda ticker: rolling.label('stock', ticker))
+            for benchmark in [self.kospi_benchmark, self.kosdaq_benchmark]:
+                index = self.fetch.call('pykrx', 'get_index_ohlcv_by_date', stock.get_index_ohlcv_by_date,
+                                        date, date, benchmark, accept=non_empty)
+                closes[rolling.label('index', benchmark)] = index['종가'].iloc[-1]
+            stale = rolling.advance(date, closes, changes)
+            self.logger.info(f"종가 상태 {date} 반영 ({len(closes)}건, 전체 이력 재조회 대상 {len(stale)}건)")
+            return True
+
+    def _rs_single(self, ticker, benchmark_ticker, period):
+        """종목 하나의 RS 를 구간 이력으로 계산 (가격이 없으면 None)"""
+        start_date, end_date = self.calendar.window(self._as_of_date().strftime('%Y%m%d'), period)
+        stock_data = self._get_data(ticker, start_date, end_date)
+        benchmark_data = self._get_index_data(benchmark_ticker, start_date, end_date)
+        if stock_data is None or benchmark_data is None:
+            return None
+        try:
+            return self._calculate_single_rs(stock_data, benchmark_data, period)
+        except Exception as e:
+            self.logger.warning(f"종목 {ticker} RS 계산 중 오류 발생: {str(e)}")
+            return None
+
+    def rolling_scores(self, tickers, periods=(20, 60, 120)):
+        """종가 상태로 기간별 정규화 RS 점수 {기간: {종목: 점수}} 계산
+
+        기간마다 구간 첫/마지막 종가만 보므로 종목 수에 비례하는 비용이다. 구간 안에
+        빈 값/0 종가가 있는 종목만 종목별로 계산하며, 가격이 없는 종목은 제외한다.
+        """
+        label = self.rolling.label
+        by_benchmark = {}
+        for ticker in tickers:
+            by_benchmark.setdefault(self._get_market_type(ticker)[1], []).append(ticker)
+
+        scores = {period: {} for period in periods}
+        for benchmark_ticker, group in by_benchmark.items():
+            values = self.rolling.values([label('stock', ticker) for ticker in group])
+            benchmark = self.rolling.values([label('index', benchmark_ticker)])[0]
+            for period in periods:
+                rs_values, regular = relative_strength(values, benchmark, period)
+                for row, ticker in enumerate(group):
+                    rs = rs_values[row] if regular[row] else self._rs_single(ticker, benchmark_ticker, period)
+                    if rs is not None:
+                        scores[period][ticker] = self.normalize_rs(rs)
+        return scores
+
+    def get_market_rs_ranking_incremental(self, market, period=20, top_n=15):
+        """전 거래일까지의 종가 상태에 당일 종가만 반영해 RS 랭킹 계산 (상태를 쓸 수 없으면 None)
+
+        상태에 없거나 과거 종가가 수정된 종목만 상태 구간 전체를 다시 조회한다.
+        verify 가 켜져 있으면 전체 재계산 결과와 비교해 기록한다.
+        """
+        from pykrx import stock
+        date = self._as_of_date().strftime('%Y%m%d')
+        if self.rolling is None or not self._advance_rolling(date):
+            return None
+        self.logger.info(f"{market} 시장 {period}일 RS 점수 증분 계산 시작...")
+        tickers = self.fetch.call('pykrx', 'get_market_ticker_list', stock.get_market_ticker_list,
+                                  date, market=market, accept=bool)
+
+        start_date, end_date = self.calendar.window(date, self.rolling.sessions)
+        label = self.rolling.label
+        benchmark = self.kospi_benchmark if market == "KOSPI" else self.kosdaq_benchmark
+        with self.rolling.lock:
+            revised = [ticker for ticker in tickers if label('stock', ticker) in self.rolling.stale]
+            refresh = revised + [ticker for ticker in tickers if label('stock', ticker) not in self.rolling.matrix.rows]
+            refresh_benchmark = np.isnan(self.rolling.values([label('index', benchmark)])).any()
+        if refresh_benchmark:
+            index = self._get_index_data(benchmark, start_date, end_date)
+            if index is not None:
+                self.rolling.put(label('index', benchmark), index)
+        # 과거 종가가 수정된 종목은 미리 조회해 둔 이력도 수정 전 값이므로 버리고 전체 구간을 다시 조회
+        for ticker in revised:
+            self.history.discard(('stock', ticker))
+        for ticker in refresh:
+            stock_data = self._get_data(ticker, start_date, end_date)
+            if stock_data is not None:
+                self.rolling.put(label('stock', ticker), stock_data)
+
+        scores = self.rolling_scores(tickers, [period])[period]
+        if self.verify:
+            self._verify_rolling(market, tickers, period, scores)
+        self.rolling.save()
+
+        results = [{'종목코드': ticker, '종목명': self.get_stock_name(ticker), 'RS점수': score}
+                   for ticker, score in scores.items()]
+        return self._ranking(results, top_n)
+
+    def _verify_rolling(self, market, tickers, period, scores):
+        """증분 계산 점수를 구간 이력 전체로 다시 계산한 점수와 비교"""
+        start_date, end_date = self.calendar.window(self._as_of_date().strftime('%Y%m%d'), period)
+        fetched = [ticker for ticker in tickers if self._get_data(ticker, start_date, end_date) is not None]
+        full = {row['종목코드']: row['RS점수'] for row in self._score(fetched, period)}
+        mismatched = sorted(
+            ticker for ticker in set(full) | set(scores)
+            if ticker not in full or ticker not in scores or abs(full[ticker] - scores[ticker]) > self.VERIFY_TOLERANCE
+        )
+        self.metrics.incr('rs_verify_mismatches', len(mismatched), market=market)
+        if not mismatched:
+            self.logger.info(f"[RS 검증] {market} {period}일: {len(full)}개 종목 증분 계산과 전체 재계산 일치")
+            return
+        samples = ', '.join(f"{ticker}({scores.get(ticker)} / {full.get(ticker)})" for ticker in mismatched[:10])
+        error_message = (f"❌ RS 증분 계산 불일치\n\n시장: {market}\n기간: {period}\n"
+                         f"불일치: {len(mismatched)}/{len(full)}개 종목 (증분 / 전체)\n{samples}")
+        self.alert.alert('_verify_rolling', 'Mismatch', error_message)
+
+    def _rebuild_rolling(self, market):
+        """전체 계산을 마친 시장의 종목/지수 종가로 종가 상태 구성 (다음 거래일부터 증분 계산)"""
+        from pykrx import stock
+        date = self._as_of_date().strftime('%Y%m%d')
+        start_date, end_date = self.calendar.window(date, self.rolling.sessions)
+        benchmark = self.kospi_benchmark if market == "KOSPI" else self.kosdaq_benchmark
+        index = self._get_index_data(benchmark, start_date, end_date)
+        if index is None:
+            return
+        tickers = self.fetch.call('pykrx', 'get_market_ticker_list', stock.get_market_ticker_list,
+                                  date, market=market, accept=bool)
+        label = self.rolling.label
+        matrix = self.history.matrix([('stock', ticker) for ticker in tickers], index.index,
+                                     labels=[label('stock', ticker) for ticker in tickers])
+        # 이번 실행에서 이력을 받지 않은 종목(체크포인트에서 이어받은 종목 등)은 상태에 넣지 않아
+        # 다음 증분 계산 때 전체 이력으로 채우게 함
+        fetched = ~np.isnan(matrix.values).all(axis=1)
+        matrix = PriceMatrix(matrix.values[fetched], matrix.dates,
+                             [ticker for ticker, keep in zip(matrix.tickers, fetched) if keep])
+        with self.rolling.lock:
+            if self.rolling.last_session != date:
+                self.rolling.reset(index.index)
+            self.rolling.put(label('index', benchmark), index)
+            self.rolling.put_matrix(matrix)
+            self.rolling.save()
+        self.logger.info(f"종가 상태 구성: {market} {len(tickers)}개 종목 ({date}까지)")
+
+    def _history_sessions(self, period):
+        """전체 계산 시 종목별로 조회하는 거래일 수
+
+        종가 상태를 쓰면 다음 거래일부터 증분 계산하도록 상태 구간 전체를 조회한다.
+        """
+        return max(period, self.rolling.sessions) if self.rolling is not None else period
+
+    def _load_progress(self, key):
+        """RS 계산 부분 진행 상황 (조회를 마친 종목, 그중 가격이 있는 종목) 조회"""
+        empty = {'processed': set(), 'fetched': []}
+        if self.checkpoint is None:
+            return empty
+        return self.checkpoint.load_partial('rs', key, empty)
+
+    def _save_progress(self, key, progress):
+        if self.checkpoint is None:
+            return
+        # 체크포인트에는 조회한 종목만 남기므로, 재실행이 가격을 다시 조회하지 않도록 이력 저장소도 기록
+        try:
+            self.history.save()
+        except OSError as e:
+            self.logger.warning(f"종가 이력 저장 실패: {str(e)}")
+        self.checkpoint.save_partial('rs', key, progress)
+
+    @MetricsUtil.timed('RSReport.get_market_rs_ranking')
+    def get_market_rs_ranking(self, market, period=20, top_n=15):
+        """특정 시장의 RS 랭킹을 계산합니다.
+
+        종목별로는 가격만 조회하고(조회를 마친 종목은 체크포인트에 보관), RS 는 조회가
+        끝난 뒤 시장 전체 가격 행렬로 한 번에 계산한다. 재시도는 종목 단위 조회에서만
+        일어나며, 회로 차단/시간 예산 초과 시에는 남은 종목을 건너뛰지 않고 즉시 중단한다.
+        시간 예산 초과 시 조회한 종목이 PARTIAL_MIN_COVERAGE 이상이면 그 종목들만으로
+        만든 부분 랭킹(attrs['partial'] 표시)을 반환하고, 아니면 DeadlineExceeded 를
+        그대로 던져 파이프라인이 직전 데이터로 대체하게 한다.
+        """
+        from pykrx import stock
+        self.logger.info(f"{market} 시장 {period}일 RS 점수 계산 시작...")
+
+        # 이전 실행/시도에서 처리한 종목은 체크포인트에서 이어받음
+        progress_key = f"{market.lower()}_{period}"
+        progress = self._load_progress(progress_key)
+        processed = progress['processed']
+        fetched = progress['fetched']
+        if processed:
+            self.logger.info(f"체크포인트에서 {len(processed)}개 종목 진행 상황 복원")
+
+        tickers = None
+        try:
+            # 해당 시장의 모든 종목 코드 가져오기
+            tickers = self.fetch.call('pykrx', 'get_market_ticker_list', stock.get_market_ticker_list,
+                                      self._as_of_date().strftime('%Y%m%d'), market=market, accept=bool)
+
+            # 종목별로는 가격만 받아 두고, RS 는 조회가 끝난 뒤 시장 전체 가격 행렬로 한 번에 계산
+            start_date, end_date = self.calendar.window(self._as_of_date().strftime('%Y%m%d'),
+                                                        self._history_sessions(period))
+            for i, ticker in enumerate(tickers, 1):
+                if ticker in processed:
+                    continue
+                try:
+                    LoggerUtil().progress(f"rs.{progress_key}", i, len(tickers), f"{market} RS 계산 진행중")
+                    if self._get_data(ticker, start_date, end_date) is not None:
+                        fetched.append(ticker)
+                    processed.add(ticker)
+                    if len(processed) % self.checkpoint_interval == 0:
+                        self._save_progress(progress_key, progress)
+
+                except (CircuitOpenError, DeadlineExceeded):
+                    raise
+                except Exception as e:
+                    self.logger.warning(f"종목 {ticker} 처리 중 오류 발생: {str(e)}")
+                    continue
+            self._save_progress(progress_key, progress)
+
+        except DeadlineExceeded:
+            self._save_progress(progress_key, progress)
+            done = len(processed.intersection(tickers or ()))
+            if not tickers or done < len(tickers) * self.PARTIAL_MIN_COVERAGE:
+                raise
+            self.logger.warning(f"{market} 시간 예산 초과, 처리한 {done}/{len(tickers)}개 종목으로 부분 랭킹 생성")
+            df = self._ranking(self._score(self._listed(fetched, tickers), period), top_n)
+            df.attrs['partial'] = (done, len(tickers))
+            return df
+        except FetchError as e:
+            self._save_progress(progress_key, progress)
+            error_message = f"❌ 오류 발생\n\n함수: get_market_rs_ranking\n시장: {market}\n기간: {period}\n\n{str(e)}"
+            self.alert.alert('get_market_rs_ranking', e, error_message)
+            return None
+
+        return self._ranking(self._score(self._listed(fetched, tickers), period), top_n)
+
+    @staticmethod
+    def _listed(fetched, tickers):
+        """체크포인트에서 이어받은 종목 중 당일 종목 리스트에 있는 종목만 (조회 순서 유지)"""
+        listed = set(tickers)
+        return [ticker for ticker in fetched if ticker in listed]
+
+    def _ranking(self, results, top_n):
+        """종목별 RS 점수 목록을 점수 순 상위 top_n DataFrame 으로 변환"""
+        df = pd.DataFrame(results)
+        if not df.empty:
+            df = df.sort_values('RS점수', ascending=False)
+            df['RS점수'] = df['RS점수'].round(2)
+            return df.head(top_n)
+
+        return pd.DataFrame()
 
     def save_rs_ranking_as_image(self, df, market, period, today_display):
-        """RS 랭킹 데이터를 이미지로 저장하고 파일 경로 반환"""
+        """RS 랭킹 데이터를 이미지로 렌더링하고 이미지 아티팩트 반환"""
         if df is None or df.empty:
             return None
 
         file_name = f'rs_ranking_{market.lower()}_{period}'
-        current_date = datetime.now().strftime('%Y%m%d')
-        new_file_path = os.path.join(self.img_dir, f"{file_name}_{current_date}.png")
-        
-        # 이전 파일 삭제
-        for old_file in os.listdir(self.img_dir):
-            if old_file.startswith(file_name) and old_file.endswith('.png'):
-                os.remove(os.path.join(self.img_dir, old_file))
-                print(f"기존 파일 삭제: {old_file}")
+        current_date = today_display.replace('-', '')
+        new_file_name = f"{file_name}_{current_date}.png"
 
         title = f"{today_display} {market} {period}일 RS 랭킹 TOP 15"
+        note = degraded_note(df)
+        notice = f'<div class="notice">{note}</div>' if note else ''
 
         html_str = f'''
         <!DOCTYPE html>
@@ -257,67 +566,138 @@ class RSReport:
                     margin-top: 15px;
                     font-weight: 400;
                 }}
+                .notice {{
+                    text-align: center;
+                    font-size: 14px;
+                    font-weight: 500;
+                    color: #c0392b;
+                }}
             </style>
         </head>
         <body>
             <div class="caption">{title}</div>
+            {notice}
             {df.to_html(index=False, classes='styled-table')}
             <div class="source">※ 출처 : MQ(Money Quotient)</div>
         </body>
         </html>
         '''
 
-        options = {
-            'format': 'png',
-            'encoding': "UTF-8",
-            'quality': 100,
-            'width': 600,
-            'enable-local-file-access': None,
-            'minimum-font-size': 12
-        }
+        options = self.image_util.render_options(
+            600,
+            format='png',
+            **{'minimum-font-size': 12}
+        )
 
         try:
             if not self.wkhtmltoimage_path:
                 error_message = "❌ 오류 발생\n\nWKHTMLTOIMAGE_PATH 환경변수가 설정되지 않았습니다."
-                self.telegram.send_test_message(error_message)
+                self.alert.alert('imgkit', 'ConfigError', error_message)
                 raise ValueError("WKHTMLTOIMAGE_PATH 환경변수가 필요합니다.")
                 
             config = imgkit.config(wkhtmltoimage=self.wkhtmltoimage_path)
-            imgkit.from_string(html_str, new_file_path, options=options, config=config)
-            print(f"새 파일 저장: {new_file_path}")
+            artifact = self.artifact_util.render_html(html_str, new_file_name, options, config)
+            self.artifact_util.archive([artifact], self.img_dir, replace_prefix=file_name)
+            self.logger.info(f"이미지 생성 완료: {artifact}")
             
-            return new_file_path
+            return artifact
             
         except Exception as e:
             error_message = f"❌ 오류 발생\n\n함수: save_rs_ranking_as_image\n파일: {file_name}\n오류: {str(e)}"
-            self.telegram.send_test_message(error_message)
-            print(f"이미지 생성 중 오류 발생: {str(e)}")
+            self.alert.alert('save_rs_ranking_as_image', e, error_message)
+            self.logger.error(f"이미지 생성 중 오류 발생: {str(e)}")
             return None
 
-    def create_report(self, date_str, period=20):
-        """RS 보고서를 생성하고 이미지 경로 리스트 반환"""
-        markets = ["KOSPI", "KOSDAQ"]
+    def compute_market(self, market, period=20):
+        """시장별 RS 랭킹을 계산하고 리포트용 DataFrame 반환"""
+        self.logger.info(f"=== {market} 시장 RS 데이터 처리 시작 ===")
+        self.logger.info(f"{market} {period}일 RS 랭킹 계산 중...")
+        ranking_df = None
+        if self.rolling is not None:
+            try:
+                ranking_df = self.get_market_rs_ranking_incremental(market, period)
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except FetchError as e:
+                self.logger.warning(f"{market} RS 증분 계산 실패, 전체 계산으로 진행: {str(e)}")
+        if ranking_df is None:
+            ranking_df = self.get_market_rs_ranking(market, period)
+            if self.rolling is not None and ranking_df is not None and 'partial' not in ranking_df.attrs:
+                self._rebuild_rolling(market)
+
+        transformed_df = None
+        if ranking_df is not None and not ranking_df.empty:
+            transformed_df = self.transform_df(ranking_df)
+            transformed_df.attrs.update(ranking_df.attrs)  # 부분 랭킹 표시 유지
+            self.logger.info(f"{market} {period}일 RS 랭킹 계산 완료")
+
+        self.logger.info(f"=== {market} 시장 RS 데이터 처리 완료 ===")
+        return transformed_df
+
+    def render(self, rankings, date_str, period=20):
+        """{시장: 랭킹 DataFrame} 을 이미지로 렌더링하고 이미지 아티팩트 리스트 반환"""
         image_paths = []
         today_display = datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
+        for market, transformed_df in rankings.items():
+            if transformed_df is not None:
+                artifact = self.save_rs_ranking_as_image(transformed_df, market, period, today_display)
+                if artifact:
+                    image_paths.append(artifact)
+        return image_paths
+
+    def pipeline_stages(self, date_str, period=20, checkpoint=None):
+        """파이프라인 단계 선언 (종목 리스트 fetch → 시장별 compute 병렬 → render)"""
+        self.checkpoint = checkpoint
+        self.as_of = date_str
+        return [
+            ('fetch', self.update_market_lists, []),
+            ('compute_kospi', lambda _: self.compute_market("KOSPI", period), ['fetch']),
+            ('compute_kosdaq', lambda _: self.compute_market("KOSDAQ", period), ['fetch']),
+            ('render', lambda kospi, kosdaq: self.render({"KOSPI": kospi, "KOSDAQ": kosdaq}, date_str, period),
+             ['compute_kospi', 'compute_kosdaq'])
+        ]
+
+    def prefetch(self, date_str, period=20):
+        """date_str 직전 거래일까지의 종목/지수 이력을 캐시에 미리 채움
+
+        장중에 실행해 두면 장 마감 후 RS 계산 시 당일 하루치만 추가로 조회한다.
+        종가 상태를 쓰면 상태를 직전 거래일까지 반영(시장 전체 조회 1회)하는 것으로 끝내고,
+        상태를 이어갈 수 없을 때만 상태 구간 전체 이력을 종목별로 받아 상태를 다시 구성한다.
+        """
+        from pykrx import stock
+        previous = self.calendar.sessions_before(date_str, 1)
+        self.as_of = previous
+        if self.rolling is not None and self._advance_rolling(previous):
+            self.rolling.save()
+            self.logger.info(f"종가 상태 {previous}까지 반영, 종목별 이력 미리 조회 생략")
+            return
+
+        start_date, end_date = self.calendar.window(previous, self._history_sessions(period))
+        self.logger.info(f"RS 이력 미리 조회 시작 ({start_date}~{end_date})...")
+        for benchmark in [self.kospi_benchmark, self.kosdaq_benchmark]:
+            self._get_index_data(benchmark, start_date, end_date)
+
+        tickers = [ticker for market in ["KOSPI", "KOSDAQ"]
+                   for ticker in self.fetch.call('pykrx', 'get_market_ticker_list', stock.get_market_ticker_list,
+                                                 end_date, market=market, accept=bool)]
+        for i, ticker in enumerate(tickers, 1):
+            LoggerUtil().progress('rs.prefetch', i, len(tickers), "RS 이력 미리 조회 진행중")
+            self._get_data(ticker, start_date, end_date)
+        self.logger.info(f"RS 이력 미리 조회 완료 ({len(tickers)}개 종목)")
+        if self.rolling is not None:
+            for market in ["KOSPI", "KOSDAQ"]:
+                self._rebuild_rolling(market)
+
+    def create_report(self, date_str, period=20):
+        """RS 보고서를 생성하고 이미지 아티팩트 리스트 반환"""
+        self.as_of = date_str
+        markets = ["KOSPI", "KOSDAQ"]
+        rankings = {}
         
         for market in markets:
-            print(f"\n=== {market} 시장 RS 데이터 처리 시작 ===")
-            
-            print(f"{market} {period}일 RS 랭킹 계산 중...")
-            ranking_df = self.get_market_rs_ranking(market, period)
-            
-            if ranking_df is not None and not ranking_df.empty:
-                transformed_df = self.transform_df(ranking_df)
-                if transformed_df is not None:
-                    img_path = self.save_rs_ranking_as_image(transformed_df, market, period, today_display)
-                    if img_path:
-                        image_paths.append(img_path)
-                print(f"{market} {period}일 RS 랭킹 계산 완료")
-            
-            time.sleep(1)  # API 호출 제한 방지
-            print(f"=== {market} 시장 RS 데이터 처리 완료 ===")
+            rankings[market] = self.compute_market(market, period)
         
-        return image_paths
+        return self.render(rankings, date_str, period)
 
     def transform_df(self, df):
         """DataFrame 형식을 변환합니다."""
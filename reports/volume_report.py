@@ -1,34 +1,41 @@
-import pandas as pd
-from pykrx import stock
-import time
 from datetime import datetime
-from utils.telegram_util import TelegramUtil
+from utils.alert_util import AlertUtil
+from utils.image_util import ImageUtil
+from utils.artifact_util import ArtifactUtil
+from utils.metrics_util import MetricsUtil
+from utils.fetch_util import FetchUtil, FetchError, DeadlineExceeded
+from utils.logger_util import LoggerUtil
+from utils.pipeline_util import degraded_note
 import os
 import imgkit
 
 class VolumeReport:
+    # 시간 예산 초과 시 직전 거래일 결과로 대체할 수 있는 단계
+    FALLBACK_STAGES = ('compute',)
+
     def __init__(self):
-        self.telegram = TelegramUtil()
+        self.alert = AlertUtil()
+        self.image_util = ImageUtil()
+        self.artifact_util = ArtifactUtil()
+        self.metrics = MetricsUtil()
+        self.fetch = FetchUtil()
+        self.logger = LoggerUtil().get_logger()
         self.img_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
         self.wkhtmltoimage_path = os.getenv('WKHTMLTOIMAGE_PATH')
         
         if not os.path.exists(self.img_dir):
             os.makedirs(self.img_dir)
 
-    def save_df_as_image(self, df, title, file_name='top_volume.png'):
-        """DataFrame을 이미지로 저장하고 파일 경로와 제목 반환"""
+    def save_df_as_image(self, df, title, file_name='top_volume.png', date=None):
+        """DataFrame을 이미지로 렌더링하고 이미지 아티팩트와 제목 반환"""
         if df is None or df.empty:
             return None, None
 
         file_name, file_extension = os.path.splitext(file_name)
-        current_date = datetime.now().strftime('%Y%m%d')
-        new_file_path = os.path.join(self.img_dir, f"{file_name}_{current_date}{file_extension}")
-        
-        # 이전 파일 삭제
-        for old_file in os.listdir(self.img_dir):
-            if old_file.startswith(file_name) and old_file.endswith(file_extension):
-                os.remove(os.path.join(self.img_dir, old_file))
-                print(f"기존 파일 삭제: {old_file}")
+        current_date = date or datetime.now().strftime('%Y%m%d')
+        new_file_name = f"{file_name}_{current_date}{file_extension}"
+        note = degraded_note(df)
+        notice = f'<div class="notice">{note}</div>' if note else ''
 
         html_str = f'''
         <!DOCTYPE html>
@@ -82,83 +89,99 @@ class VolumeReport:
                     margin-top: 15px;
                     font-weight: 400;
                 }}
+                .notice {{
+                    text-align: center;
+                    font-size: 14px;
+                    font-weight: 500;
+                    color: #c0392b;
+                }}
             </style>
         </head>
         <body>
             <div class="caption">{title}</div>
+            {notice}
             {df.to_html(index=False, classes='styled-table')}
             <div class="source">※ 출처 : MQ(Money Quotient)</div>
         </body>
         </html>
         '''
 
-        options = {
-            'format': 'png',
-            'encoding': "UTF-8",
-            'quality': 100,
-            'width': 600,
-            'enable-local-file-access': None
-        }
+        options = self.image_util.render_options(600, format='png')
 
         try:
             if not self.wkhtmltoimage_path:
                 error_message = "❌ 오류 발생\n\nWKHTMLTOIMAGE_PATH 환경변수가 설정되지 않았습니다."
-                self.telegram.send_test_message(error_message)
+                self.alert.alert('imgkit', 'ConfigError', error_message)
                 raise ValueError("WKHTMLTOIMAGE_PATH 환경변수가 필요합니다.")
                 
             config = imgkit.config(wkhtmltoimage=self.wkhtmltoimage_path)
-            imgkit.from_string(html_str, new_file_path, options=options, config=config)
-            print(f"새 파일 저장: {new_file_path}")
+            artifact = self.artifact_util.render_html(html_str, new_file_name, options, config)
+            self.artifact_util.archive([artifact], self.img_dir, replace_prefix=file_name)
+            self.logger.info(f"이미지 생성 완료: {artifact}")
             
-            return new_file_path, title
+            return artifact, title
             
         except Exception as e:
             error_message = f"❌ 오류 발생\n\n함수: save_df_as_image\n파일: {file_name}\n오류: {str(e)}"
-            self.telegram.send_test_message(error_message)
-            print(f"이미지 생성 중 오류 발생: {str(e)}")
+            self.alert.alert('save_df_as_image', e, error_message)
+            self.logger.error(f"이미지 생성 중 오류 발생: {str(e)}")
             return None, None
 
     def get_top_15_stocks_by_volume(self, date):
-        """거래량 기준 상위 15개 종목 추출"""
-        max_attempts = 5
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                ohlcv_data = stock.get_market_ohlcv(date=date, market="ALL")
-                if not ohlcv_data.empty and {'거래량'}.issubset(ohlcv_data.columns):
-                    ohlcv_data['거래량'] = ohlcv_data['거래량'].astype(int)
-                    sorted_data = ohlcv_data.sort_values(by="거래량", ascending=False)
-                    return sorted_data.head(15)
-            except Exception as e:
-                print(f"데이터 조회 시도 {attempt + 1}/{max_attempts} 실패: {str(e)}")
-            
-            attempt += 1
-            if attempt < max_attempts:
-                print(f"20초 후 재시도합니다...")
-                time.sleep(20)
-        
-        error_message = f"❌ 오류 발생\n\n함수: get_top_15_stocks_by_volume\n날짜: {date}\n\n5회 재시도 모두 실패"
-        self.telegram.send_test_message(error_message)
-        return None
+        """거래량 기준 상위 15개 종목 추출
+
+        시간 예산 초과는 파이프라인이 직전 데이터로 대체하도록 그대로 던진다.
+        """
+        from pykrx import stock  # import 시 KRX 로그인/폰트 설정이 일어나므로 실제 조회 시점에 불러옴
+        try:
+            ohlcv_data = self.fetch.call(
+                'pykrx', 'get_market_ohlcv', stock.get_market_ohlcv, date=date, market="ALL",
+                accept=lambda df: not df.empty and {'거래량'}.issubset(df.columns)
+            )
+        except DeadlineExceeded:
+            raise
+        except FetchError as e:
+            error_message = f"❌ 오류 발생\n\n함수: get_top_15_stocks_by_volume\n날짜: {date}\n\n{str(e)}"
+            self.alert.alert('get_top_15_stocks_by_volume', e.last_error or e, error_message)
+            return None
+
+        ohlcv_data['거래량'] = ohlcv_data['거래량'].astype(int)
+        sorted_data = ohlcv_data.sort_values(by="거래량", ascending=False)
+        return sorted_data.head(15)
 
     def transform_df(self, df):
         """DataFrame 변환"""
+        from pykrx import stock
         df['종목명'] = df.index.map(stock.get_market_ticker_name)
         df['거래량'] = df['거래량'].apply(lambda x: f"{x:,}")
         df = df.reset_index(drop=True)
         return df[['종목명', '거래량']]
 
-    def create_report(self, date, today_display):
-        """거래량 보고서를 생성하고 이미지 경로 리스트 반환"""
+    def compute(self, top_stocks):
+        """수집한 데이터를 리포트용 DataFrame으로 변환"""
+        if top_stocks is None:
+            return None
+        return self.transform_df(top_stocks)
+
+    def render(self, transformed_df, today_display):
+        """리포트 이미지를 렌더링하고 (이미지 아티팩트, 제목) 리스트 반환"""
         image_paths = []
-        top_stocks = self.get_top_15_stocks_by_volume(date)
-        
-        if top_stocks is not None:
-            transformed_df = self.transform_df(top_stocks)
+        if transformed_df is not None:
             title = f"{today_display} 전종목 거래량 TOP 15"
-            img_path, caption = self.save_df_as_image(transformed_df, title)
-            if img_path:
-                image_paths.append((img_path, caption))
-        
-        return image_paths 
\ No newline at end of file
+            artifact, caption = self.save_df_as_image(transformed_df, title, date=today_display.replace('-', ''))
+            if artifact:
+                image_paths.append((artifact, caption))
+        return image_paths
+
+    def pipeline_stages(self, date, today_display):
+        """파이프라인 단계 선언 (fetch → compute → render)"""
+        return [
+            ('fetch', lambda: self.get_top_15_stocks_by_volume(date), []),
+            ('compute', self.compute, ['fetch']),
+            ('render', lambda transformed_df: self.render(transformed_df, today_display), ['compute'])
+        ]
+
+    def create_report(self, date, today_display):
+        """거래량 보고서를 생성하고 (이미지 아티팩트, 제목) 리스트 반환"""
+        top_stocks = self.get_top_15_stocks_by_volume(date)
+        return self.render(self.compute(top_stocks), today_display) 
\ No newline at end of file
@@ -0,0 +1,108 @@
+import atexit
+import threading
+import time
+from utils.telegram_util import TelegramUtil
+from utils.logger_util import LoggerUtil
+
+class AlertUtil:
+    """오류 알림을 (함수, 오류 종류) 단위로 모아 텔레그램 테스트 채팅방에 요약 전송
+
+    같은 오류가 반복돼도 발생 횟수만 누적하고, 백그라운드 스레드가
+    DIGEST_INTERVAL 마다 한 번씩 새로 쌓인 알림을 묶어 보낸다.
+    실행 종료 시 send_summary()로 그 실행의 전체 요약을 한 번 더 보낸다.
+    """
+    _instance = None
+    _initialized = False
+    DIGEST_INTERVAL = 60  # 요약 전송 최소 간격(초)
+    MAX_MESSAGE_LENGTH = 3500  # 텔레그램 메시지 길이 제한(4096) 여유분
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AlertUtil, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not AlertUtil._initialized:
+            self.telegram = TelegramUtil()
+            self.logger = LoggerUtil().get_logger()
+            self._lock = threading.Lock()
+            self._alerts = {}
+            self._stop = threading.Event()
+            self._worker = None
+            atexit.register(self.flush)
+            AlertUtil._initialized = True
+
+    def alert(self, function, error, message):
+        """알림 등록 (즉시 전송하지 않음)
+
+        error 는 예외 객체 또는 오류 종류 문자열이며, 같은 (function, 오류 종류)는
+        하나로 합쳐 횟수만 센다.
+        """
+        error_name = error if isinstance(error, str) else type(error).__name__
+        key = (function, error_name)
+        with self._lock:
+            entry = self._alerts.setdefault(key, {
+                'function': function,
+                'error': error_name,
+                'count': 0,
+                'reported': 0,
+                'first_seen': time.strftime('%H:%M:%S'),
+                'message': message
+            })
+            entry['count'] += 1
+            entry['message'] = message
+
+        self.logger.error(message)
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name='alert-digest', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.DIGEST_INTERVAL):
+            self.flush()
+
+    def _format(self, title, entries, new_only):
+        lines = [title]
+        for entry in entries:
+            count = entry['count'] - entry['reported'] if new_only else entry['count']
+            lines.append(f"\n• {entry['function']} / {entry['error']}: {count}회 (최초 {entry['first_seen']})")
+            if new_only:
+                lines.append(entry['message'])
+        text = '\n'.join(lines)
+        if len(text) > self.MAX_MESSAGE_LENGTH:
+            text = text[:self.MAX_MESSAGE_LENGTH] + '\n...(생략)'
+        return text
+
+    def _send(self, text):
+        try:
+            self.telegram.send_test_message(text)
+        except Exception as e:
+            self.logger.error(f"알림 전송 실패: {str(e)}")
+
+    def flush(self):
+        """아직 보내지 않은 알림을 하나의 메시지로 전송"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._alerts.values() if entry['count'] > entry['reported']]
+            for entry in self._alerts.values():
+                entry['reported'] = entry['count']
+        if entries:
+            self._send(self._format("❌ 오류 알림", entries, new_only=True))
+
+    def send_summary(self):
+        """실행 종료 시 남은 알림과 전체 오류 요약 전송
+
+        요약한 알림은 비우므로 데몬의 다음 실행 요약에는 그 실행의 오류만 담긴다.
+        """
+        self._stop.set()
+        self.flush()
+        with self._lock:
+            entries = [dict(entry) for entry in self._alerts.values()]
+            self._alerts = {}
+        if entries:
+            total = sum(entry['count'] for entry in entries)
+            self._send(self._format(f"📋 실행 종료 오류 요약 (총 {total}건)", entries, new_only=False))
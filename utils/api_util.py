@@ -1,9 +1,15 @@
+import random
+import time
 import requests
-from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Optional, Union
 import os
 from PIL import Image
-import io
+from concurrent.futures import ThreadPoolExecutor
 from utils.logger_util import LoggerUtil
+from utils.image_util import ImageUtil
+from utils.artifact_util import ImageArtifact
+from utils.metrics_util import MetricsUtil
 
 class ApiError(Exception):
     """API 호출 관련 커스텀 예외"""
@@ -18,46 +24,100 @@ class ApiUtil:
         self.headers = {
             "Accept": "application/json"
         }
-        self.max_file_size = 1 * 1024 * 1024  # 1MB
-        self.max_width = 800  # 최대 너비
+        self.image_util = ImageUtil()
+        self.max_file_size = ImageUtil.MAX_FILE_SIZE
+        self.max_width = ImageUtil.MAX_WIDTH  # 최대 너비
+        self.max_compress_workers = 4  # 이미지 병렬 압축 스레드 수
+        self.timeout = (5, 30)  # (연결, 읽기) 타임아웃(초)
+        self.max_retries = 3  # 5xx/연결 오류 재시도 횟수
+        self.backoff_base = 1.0  # 재시도 대기 기본값(초), 시도마다 2배
+        self.backoff_max = 20.0
         self.logger = LoggerUtil().get_logger()
 
+        # 모든 게시글 요청이 하나의 keep-alive 연결을 재사용하도록 세션 유지
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _post(self, url: str, **kwargs):
+        """세션으로 POST 요청 (5xx/연결 오류 시 지수 백오프 + 지터로 재시도)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with MetricsUtil().span('board.post'):
+                    response = self.session.post(url, timeout=self.timeout, **kwargs)
+                if response.status_code < 500 or attempt == self.max_retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                reason = str(e)
+
+            MetricsUtil().incr('retries', function='ApiUtil._post')
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            delay = random.uniform(0, delay)  # full jitter
+            self.logger.warning(f"API 요청 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {reason}")
+            time.sleep(delay)
+
     def _compress_image(self, image_path: str):
-        """이미지 압축"""
+        """이미지 압축 후 (이미지 바이트, MIME 타입) 반환"""
         try:
-            with Image.open(image_path) as img:
-                # 이미지 크기 조정
-                if img.width > self.max_width:
-                    ratio = self.max_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((self.max_width, new_height), Image.Resampling.LANCZOS)
-                
-                # 이미지 품질 조정
-                buffer = io.BytesIO()
-                format = img.format if img.format else 'PNG'
-                
-                if format == 'PNG':
-                    img.save(buffer, format=format, optimize=True)
-                else:
-                    img.save(buffer, format=format, quality=85, optimize=True)
-                
-                compressed_image = buffer.getvalue()
-                
-                # 압축 후에도 크기가 큰 경우 추가 압축
-                quality = 85
-                while len(compressed_image) > self.max_file_size and quality > 30:
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='JPEG', quality=quality, optimize=True)
-                    compressed_image = buffer.getvalue()
-                    quality -= 10
-                
-                self.logger.info(f"이미지 압축 완료: {image_path} (크기: {len(compressed_image)/1024:.1f}KB)")
-                return compressed_image, format.lower()
+            # 렌더링 단계에서 이미 규격에 맞춘 이미지는 디코딩 없이 그대로 전송
+            if self.image_util.is_upload_ready(image_path):
+                with Image.open(image_path) as img:
+                    format = img.format
+                with open(image_path, 'rb') as f:
+                    image_bytes = f.read()
+                self.logger.info(f"이미지 압축 생략 (규격 충족): {image_path} (크기: {len(image_bytes)/1024:.1f}KB)")
+                return image_bytes, self.image_util.mime_type(format)
+
+            with MetricsUtil().span('compress'), Image.open(image_path) as img:
+                img.load()
+                compressed_image, format = self.image_util.encode_for_upload(img)
+
+            self.logger.info(f"이미지 압축 완료: {image_path} (크기: {len(compressed_image)/1024:.1f}KB, 형식: {format})")
+            return compressed_image, self.image_util.mime_type(format)
         except Exception as e:
             self.logger.error(f"이미지 압축 실패: {image_path} - {str(e)}")
             raise
 
-    def create_post(self, title: str, content: str, category: str, writer: str, image_paths: Optional[List[str]] = None):
+    def _compress_images(self, image_paths: List[Union[str, ImageArtifact]]):
+        """여러 이미지를 스레드 병렬로 압축 (Pillow 인코딩은 GIL을 해제함)
+
+        입력 순서대로 (파일명, 이미지 바이트, MIME 타입) 목록을 반환하며
+        처리에 실패한 이미지는 제외한다. 메모리 이미지 아티팩트는 파일을
+        다시 읽지 않고 아티팩트에 보관된 업로드용 바이트를 사용한다.
+        """
+        def compress(image_path):
+            if isinstance(image_path, ImageArtifact):
+                try:
+                    return (image_path.name, *image_path.upload_variant())
+                except Exception as e:
+                    self.logger.error(f"이미지 처리 실패: {image_path.name} - {str(e)}")
+                    return None
+            if not os.path.exists(image_path):
+                self.logger.error(f"이미지 파일 없음: {image_path}")
+                return None
+            try:
+                return (image_path, *self._compress_image(image_path))
+            except Exception as e:
+                self.logger.error(f"이미지 처리 실패: {image_path} - {str(e)}")
+                return None
+
+        metrics = MetricsUtil()
+        report = metrics.current_report()
+        def compress_for_report(image_path):
+            with metrics.report(report):
+                return compress(image_path)
+
+        workers = min(self.max_compress_workers, len(image_paths)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compress_for_report, image_paths))
+        return [result for result in results if result is not None]
+
+    def create_post(self, title: str, content: str, category: str, writer: str, image_paths: Optional[List[Union[str, ImageArtifact]]] = None):
         """게시글 생성 API 호출"""
         url = f"{self.base_url}/board-research"
         
@@ -66,18 +126,14 @@ class ApiUtil:
                 self.logger.info(f"게시글 생성 시작 (이미지 포함) - 제목: {title}")
                 # 이미지와 함께 게시글 등록
                 files = {}
-                for i, image_path in enumerate(image_paths):
-                    if os.path.exists(image_path):
-                        try:
-                            compressed_image, format = self._compress_image(image_path)
-                            # 원본 파일명 사용
-                            original_filename = os.path.basename(image_path)
-                            # 각 이미지를 배열로 전송
-                            files[f'image[{i}]'] = (original_filename, compressed_image, f'image/{format}')
-                            self.logger.debug(f"이미지 {i+1} 추가: {original_filename}")
-                        except Exception as e:
-                            self.logger.error(f"이미지 처리 실패: {image_path} - {str(e)}")
-                            continue
+                for i, (image_path, compressed_image, mime_type) in enumerate(self._compress_images(image_paths)):
+                    # 원본 파일명 사용 (JPEG로 변환된 경우 확장자 보정)
+                    original_filename = os.path.basename(image_path)
+                    if mime_type == 'image/jpeg' and not original_filename.lower().endswith(('.jpg', '.jpeg')):
+                        original_filename = os.path.splitext(original_filename)[0] + '.jpg'
+                    # 각 이미지를 배열로 전송
+                    files[f'image[{i}]'] = (original_filename, compressed_image, mime_type)
+                    self.logger.debug(f"이미지 {i+1} 추가: {original_filename}")
                 
                 if not files:
                     error_msg = "처리 가능한 이미지가 없습니다."
@@ -96,9 +152,7 @@ class ApiUtil:
                     self.logger.debug(f"API 요청 데이터: {data}")
                     self.logger.debug(f"파일 데이터: {[f'{k}: {v[0]}' for k, v in files.items()]}")
                     
-                    # multipart/form-data로 전송 시에는 Content-Type 헤더를 제거 (requests가 자동으로 설정)
-                    headers = self.headers.copy()
-                    
+                    # multipart/form-data로 전송 시 Content-Type 헤더는 requests가 자동으로 설정
                     # form-data 형식으로 전송
                     form_data = {}
                     for key, value in data.items():
@@ -111,12 +165,8 @@ class ApiUtil:
                     # 디버그 로그 추가
                     self.logger.debug(f"최종 전송 데이터: {[(k, v[0] if isinstance(v, tuple) else v) for k, v in form_data.items()]}")
                     
-                    response = requests.post(
-                        url, 
-                        headers=headers,
-                        files=form_data,
-                        timeout=30
-                    )
+                    MetricsUtil().incr('upload_bytes', sum(len(file[1]) for file in files.values()), target='board')
+                    response = self._post(url, files=form_data)
                     
                     # 응답 상태 코드 로깅
                     self.logger.debug(f"응답 상태 코드: {response.status_code}")
@@ -131,7 +181,7 @@ class ApiUtil:
                     "category": category,
                     "writer": writer
                 }
-                response = requests.post(url, headers=self.headers, json=payload)
+                response = self._post(url, json=payload)
 
             # 응답 확인 및 한글 디코딩
             try:
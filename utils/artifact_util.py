@@ -0,0 +1,108 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+import imgkit
+from PIL import Image
+from utils.image_util import ImageUtil
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
+
+class ImageArtifact:
+    """렌더링된 리포트 이미지를 메모리에 보관하는 객체
+
+    렌더러에서 만든 바이트가 텔레그램/게시판 전송까지 그대로 전달되며,
+    디스크 기록(path)은 보관용으로만 비동기 수행된다.
+    """
+    def __init__(self, name, data, format, width=None):
+        self.name = name
+        self.data = data
+        self.format = format
+        self.width = width
+        self.path = None  # 보관 파일 경로 (기록 완료 후 설정)
+        self._upload_variant = None
+
+    @property
+    def mime_type(self):
+        return ImageUtil.mime_type(self.format)
+
+    def upload_variant(self):
+        """게시판 업로드용 (바이트, MIME 타입) 반환 (필요 시 1회만 압축)"""
+        if self._upload_variant is None:
+            MetricsUtil().incr('cache_misses', cache='upload_variant')
+            image_util = ImageUtil()
+            if len(self.data) <= image_util.MAX_FILE_SIZE and (self.width or 0) <= image_util.MAX_WIDTH \
+                    and self.format in image_util.UPLOAD_FORMATS:
+                self._upload_variant = (self.data, self.mime_type)
+            else:
+                with MetricsUtil().span('compress'), Image.open(io.BytesIO(self.data)) as img:
+                    img.load()
+                    data, format = image_util.encode_for_upload(img)
+                self._upload_variant = (data, ImageUtil.mime_type(format))
+        else:
+            MetricsUtil().incr('cache_hits', cache='upload_variant')
+        return self._upload_variant
+
+    def __repr__(self):
+        return f"ImageArtifact({self.name}, {len(self.data)/1024:.1f}KB)"
+
+
+class ArtifactUtil:
+    """리포트 이미지 렌더링 및 비동기 보관 처리"""
+    _archive_executor = None
+    _pending = []
+
+    def __init__(self):
+        self.image_util = ImageUtil()
+        self.logger = LoggerUtil().get_logger()
+        # ARCHIVE_IMAGES=0 이면 디스크에 보관하지 않음
+        self.archive_enabled = os.getenv('ARCHIVE_IMAGES', '1') != '0'
+
+    def render_html(self, html_str, file_name, options, config):
+        """HTML을 메모리에서 이미지로 렌더링하고 업로드 규격으로 변환"""
+        metrics = MetricsUtil()
+        with metrics.span('render'):
+            raw = imgkit.from_string(html_str, False, options=options, config=config)
+        with metrics.span('finalize_image'):
+            data, format, width = self.image_util.finalize_bytes(raw)
+        metrics.incr('rendered_bytes', len(data))
+        if format == 'JPEG' and file_name.lower().endswith('.png'):
+            file_name = os.path.splitext(file_name)[0] + '.jpg'
+        return ImageArtifact(file_name, data, format, width)
+
+    def archive(self, artifacts, img_dir, replace_prefix=None):
+        """아티팩트를 백그라운드 스레드에서 디스크에 기록 (이전 파일 정리 포함)"""
+        if not self.archive_enabled or not artifacts:
+            return None
+
+        if ArtifactUtil._archive_executor is None:
+            ArtifactUtil._archive_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='archive')
+
+        future = ArtifactUtil._archive_executor.submit(self._write, list(artifacts), img_dir, replace_prefix)
+        ArtifactUtil._pending.append(future)
+        return future
+
+    def _write(self, artifacts, img_dir, replace_prefix):
+        os.makedirs(img_dir, exist_ok=True)
+        if replace_prefix:
+            new_names = {artifact.name for artifact in artifacts}
+            for old_file in os.listdir(img_dir):
+                if old_file.startswith(replace_prefix) and old_file not in new_names:
+                    os.remove(os.path.join(img_dir, old_file))
+                    self.logger.info(f"기존 파일 삭제: {old_file}")
+
+        for artifact in artifacts:
+            path = os.path.join(img_dir, artifact.name)
+            with open(path, 'wb') as f:
+                f.write(artifact.data)
+            artifact.path = path
+            self.logger.info(f"새 파일 저장: {path}")
+
+    @classmethod
+    def wait_archived(cls):
+        """대기 중인 보관 작업 완료까지 대기"""
+        while cls._pending:
+            future = cls._pending.pop(0)
+            try:
+                future.result()
+            except Exception as e:
+                LoggerUtil().get_logger().error(f"이미지 보관 실패: {str(e)}")
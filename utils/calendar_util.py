@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from utils.logger_util import LoggerUtil
+
+class CalendarUtil:
+    """KRX 거래일 인덱스
+
+    KOSPI 지수 일봉 날짜로 확정된 거래일 목록을 cache/trading_calendar.json 에
+    보관하고, 날짜별 누적 거래일 수를 미리 계산해 "D 기준 N거래일 전",
+    "D가 거래일인가" 를 O(1)로 답한다.
+    KRX 데이터가 아직 없는 오늘 이후 날짜는 주말/공휴일/KRX 추가 휴장일 규칙으로 추정한다.
+    """
+    _instance = None
+    _initialized = False
+    BENCHMARK = '1001'  # 거래일 판정 기준 지수 (KOSPI)
+    LOOKBACK_DAYS = 730  # 최초 조회 시 확보할 과거 기간
+    # 공휴일은 아니지만 KRX가 휴장하는 날 (근로자의 날, 연말 휴장일)
+    EXTRA_CLOSURES = ('0501', '1231')
+    CLOSE_TIME = '15:30'  # 정규장 마감 시각
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CalendarUtil, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not CalendarUtil._initialized:
+            root_dir = Path(os.getenv('STATE_DIR') or Path(os.path.dirname(os.path.abspath(__file__))).parent)
+            self.cache_path = root_dir / 'cache' / 'trading_calendar.json'
+            self.logger = LoggerUtil().get_logger()
+            self._lock = threading.RLock()
+            self._sessions = []  # 정렬된 거래일 (YYYYMMDD)
+            self._confirmed = None  # KRX 데이터로 확정된 구간 (시작, 끝)
+            # (거래일 목록, 날짜 -> 해당 날짜까지의 거래일 수), 재계산 시 통째로 교체
+            self._index = ([], {})
+            self._range = None  # _index 가 계산된 구간 (시작, 끝)
+            self._holidays = {}  # 연도 -> 공휴일 목록
+            self._pinned_today = None  # 고정된 '오늘' (YYYYMMDD, None 이면 실제 오늘)
+            self._load_cache()
+            CalendarUtil._initialized = True
+
+    def _load_cache(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self._sessions = sorted(cached['sessions'])
+            self._confirmed = tuple(cached['confirmed'])
+        except Exception as e:
+            self.logger.warning(f"거래일 캐시 로드 실패, 다시 조회: {str(e)}")
+            self._sessions, self._confirmed = [], None
+
+    def _save_cache(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': self._sessions, 'confirmed': list(self._confirmed)}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def _to_date(date):
+        return datetime.strptime(date, '%Y%m%d')
+
+    @staticmethod
+    def _to_str(date):
+        return date.strftime('%Y%m%d')
+
+    def pin_today(self, date):
+        """'오늘'을 date(YYYYMMDD)로 고정 (카세트 녹화/재생처럼 실행일과 무관하게 같은 조회를 내야 할 때)"""
+        with self._lock:
+            self._pinned_today = date
+            self._range = None
+
+    def _today(self):
+        return self._pinned_today or self._to_str(datetime.today())
+
+    def _is_expected_session(self, date):
+        """KRX 데이터가 없는 날짜의 거래일 여부 추정"""
+        day = self._to_date(date)
+        if day.weekday() >= 5 or date[4:] in self.EXTRA_CLOSURES:
+            return False
+        if day.year not in self._holidays:
+            import holidays
+            self._holidays[day.year] = holidays.KR(years=day.year)
+        return day.date() not in self._holidays[day.year]
+
+    def _fetch_sessions(self, start_date, end_date):
+        """KRX 에서 [start_date, end_date] 거래일 조회 (실패 시 None)"""
+        from pykrx import stock
+
+        try:
+            df = stock.get_index_ohlcv_by_date(start_date, end_date, self.BENCHMARK)
+        except Exception as e:
+            self.logger.warning(f"거래일 조회 실패 ({start_date}~{end_date}): {str(e)}")
+            return None
+        if df is None:
+            return None
+        return [self._to_str(day) for day in df.index]
+
+    def _confirm(self, start_date, end_date):
+        """확정 구간을 [start_date, end_date] 까지 넓힘 (어제까지만 확정)"""
+        yesterday = self._to_str(self._to_date(self._today()) - timedelta(days=1))
+        end_date = min(end_date, yesterday)
+        if start_date > end_date:
+            return
+
+        if self._confirmed is None:
+            missing = [(start_date, end_date)]
+        else:
+            missing = []
+            if start_date < self._confirmed[0]:
+                missing.append((start_date, self._to_str(self._to_date(self._confirmed[0]) - timedelta(days=1))))
+            if end_date > self._confirmed[1]:
+                missing.append((self._to_str(self._to_date(self._confirmed[1]) + timedelta(days=1)), end_date))
+        if not missing:
+            return
+
+        sessions = set(self._sessions)
+        confirmed = self._confirmed
+        for fetch_start, fetch_end in missing:
+            fetched = self._fetch_sessions(fetch_start, fetch_end)
+            if fetched is None:
+                continue
+            sessions.update(fetched)
+            confirmed = (min(fetch_start, confirmed[0]), max(fetch_end, confirmed[1])) if confirmed else (fetch_start, fetch_end)
+        if confirmed == self._confirmed:
+            return
+
+        self._sessions = sorted(sessions)
+        self._confirmed = confirmed
+        self._range = None
+        try:
+            self._save_cache()
+        except Exception as e:
+            self.logger.warning(f"거래일 캐시 저장 실패: {str(e)}")
+
+    def _ensure(self, start_date, end_date):
+        """[start_date, end_date] 를 포함하는 (거래일 목록, 날짜별 누적 거래일 수) 반환"""
+        with self._lock:
+            if self._range and self._range[0] <= start_date and end_date <= self._range[1]:
+                return self._index
+            if self._range:
+                start_date, end_date = min(start_date, self._range[0]), max(end_date, self._range[1])
+            self._confirm(start_date, end_date)
+
+            confirmed = set(self._sessions)
+            sessions = []
+            positions = {}
+            day, last = self._to_date(start_date), self._to_date(end_date)
+            while day <= last:
+                date = self._to_str(day)
+                if self._confirmed and self._confirmed[0] <= date <= self._confirmed[1]:
+                    is_session = date in confirmed
+                else:
+                    is_session = self._is_expected_session(date)
+                if is_session:
+                    sessions.append(date)
+                positions[date] = len(sessions)
+                day += timedelta(days=1)
+
+            self._index = (sessions, positions)
+            self._range = (start_date, end_date)
+            return self._index
+
+    def _prepare(self, date, lookback_sessions=0):
+        # 거래일은 연간 약 250일이므로 달력일 기준으로 넉넉히 (1.5배 + 여유) 준비
+        start = self._to_date(date) - timedelta(days=max(self.LOOKBACK_DAYS, int(lookback_sessions * 1.5) + 30))
+        return self._ensure(self._to_str(start), date)
+
+    def is_session(self, date=None):
+        """date(YYYYMMDD, 기본값 오늘)가 거래일인지 여부"""
+        date = date or self._today()
+        if date >= self._today():
+            # 오늘 이후는 어차피 규칙으로 판정하므로 과거 구간 확정(KRX 조회) 없이 바로 응답
+            return self._is_expected_session(date)
+        sessions, positions = self._prepare(date)
+        position = positions[date]
+        return position > 0 and sessions[position - 1] == date
+
+    def previous_session(self, date=None):
+        """date 당일 또는 그 이전 가장 최근 거래일"""
+        return self.sessions_before(date, 0)
+
+    def next_session(self, date=None):
+        """date 이후(당일 제외) 첫 거래일"""
+        day = self._to_date(date or self._today())
+        while True:
+            day += timedelta(days=1)
+            if self.is_session(self._to_str(day)):
+                return self._to_str(day)
+
+    def upcoming_session(self, now=None):
+        """now 이후 가장 먼저 장 마감을 맞는 거래일 (오늘 장이 끝났으면 다음 거래일)"""
+        now = now or datetime.now()
+        today = self._to_str(now)
+        if self.is_session(today) and now.strftime('%H:%M') < self.CLOSE_TIME:
+            return today
+        return self.next_session(today)
+
+    def sessions_before(self, date=None, n=0):
+        """date 기준 가장 최근 거래일에서 n 거래일 전 날짜 (n=0 이면 가장 최근 거래일)"""
+        date = date or self._today()
+        sessions, positions = self._prepare(date, n)
+        position = positions[date]
+        if position - 1 - n < 0:
+            raise ValueError(f"{date} 기준 {n}거래일 전 날짜를 찾을 수 없습니다.")
+        return sessions[position - 1 - n]
+
+    def window(self, date=None, sessions=1):
+        """date 까지의 최근 sessions 개 거래일 구간 (시작일, 종료일)"""
+        return self.sessions_before(date, sessions - 1), self.previous_session(date)
+
+    def sessions_between(self, start_date, end_date):
+        """[start_date, end_date] 구간의 거래일 목록"""
+        self._prepare(end_date)
+        sessions, positions = self._ensure(start_date, end_date)
+        before = positions.get(self._to_str(self._to_date(start_date) - timedelta(days=1)), 0)
+        return sessions[before:positions[end_date]]
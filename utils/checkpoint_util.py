@@ -0,0 +1,100 @@
+import os
+import pickle
+import shutil
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from utils.logger_util import LoggerUtil
+
+class CheckpointUtil:
+    """(거래일, 리포트, 단계) 단위 중간 결과 저장소
+
+    checkpoints/{거래일}/{리포트}/{단계}.pkl 에 단계 결과(DataFrame, 이미지
+    아티팩트, 발행 영수증 등)를 저장해 재실행 시 완료된 단계를 건너뛴다.
+    단계 내부의 부분 진행 상황(예: RS 계산이 끝난 종목)은 partial 로 따로 저장한다.
+    """
+    KEEP_DAYS = 7
+
+    def __init__(self, date, base_dir=None):
+        root_dir = Path(os.getenv('STATE_DIR') or Path(os.path.dirname(os.path.abspath(__file__))).parent)
+        self.base_dir = Path(base_dir) if base_dir else root_dir / 'checkpoints'
+        self.date = date
+        self.date_dir = self.base_dir / date
+        self.logger = LoggerUtil().get_logger()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def split_stage(stage_name):
+        """'rs.compute_kospi' 형식의 단계 이름을 (리포트, 단계)로 분리"""
+        report, _, stage = stage_name.partition('.')
+        return report, stage or 'main'
+
+    def _path(self, report, stage):
+        return self.date_dir / report / f"{stage}.pkl"
+
+    def has(self, report, stage):
+        return self._path(report, stage).exists()
+
+    def load(self, report, stage):
+        with open(self._path(report, stage), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, report, stage, value):
+        """원자적으로 저장 (임시 파일 기록 후 이름 변경)"""
+        path = self._path(report, stage)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def latest_before(self, report, stage):
+        """이전 거래일 중 가장 최근에 저장된 단계 결과 (거래일, 결과), 없으면 None
+
+        시간 예산 초과 시 파이프라인이 직전 데이터(last-good)로 대체할 때 사용한다.
+        """
+        if not self.base_dir.exists():
+            return None
+        dates = sorted((date_dir.name for date_dir in self.base_dir.iterdir()
+                        if date_dir.is_dir() and date_dir.name.isdigit() and date_dir.name < self.date),
+                       reverse=True)
+        for date in dates:
+            path = self.base_dir / date / report / f"{stage}.pkl"
+            if not path.exists():
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    return date, pickle.load(f)
+            except Exception as e:
+                self.logger.warning(f"직전 체크포인트 로드 실패 ({date}/{report}/{stage}): {str(e)}")
+        return None
+
+    def load_partial(self, report, key, default=None):
+        """단계 내부 부분 진행 상황 조회"""
+        stage = f"partial_{key}"
+        if not self.has(report, stage):
+            return default
+        try:
+            return self.load(report, stage)
+        except Exception as e:
+            self.logger.warning(f"부분 체크포인트 로드 실패 ({report}/{key}): {str(e)}")
+            return default
+
+    def save_partial(self, report, key, value):
+        with self._lock:
+            self.save(report, f"partial_{key}", value)
+
+    def clear(self):
+        """해당 거래일의 체크포인트 전체 삭제"""
+        if self.date_dir.exists():
+            shutil.rmtree(self.date_dir)
+
+    def cleanup(self, keep_days=None):
+        """보관 기간이 지난 거래일 체크포인트 삭제"""
+        keep_days = keep_days or self.KEEP_DAYS
+        if not self.base_dir.exists():
+            return
+        cutoff = (datetime.strptime(self.date, '%Y%m%d') - timedelta(days=keep_days)).strftime('%Y%m%d')
+        for date_dir in self.base_dir.iterdir():
+            if date_dir.is_dir() and date_dir.name.isdigit() and date_dir.name < cutoff:
+                shutil.rmtree(date_dir)
@@ -0,0 +1,208 @@
+import os
+import random
+import threading
+import time
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
+from utils.rate_limit_util import RateLimitUtil, SlotTimeout
+
+class FetchError(Exception):
+    """재시도 후에도 데이터를 받지 못함"""
+    def __init__(self, source, name, message, last_error=None):
+        super().__init__(f"{source}.{name}: {message}")
+        self.source = source
+        self.name = name
+        self.last_error = last_error
+
+
+class CircuitOpenError(FetchError):
+    """데이터 소스의 회로 차단기가 열려 있어 호출하지 않음"""
+    pass
+
+
+class DeadlineExceeded(FetchError):
+    """호출/실행 시간 예산 초과"""
+    pass
+
+
+class CircuitBreaker:
+    """데이터 소스별 회로 차단기
+
+    재시도까지 실패한 호출이 연속으로 failure_threshold 건에 이르면 열려서
+    reset_timeout 동안 모든 호출을 즉시 거절하고, 이후 한 번의 시험 호출
+    (half-open)이 성공하면 다시 닫힌다.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, source, failure_threshold, reset_timeout):
+        self.source = source
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release_probe(self):
+        """시험 호출이 성공/실패 기록 없이 끝났을 때(시간 예산 초과 등) 다음 호출이 다시 시험하도록 해제"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def record_failure(self):
+        """실패 기록 후 이번 실패로 회로가 열렸으면 True"""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class FetchUtil:
+    """외부 데이터 조회 공통 정책 (지수 백오프 + 지터 재시도, 소스별 회로 차단기, 시간 예산)
+
+    각 리포트는 종목/페이지 같은 가장 작은 조회 단위를 call() 로 감싸고, 재시도는
+    그 단위에서만 일어난다. 요청 간격은 고정 sleep 대신 RateLimitUtil 이 정한다. 같은 소스에서 실패가 이어지면 회로가 열려 이후 호출은
+    기다리지 않고 CircuitOpenError 로 끝나며, 호출별 예산(CALL_DEADLINE)과
+    실행 전체 예산(start_run)을 넘기게 되는 재시도는 DeadlineExceeded 로 끝난다.
+    """
+    _instance = None
+    _initialized = False
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE = 2.0  # 재시도 대기 기본값(초), 시도마다 2배
+    BACKOFF_MAX = 60.0
+    CALL_DEADLINE = 180.0  # 호출 하나(재시도 포함)의 시간 예산(초)
+    FAILURE_THRESHOLD = 5  # 회로를 여는 연속 실패 호출 수
+    RESET_TIMEOUT = 120.0  # 회로가 열린 뒤 시험 호출까지 대기(초)
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(FetchUtil, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not FetchUtil._initialized:
+            self.logger = LoggerUtil().get_logger()
+            self.metrics = MetricsUtil()
+            self.limits = RateLimitUtil()
+            self.max_attempts = int(os.getenv('FETCH_MAX_ATTEMPTS', self.MAX_ATTEMPTS))
+            self.call_deadline = float(os.getenv('FETCH_CALL_DEADLINE', self.CALL_DEADLINE))
+            self._breakers = {}
+            self._lock = threading.Lock()
+            self.run_deadline = None
+            FetchUtil._initialized = True
+
+    def start_run(self, budget=None):
+        """실행 전체 조회 시간 예산(초) 설정 후 회로 차단기 초기화 (None 이면 FETCH_RUN_BUDGET, 미설정 시 무제한)"""
+        budget = budget if budget is not None else float(os.getenv('FETCH_RUN_BUDGET', 0)) or None
+        self.run_deadline = time.monotonic() + budget if budget else None
+        with self._lock:
+            self._breakers = {}
+
+    def breaker(self, source):
+        with self._lock:
+            if source not in self._breakers:
+                self._breakers[source] = CircuitBreaker(source, self.FAILURE_THRESHOLD, self.RESET_TIMEOUT)
+            return self._breakers[source]
+
+    def _deadline(self, deadline):
+        deadline = time.monotonic() + (deadline or self.call_deadline)
+        return min(deadline, self.run_deadline) if self.run_deadline else deadline
+
+    def call(self, source, name, func, *args, accept=None, attempts=None, deadline=None, **kwargs):
+        """func(*args, **kwargs) 를 정책에 따라 호출하고 결과 반환
+
+        accept(result) 가 False 면(예: 빈 DataFrame) 실패로 보고 재시도한다.
+        재시도를 모두 실패하면 FetchError 를 던진다.
+        """
+        breaker = self.breaker(source)
+        attempts = attempts or self.max_attempts
+        deadline = self._deadline(deadline)
+        last_error = None
+        probing = False  # 반쯤 열린 회로의 시험 호출을 맡았고 아직 결과를 기록하지 않음
+
+        try:
+            for attempt in range(attempts):
+                if time.monotonic() >= deadline:
+                    if attempt:
+                        self._record_failure(breaker)
+                        probing = False
+                    raise DeadlineExceeded(source, name, "시간 예산 초과", last_error)
+                # 첫 시도는 회로 상태로 허용 여부를 정하고, 재시도 중에는 다른 호출이 회로를 열었으면 중단
+                if (not breaker.allow()) if attempt == 0 else breaker.state == CircuitBreaker.OPEN:
+                    self.metrics.incr('circuit_rejections', source=source)
+                    raise CircuitOpenError(source, name, "회로 차단기 열림 - 호출 생략", last_error)
+                if attempt == 0 and breaker.state == CircuitBreaker.HALF_OPEN:
+                    probing = True
+
+                try:
+                    # 요청 속도는 소스별 적응형 한도(RateLimitUtil)가 조절
+                    with self.metrics.span(f"{source}.{name}"), self.limits.slot(source, deadline) as outcome:
+                        result = func(*args, **kwargs)
+                        outcome['ok'] = accept is None or accept(result)
+                    if outcome['ok']:
+                        breaker.record_success()
+                        probing = False
+                        return result
+                    reason = "빈 응답"
+                except SlotTimeout:
+                    # 요청 한도 대기 중 예산 소진 (소스 장애가 아니므로 회로 차단기에는 기록하지 않음)
+                    raise DeadlineExceeded(source, name, "요청 한도 대기 중 시간 예산 초과", last_error)
+                except Exception as e:
+                    last_error = e
+                    reason = str(e)
+
+                if attempt == attempts - 1:
+                    break
+                delay = random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** attempt)))  # full jitter
+                if time.monotonic() + delay >= deadline:
+                    self._record_failure(breaker)
+                    probing = False
+                    raise DeadlineExceeded(source, name, f"시간 예산 내 재시도 불가 ({reason})", last_error)
+                self.metrics.incr('retries', function=name)
+                self.logger.warning(f"[조회] {source}.{name} 시도 {attempt + 1}/{attempts} 실패, {delay:.1f}초 후 재시도: {reason}")
+                time.sleep(delay)
+
+            self._record_failure(breaker)
+            probing = False
+            raise FetchError(source, name, f"{attempts}회 시도 모두 실패", last_error)
+        finally:
+            # 시험 호출이 성공/실패 기록 없이 끝나면(요청 한도 대기 중 예산 초과 등) 회로가 시험 중 상태로
+            # 남아 실행이 끝날 때까지 모든 호출을 거절하지 않도록 시험 권한을 돌려줌
+            if probing:
+                breaker.release_probe()
+
+    def _record_failure(self, breaker):
+        """재시도까지 실패한 호출 1건을 회로 차단기에 기록 (빈 응답이 정상인 종목이 섞여도 연속 실패로만 열림)"""
+        if breaker.record_failure():
+            self.metrics.incr('circuit_opened', source=breaker.source)
+            self.logger.warning(f"[조회] {breaker.source} 회로 차단기 열림 ({breaker.reset_timeout:.0f}초 동안 호출 생략)")
+
+
+def non_empty(df):
+    """빈 DataFrame/None 이 아닌 응답만 성공으로 인정"""
+    return df is not None and not df.empty
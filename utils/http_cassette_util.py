@@ -0,0 +1,228 @@
+import gzip
+import hashlib
+import os
+import pickle
+import re
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from utils.logger_util import LoggerUtil
+
+class CassetteMiss(Exception):
+    """재생 모드에서 녹화되지 않은 요청"""
+    pass
+
+
+class HttpCassetteUtil:
+    """requests 전송 계층(Session.send)에서 HTTP 요청/응답을 녹화하고 재생
+
+    pykrx, 네이버 API, OpenDartReader, 텔레그램, 게시판 호출이 모두 requests 를
+    거치므로 Session.send 하나만 교체하면 모든 외부 호출이 카세트를 통한다.
+    record 모드는 실제 요청을 보내고 응답을 모아 두었다가 종료 시 gzip 카세트로
+    저장하고, replay 모드는 네트워크 없이 메모리의 응답을 돌려준다.
+
+    같은 요청(메서드, URL, 본문)이 여러 번 녹화되면 녹화 순서대로 돌려주고,
+    multipart 경계값처럼 본문이 매번 달라지는 요청은 (메서드, URL) 순서로 대응한다.
+    URL 의 텔레그램 봇 토큰과 DART 인증키는 가려서 저장한다.
+    meta 에는 재생에 필요한 실행 정보(예: 기준 거래일 'as_of')를 함께 저장한다.
+    """
+    _instance = None
+    _initialized = False
+    MODES = ('record', 'replay')
+    SECRET_PARAMS = ('crtfc_key',)
+    BOT_TOKEN_PATTERN = re.compile(r'/bot[^/]+/')
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(HttpCassetteUtil, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not HttpCassetteUtil._initialized:
+            self.logger = LoggerUtil().get_logger()
+            self._lock = threading.Lock()
+            self.mode = None
+            self.path = None
+            self.latency = None
+            self._original_send = None
+            self._interactions = []
+            self.meta = {}
+            self._by_request = {}
+            self._by_url = {}
+            self._cursors = {}
+            self._replayed = set()
+            HttpCassetteUtil._initialized = True
+
+    @staticmethod
+    def default_path():
+        root_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent
+        return root_dir / 'cassettes' / 'http.pkl.gz'
+
+    @property
+    def active(self):
+        return self.mode is not None
+
+    def install(self, mode, path=None, latency=None):
+        """requests.Session.send 를 녹화/재생 함수로 교체
+
+        latency 는 재생 시 응답마다 기다릴 시간으로, 'recorded' 면 녹화 당시
+        소요 시간을, 숫자면 그 초만큼을, None/0 이면 기다리지 않는다.
+        """
+        import requests
+
+        if mode not in self.MODES:
+            raise ValueError(f"알 수 없는 카세트 모드: {mode} ({', '.join(self.MODES)})")
+        if self.active:
+            return
+        self.mode = mode
+        self.path = Path(path) if path else self.default_path()
+        self.latency = None if latency in (None, '', '0', 0) else latency
+
+        if mode == 'replay':
+            self.load()
+        self._original_send = requests.Session.send
+        cassette = self
+
+        def send(session, request, **kwargs):
+            if cassette.mode == 'replay':
+                return cassette._replay(request)
+            return cassette._record(session, request, **kwargs)
+        requests.Session.send = send
+
+        if mode == 'record':
+            import atexit
+            atexit.register(self.save)
+        self.logger.info(f"HTTP 카세트 {mode} 모드: {self.path}")
+
+    def uninstall(self):
+        """원래 전송 함수 복원 (녹화 중이면 먼저 저장)"""
+        import requests
+
+        if not self.active:
+            return
+        if self.mode == 'record':
+            self.save()
+        requests.Session.send = self._original_send
+        self.mode = None
+
+    @classmethod
+    def _scrub_url(cls, url):
+        """URL 에서 봇 토큰과 인증키를 가리고 쿼리 파라미터를 정렬"""
+        parts = urlsplit(cls.BOT_TOKEN_PATTERN.sub('/bot***/', url))
+        query = [(key, '***' if key in cls.SECRET_PARAMS else value)
+                 for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+        return urlunsplit(parts._replace(query=urlencode(sorted(query))))
+
+    @staticmethod
+    def _body_digest(body):
+        if body is None:
+            return None
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if not isinstance(body, (bytes, bytearray)):
+            return None  # 스트리밍 본문은 URL 기준으로만 대응
+        return hashlib.sha1(body).hexdigest()
+
+    def _keys(self, request):
+        url = self._scrub_url(request.url)
+        return (request.method, url, self._body_digest(request.body)), (request.method, url)
+
+    def _index(self, interaction):
+        request_key = (interaction['method'], interaction['url'], interaction['body'])
+        self._by_request.setdefault(request_key, []).append(interaction)
+        self._by_url.setdefault(request_key[:2], []).append(interaction)
+
+    def _record(self, session, request, **kwargs):
+        started = time.monotonic()
+        response = self._original_send(session, request, **kwargs)
+        elapsed = time.monotonic() - started
+        (method, url, body), _ = self._keys(request)
+        interaction = {
+            'method': method,
+            'url': url,
+            'body': body,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'content': response.content,
+            'encoding': response.encoding,
+            'elapsed': elapsed
+        }
+        with self._lock:
+            self._interactions.append(interaction)
+        return response
+
+    def _next(self, index, key):
+        """색인에서 아직 재생하지 않은 첫 응답 (모두 재생했으면 None)"""
+        queue = index.get(key) or []
+        cursor = self._cursors.get((id(index), key), 0)
+        while cursor < len(queue) and id(queue[cursor]) in self._replayed:
+            cursor += 1
+        self._cursors[(id(index), key)] = cursor
+        return queue[cursor] if cursor < len(queue) else None
+
+    def _take(self, request):
+        """요청에 대응하는 응답 선택 (같은 요청 → 같은 URL 순, 모두 소진되면 마지막 응답 반복)"""
+        request_key, url_key = self._keys(request)
+        with self._lock:
+            interaction = self._next(self._by_request, request_key) or self._next(self._by_url, url_key)
+            if interaction is None:
+                queue = self._by_request.get(request_key) or self._by_url.get(url_key)
+                if not queue:
+                    raise CassetteMiss(f"녹화되지 않은 요청: {request_key[0]} {request_key[1]}")
+                return queue[-1]
+            self._replayed.add(id(interaction))
+        return interaction
+
+    def _replay(self, request):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        interaction = self._take(request)
+        delay = interaction['elapsed'] if self.latency == 'recorded' else float(self.latency or 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = interaction['status_code']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response._content = interaction['content']
+        response.encoding = interaction['encoding']
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=interaction['elapsed'])
+        return response
+
+    def load(self):
+        """카세트 파일을 읽어 재생 색인 구성"""
+        with gzip.open(self.path, 'rb') as f:
+            stored = pickle.load(f)
+        interactions = stored['interactions']
+        with self._lock:
+            self.meta = dict(stored.get('meta') or {})
+            self._interactions = interactions
+            self._by_request, self._by_url = {}, {}
+            self._cursors, self._replayed = {}, set()
+            for interaction in interactions:
+                self._index(interaction)
+        self.logger.info(f"HTTP 카세트 로드: {self.path} ({len(interactions)}건)")
+        return len(interactions)
+
+    def save(self):
+        """녹화한 요청/응답을 gzip 카세트로 저장 (임시 파일 기록 후 이름 변경)"""
+        if self.mode != 'record':
+            return None
+        with self._lock:
+            interactions = list(self._interactions)
+        if not interactions:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp_path, 'wb') as f:
+            pickle.dump({'meta': self.meta, 'interactions': interactions}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.logger.info(f"HTTP 카세트 저장: {self.path} ({len(interactions)}건)")
+        return self.path
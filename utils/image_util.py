@@ -0,0 +1,119 @@
+import io
+import os
+from PIL import Image
+
+class ImageUtil:
+    """업로드 규격(너비, 용량)에 맞춘 리포트 이미지 생성 도우미"""
+    MAX_WIDTH = 800  # 게시판/텔레그램 전달 최대 너비
+    MAX_FILE_SIZE = 1 * 1024 * 1024  # 1MB
+    PALETTE_COLORS = 256
+    UPLOAD_FORMATS = ('PNG', 'JPEG')
+    JPEG_MIN_QUALITY = 30
+    JPEG_MAX_QUALITY = 90
+    JPEG_MAX_ENCODES = 5
+
+    def render_options(self, layout_width, **extra):
+        """레이아웃 너비를 전달 너비로 축소 렌더링하는 imgkit 옵션 생성"""
+        options = {
+            'encoding': "UTF-8",
+            'width': min(layout_width, self.MAX_WIDTH),
+            'enable-local-file-access': None
+        }
+        if layout_width > self.MAX_WIDTH:
+            # 넓은 레이아웃은 줌으로 축소해서 처음부터 전달 너비로 렌더링
+            options['zoom'] = round(self.MAX_WIDTH / layout_width, 4)
+        options.update(extra)
+        return options
+
+    def is_upload_ready(self, image_path):
+        """재인코딩 없이 그대로 업로드 가능한 이미지인지 확인 (헤더만 읽음)"""
+        if os.path.getsize(image_path) > self.MAX_FILE_SIZE:
+            return False
+        with Image.open(image_path) as img:
+            return img.format in self.UPLOAD_FORMATS and img.width <= self.MAX_WIDTH
+
+    @staticmethod
+    def mime_type(format):
+        """PIL 포맷명을 MIME 타입으로 변환"""
+        return f"image/{format.lower()}"
+
+    def _fit_width(self, img):
+        """최대 너비를 넘는 이미지 축소"""
+        if img.width <= self.MAX_WIDTH:
+            return img
+        ratio = self.MAX_WIDTH / img.width
+        return img.resize((self.MAX_WIDTH, int(img.height * ratio)), Image.Resampling.LANCZOS)
+
+    def _encode_jpeg(self, img, quality):
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+    def encode_jpeg_within_budget(self, img, max_bytes=None):
+        """용량 예산 안에서 가장 높은 품질의 JPEG 인코딩
+
+        첫 인코딩 결과의 용량 비율로 품질을 추정하고, 이후에는 확보한 상/하한
+        사이를 보간 탐색하므로 보통 2회 인코딩으로 예산에 맞춰진다.
+        """
+        max_bytes = max_bytes or self.MAX_FILE_SIZE
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+
+        lo, hi = self.JPEG_MIN_QUALITY, self.JPEG_MAX_QUALITY
+        lo_size, hi_size = None, None
+        best = None
+        quality = hi
+
+        for _ in range(self.JPEG_MAX_ENCODES):
+            data = self._encode_jpeg(img, quality)
+            size = len(data)
+            if size <= max_bytes:
+                best = data
+                lo, lo_size = quality, size
+                # 예산의 80% 이상을 쓰거나 상한에 도달했으면 충분
+                if quality >= hi or size >= max_bytes * 0.8:
+                    break
+            else:
+                hi, hi_size = quality, size
+                if hi <= self.JPEG_MIN_QUALITY:
+                    break
+
+            if hi - lo <= 2:
+                break
+
+            # 용량이 품질에 대략 비례한다고 보고 다음 품질 추정
+            if lo_size is not None and hi_size is not None:
+                ratio = (max_bytes * 0.95 - lo_size) / max(hi_size - lo_size, 1)
+                next_quality = int(lo + (hi - lo) * ratio)
+            else:
+                next_quality = int(quality * (max_bytes * 0.95) / size)
+            quality = min(max(next_quality, lo + 1), hi - 1)
+
+        if best is None:
+            # 최저 품질로도 초과하면 최저 품질 결과 사용
+            best = self._encode_jpeg(img, self.JPEG_MIN_QUALITY)
+        return best
+
+    def encode_for_upload(self, img):
+        """이미지를 업로드 규격으로 인코딩하고 (바이트, 포맷) 반환"""
+        rgb = self._fit_width(img).convert('RGB')
+
+        # 표 위주의 이미지라 색상 수가 적어 팔레트 PNG가 가장 작음
+        if img.format != 'JPEG':
+            palette = rgb.quantize(colors=self.PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+            buffer = io.BytesIO()
+            palette.save(buffer, format='PNG', optimize=True)
+            if buffer.tell() <= self.MAX_FILE_SIZE:
+                return buffer.getvalue(), 'PNG'
+
+        return self.encode_jpeg_within_budget(rgb), 'JPEG'
+
+    def finalize_bytes(self, data):
+        """렌더링 결과 바이트를 업로드 규격으로 변환하고 (바이트, 포맷, 너비) 반환"""
+        with Image.open(io.BytesIO(data)) as img:
+            if img.format == 'JPEG' and len(data) <= self.MAX_FILE_SIZE and img.width <= self.MAX_WIDTH:
+                return data, img.format, img.width
+            img.load()
+            width = min(img.width, self.MAX_WIDTH)
+            data, format = self.encode_for_upload(img)
+        return data, format, width
@@ -1,11 +1,69 @@
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
 import os
 
+class DailyFileHandler(logging.FileHandler):
+    """기록 시각의 날짜로 logs/{YYYY-MM-DD}_log.log 파일을 바꿔 가며 기록
+
+    상주 프로세스에서도 자정이 지나면 새 날짜 파일에 기록된다.
+    """
+    def __init__(self, log_dir):
+        self.log_dir = Path(log_dir)
+        self.current_date = datetime.now().strftime('%Y-%m-%d')
+        super().__init__(self._path(self.current_date), encoding='utf-8', delay=True)
+
+    def _path(self, date):
+        return self.log_dir / f"{date}_log.log"
+
+    def emit(self, record):
+        date = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d')
+        if date != self.current_date:
+            self.close()
+            self.current_date = date
+            self.baseFilename = os.path.abspath(self._path(date))
+        super().emit(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나씩 JSON 객체로 기록 (시각, 레벨, 스레드, 리포트, 메시지, 예외)"""
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'report': getattr(record, 'report', None),
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ReportFilter(logging.Filter):
+    """기록하는 스레드의 리포트(MetricsUtil report label)를 레코드에 추가"""
+    def filter(self, record):
+        from utils.metrics_util import MetricsUtil  # metrics_util 이 logger_util 을 import 하므로 호출 시점에 불러옴
+        record.report = MetricsUtil().current_report() if MetricsUtil._initialized else None
+        return True
+
+
 class LoggerUtil:
+    """큐 기반 비동기 로거
+
+    호출한 스레드는 레코드를 큐에 넣기만 하고, 파일(JSON, 날짜별)과 콘솔 기록은
+    QueueListener 스레드가 맡으므로 fetch/render 스레드가 로그 기록으로 멈추지 않는다.
+    종료 시 남은 레코드를 모두 기록한다.
+    """
     _instance = None
     _initialized = False
+    PROGRESS_INTERVAL = 5.0  # progress() 로그 최소 간격(초)
 
     def __new__(cls):
         if cls._instance is None:
@@ -17,42 +75,69 @@ class LoggerUtil:
             # 루트 디렉토리 경로 찾기 (상위 디렉토리)
             current_dir = Path(os.path.dirname(os.path.abspath(__file__)))
             root_dir = current_dir.parent
-            
+
             # 로그 디렉토리를 루트 경로의 logs 폴더로 설정
             log_dir = root_dir / 'logs'
 
             # 디렉토리가 없으면 생성
             log_dir.mkdir(parents=True, exist_ok=True)
 
-            # 로그 파일 설정
-            log_file = log_dir / f"{datetime.now().strftime('%Y-%m-%d')}_log.log"
-
             # 로거 생성
             self.logger = logging.getLogger('MQLogger')
             self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
 
             # 이미 핸들러가 있다면 제거
             if self.logger.handlers:
                 self.logger.handlers.clear()
 
-            # 파일 핸들러
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            # 파일 핸들러 (JSON, 날짜별 파일)
+            file_handler = DailyFileHandler(log_dir)
             file_handler.setLevel(logging.INFO)
+            file_handler.setFormatter(JsonFormatter())
 
             # 콘솔 핸들러
             console_handler = logging.StreamHandler()
             console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
 
-            # 포맷터 설정
-            formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
+            # 호출 스레드는 큐에 넣기만 하고 실제 기록은 리스너 스레드에서 수행
+            log_queue = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.addFilter(ReportFilter())
+            self.logger.addHandler(queue_handler)
+            self.listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+            self.listener.start()
+            atexit.register(self.shutdown)
+            # 프로세스 풀 작업자(fork)에서도 큐를 비우도록 리스너 스레드를 다시 시작
+            os.register_at_fork(after_in_child=self._restart_listener)
+
+            self._progress_lock = threading.Lock()
+            self._progress = {}
 
-            # 핸들러 추가
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
-            
             LoggerUtil._initialized = True
 
     def get_logger(self):
-        return self.logger 
\ No newline at end of file
+        return self.logger
+
+    def progress(self, key, current, total, message, interval=None):
+        """반복 작업 진행 상황을 key 별로 interval 초에 한 번만 기록 (처음과 마지막은 항상 기록)"""
+        now = time.monotonic()
+        with self._progress_lock:
+            last = self._progress.get(key)
+            if last is not None and current < total and now - last < (interval or self.PROGRESS_INTERVAL):
+                return False
+            self._progress[key] = now
+            if current >= total:
+                self._progress.pop(key, None)
+        self.logger.info(f"{message} ({current}/{total})")
+        return True
+
+    def _restart_listener(self):
+        self.listener._thread = None
+        self.listener.start()
+
+    def shutdown(self):
+        """큐에 남은 레코드를 모두 기록하고 리스너 종료"""
+        if self.listener._thread is not None:
+            self.listener.stop()
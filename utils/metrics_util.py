@@ -0,0 +1,188 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from utils.logger_util import LoggerUtil
+
+class MetricsUtil:
+    """구간(span) 소요 시간과 카운터를 모아 실행 종료 시 JSON/Prometheus 파일로 기록
+
+    span 은 호출 횟수, 누적/최대 소요 시간, 오류 횟수를 기록하고 카운터는 값을
+    누적한다. 둘 다 label 로 구분되며, 파이프라인 단계가 실행 중인 스레드에서는
+    report label 이 자동으로 채워진다.
+    """
+    _instance = None
+    _initialized = False
+    PREFIX = 'investment_report'
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MetricsUtil, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not MetricsUtil._initialized:
+            root_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent
+            self.metrics_dir = root_dir / 'metrics'
+            # node_exporter textfile collector 디렉토리 (미지정 시 metrics/)
+            textfile_dir = os.getenv('METRICS_TEXTFILE_DIR')
+            self.textfile_dir = Path(textfile_dir) if textfile_dir else self.metrics_dir
+            self.logger = LoggerUtil().get_logger()
+            self._lock = threading.Lock()
+            self._local = threading.local()
+            self._thread_reports = {}  # 스레드 ident -> 실행 중인 리포트 (프로파일러가 참조)
+            self.reset()
+            MetricsUtil._initialized = True
+
+    def reset(self):
+        """누적 값 초기화 (실행 시작 시 호출)"""
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+            self._started_at = time.time()
+
+    def current_report(self):
+        return getattr(self._local, 'report', None)
+
+    def thread_reports(self):
+        """현재 report label 이 지정된 스레드 목록 {스레드 ident: 리포트}"""
+        return dict(self._thread_reports)
+
+    @contextmanager
+    def report(self, report):
+        """블록 안에서 기록되는 값에 report label 지정"""
+        previous = self.current_report()
+        ident = threading.get_ident()
+        self._local.report = report
+        self._thread_reports[ident] = report
+        try:
+            yield
+        finally:
+            self._local.report = previous
+            if previous is None:
+                self._thread_reports.pop(ident, None)
+            else:
+                self._thread_reports[ident] = previous
+
+    def _key(self, name, labels):
+        if 'report' not in labels and self.current_report():
+            labels['report'] = self.current_report()
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def observe(self, name, seconds, error=False, **labels):
+        """span 1회 기록"""
+        key = self._key(name, labels)
+        with self._lock:
+            span = self._spans.setdefault(key, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            span['calls'] += 1
+            span['seconds'] += seconds
+            span['max_seconds'] = max(span['max_seconds'], seconds)
+            if error:
+                span['errors'] += 1
+
+    @contextmanager
+    def span(self, name, **labels):
+        """블록 소요 시간 기록 (예외 발생 시 오류 횟수도 증가)"""
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.observe(name, time.monotonic() - started, error=True, **labels)
+            raise
+        self.observe(name, time.monotonic() - started, **labels)
+
+    @classmethod
+    def timed(cls, name):
+        """함수 전체를 span 으로 기록하는 데코레이터"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls().span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def incr(self, name, value=1, **labels):
+        """카운터 증가 (호출/재시도/바이트/캐시 적중 등)"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'started_at': datetime.fromtimestamp(self._started_at).isoformat(timespec='seconds'),
+                'duration_seconds': round(time.time() - self._started_at, 3),
+                'spans': [dict(name=name, labels=dict(labels), **values) for (name, labels), values in self._spans.items()],
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in self._counters.items()]
+            }
+
+    @staticmethod
+    def _format_labels(labels):
+        if not labels:
+            return ''
+        escaped = []
+        for key, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+
+    def _prometheus(self, snapshot, run, job):
+        prefix = self.PREFIX
+        lines = []
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{self._format_labels(labels)} {value}")
+
+        spans = snapshot['spans']
+        span_labels = [dict(span=span['name'], **span['labels']) for span in spans]
+        metric('span_calls_total', 'counter', 'Number of calls per span',
+               [(labels, span['calls']) for labels, span in zip(span_labels, spans)])
+        metric('span_errors_total', 'counter', 'Number of failed calls per span',
+               [(labels, span['errors']) for labels, span in zip(span_labels, spans)])
+        metric('span_seconds_total', 'counter', 'Total seconds spent per span',
+               [(labels, round(span['seconds'], 6)) for labels, span in zip(span_labels, spans)])
+        metric('span_seconds_max', 'gauge', 'Longest single call per span',
+               [(labels, round(span['max_seconds'], 6)) for labels, span in zip(span_labels, spans)])
+
+        by_name = {}
+        for counter in snapshot['counters']:
+            by_name.setdefault(counter['name'], []).append((counter['labels'], counter['value']))
+        for name, samples in sorted(by_name.items()):
+            metric(f"{name}_total", 'counter', f"{name} counter", samples)
+
+        metric('run_duration_seconds', 'gauge', 'Duration of the last run', [({'job': job, 'run': run}, snapshot['duration_seconds'])])
+        metric('run_timestamp_seconds', 'gauge', 'Finish time of the last run', [({'job': job, 'run': run}, int(time.time()))])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, run, job='report'):
+        """metrics/{run}.json 과 Prometheus textfile({PREFIX}_{job}.prom)을 기록하고 경로 반환
+
+        textfile 은 작업 종류(job)별로 하나씩 두어 마지막 실행 값으로 덮어쓴다.
+        """
+        snapshot = self.snapshot()
+        snapshot.update(run=run, job=job)
+        try:
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            json_path = self.metrics_dir / f"{run}.json"
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+            self.textfile_dir.mkdir(parents=True, exist_ok=True)
+            prom_path = self.textfile_dir / f"{self.PREFIX}_{job}.prom"
+            # collector 가 쓰는 중인 파일을 읽지 않도록 임시 파일 기록 후 이름 변경
+            tmp_path = prom_path.with_name(f"{prom_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self._prometheus(snapshot, run, job))
+            os.replace(tmp_path, prom_path)
+        except Exception as e:
+            self.logger.warning(f"메트릭 기록 실패: {str(e)}")
+            return None
+        self.logger.info(f"메트릭 기록 완료: {json_path}, {prom_path}")
+        return json_path, prom_path
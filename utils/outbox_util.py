@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from utils.logger_util import LoggerUtil
+
+class OutboxUtil:
+    """게시판 등록/텔레그램 전송 작업을 SQLite에 보관하고 재전송하는 아웃박스
+
+    작업마다 멱등 키를 두어 이미 전송된 작업은 다시 보내지 않으며, 실패한
+    작업은 첨부 이미지 사본(spool)과 함께 남아 리포트를 다시 계산하지 않고도
+    `python main.py --flush-outbox` 로 재전송할 수 있다.
+    spool 사본은 이미지 내용 해시별로 한 번만 기록해 같은 이미지를 첨부한
+    작업(채팅방별 전송, 게시글 등록)이 함께 사용한다.
+    """
+    KIND_TELEGRAM_MEDIA = 'telegram_media'
+    KIND_BOARD_POST = 'board_post'
+    MAX_ATTEMPTS = 10
+
+    def __init__(self, telegram=None, api_util=None, base_dir=None):
+        root_dir = Path(os.getenv('STATE_DIR') or Path(os.path.dirname(os.path.abspath(__file__))).parent)
+        self.base_dir = Path(base_dir) if base_dir else root_dir / 'outbox'
+        self.spool_dir = self.base_dir / 'spool'
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.base_dir / 'outbox.db'
+        self.telegram = telegram
+        self.api_util = api_util
+        self.logger = LoggerUtil().get_logger()
+        # 텔레그램 전송 큐 스레드와 메인 스레드가 같은 연결을 사용하므로 잠금으로 직렬화
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                artifacts TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind, *parts):
+        """작업 종류와 식별 값으로 멱등 키 생성"""
+        raw = '|'.join([kind, *[str(part) for part in parts]])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def _now(self):
+        return datetime.now().isoformat(timespec='seconds')
+
+    def _spool(self, artifacts):
+        """첨부 이미지를 내용 해시별 spool 디렉토리에 (없을 때만) 기록하고 경로 목록 반환"""
+        paths = []
+        for artifact in artifacts:
+            if isinstance(artifact, (str, os.PathLike)):
+                paths.append(str(artifact))
+                continue
+            content_dir = self.spool_dir / hashlib.sha1(artifact.data).hexdigest()[:20]
+            path = content_dir / artifact.name
+            if not path.exists():
+                content_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(artifact.data)
+                os.replace(tmp_path, path)
+            paths.append(str(path))
+        return paths
+
+    def _get_job(self, job_key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_key, kind, payload, artifacts, status, attempts FROM jobs WHERE job_key = ?",
+                (job_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'job_key': row[0],
+            'kind': row[1],
+            'payload': json.loads(row[2]),
+            'artifacts': json.loads(row[3]),
+            'status': row[4],
+            'attempts': row[5]
+        }
+
+    def enqueue(self, kind, job_key, payload, artifacts=None):
+        """작업 등록 (이미 등록된 키면 기존 작업 유지) 후 작업 상태 반환"""
+        with self._lock:
+            job = self._get_job(job_key)
+            if job is not None:
+                return job
+            paths = self._spool(artifacts or [])
+            now = self._now()
+            self._conn.execute(
+                "INSERT INTO jobs (job_key, kind, payload, artifacts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_key, kind, json.dumps(payload, ensure_ascii=False), json.dumps(paths), now, now)
+            )
+            self._conn.commit()
+            return self._get_job(job_key)
+
+    def _mark(self, job_key, status, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, last_error = ?, updated_at = ? WHERE job_key = ?",
+                (status, error, self._now(), job_key)
+            )
+            self._conn.commit()
+
+    def _deliver(self, kind, payload, images):
+        """작업 종류별 실제 전송"""
+        if kind == self.KIND_TELEGRAM_MEDIA:
+            chat_ids = [payload['chat_id']] if payload.get('chat_id') else None
+            result = self.telegram.send_multiple_photo(images, payload.get('caption', ''), chat_ids=chat_ids)
+            if isinstance(result, dict) and not result.get('ok', True):
+                raise RuntimeError(f"텔레그램 전송 실패: {result.get('description')}")
+            return result
+        if kind == self.KIND_BOARD_POST:
+            return self.api_util.create_post(image_paths=images or None, **payload)
+        raise ValueError(f"알 수 없는 작업 종류: {kind}")
+
+    def publish(self, kind, job_key, payload, artifacts=None):
+        """작업을 기록한 뒤 즉시 전송 시도
+
+        메모리에 있는 아티팩트를 그대로 사용해 전송하며, 이미 전송 완료된
+        작업이면 건너뛴다. 실패 시 예외를 다시 던지며 작업은 재전송 대기로 남는다.
+        """
+        job = self.enqueue(kind, job_key, payload, artifacts)
+        if job['status'] == 'done':
+            self.logger.info(f"이미 전송된 작업 건너뜀: {kind} {job_key}")
+            return None
+        try:
+            result = self._deliver(kind, payload, artifacts or job['artifacts'])
+        except Exception as e:
+            self._mark(job_key, 'pending', getattr(e, 'message', str(e)))
+            self.logger.error(f"작업 전송 실패 (아웃박스 보관): {kind} {job_key} - {str(e)}")
+            raise
+        self._mark(job_key, 'done')
+        self._cleanup_spool(job_key)
+        return result
+
+    def pending_jobs(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_key FROM jobs WHERE status = 'pending' ORDER BY created_at"
+            ).fetchall()
+        return [self._get_job(row[0]) for row in rows]
+
+    def flush(self):
+        """재전송 대기 중인 작업을 spool 사본으로 다시 전송하고 (성공, 실패) 건수 반환"""
+        delivered, failed = 0, 0
+        for job in self.pending_jobs():
+            try:
+                self._deliver(job['kind'], job['payload'], job['artifacts'])
+            except Exception as e:
+                failed += 1
+                status = 'failed' if job['attempts'] + 1 >= self.MAX_ATTEMPTS else 'pending'
+                self._mark(job['job_key'], status, getattr(e, 'message', str(e)))
+                self.logger.error(f"아웃박스 재전송 실패: {job['kind']} {job['job_key']} - {str(e)}")
+                continue
+            delivered += 1
+            self._mark(job['job_key'], 'done')
+            self._cleanup_spool(job['job_key'])
+            self.logger.info(f"아웃박스 재전송 성공: {job['kind']} {job['job_key']}")
+        return delivered, failed
+
+    def _cleanup_spool(self, job_key):
+        """완료된 작업의 spool 사본 중 아직 전송되지 않은 다른 작업이 쓰지 않는 사본 삭제"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_key, artifacts FROM jobs WHERE job_key = ? OR status != 'done'", (job_key,)
+            ).fetchall()
+            paths = set()
+            in_use = set()
+            for key, artifacts in rows:
+                (paths if key == job_key else in_use).update(json.loads(artifacts))
+            spool_dir = self.spool_dir.resolve()
+            for path in paths - in_use:
+                path = Path(path)
+                # 호출자가 넘긴 원본 파일 경로는 건드리지 않고 spool 사본만 삭제
+                if path.resolve().parent.parent != spool_dir:
+                    continue
+                path.unlink(missing_ok=True)
+                try:
+                    path.parent.rmdir()
+                except OSError:
+                    pass
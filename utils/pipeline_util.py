@@ -0,0 +1,320 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from utils.fetch_util import DeadlineExceeded
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
+
+class Stage:
+    """파이프라인 단계 (이름, 실행 함수, 선행 단계)
+
+    func 는 deps 순서대로 선행 단계 결과를 위치 인자로 받는다.
+    CPU 작업을 프로세스로 나누는 일은 단계 안에서 직접 한다 (예: RSReport 의 RS 일괄 계산).
+    fallback 단계는 시간 예산 안에 끝나지 못하면 직전 거래일 체크포인트의
+    결과(last-good)로 대체된다.
+    """
+    def __init__(self, name, func, deps=(), fallback=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.fallback = fallback
+        self.started_at = None
+        self.finished_at = None
+        self.status = 'pending'  # pending / running / done / failed / skipped
+        self.restored = False  # 체크포인트에서 복원된 단계 여부
+        self.degraded = None  # 'partial'(일부만 집계) / 'fallback'(직전 데이터로 대체)
+        self.timed_out = False  # 시간 예산 초과로 실패/건너뜀
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+def degraded_note(value):
+    """시간 예산 초과로 일부만 집계됐거나 직전 데이터로 대체된 결과의 안내 문구 (해당 없으면 None)"""
+    attrs = getattr(value, 'attrs', None) or {}
+    if 'stale_as_of' in attrs:
+        as_of = datetime.strptime(attrs['stale_as_of'], '%Y%m%d').strftime('%Y-%m-%d')
+        return f"※ 시간 예산 초과로 {as_of} 기준 직전 데이터입니다"
+    if 'partial' in attrs:
+        done, total = attrs['partial']
+        return f"※ 시간 예산 초과로 전체 {total}개 중 {done}개 종목만 집계했습니다"
+    return None
+
+
+class PipelineError(Exception):
+    """파이프라인 구성 오류"""
+    pass
+
+
+class Pipeline:
+    """선행 관계가 없는 단계를 동시에 실행하는 의존성 그래프 스케줄러
+
+    deadline(time.monotonic 기준 시각)을 지정하면 그때까지 끝나지 않은 fallback
+    단계는 기다리지 않고 직전 데이터로 대체해 후속 렌더링/발행이 제시간에 진행된다.
+    """
+    def __init__(self, max_threads=4, checkpoint=None, deadline=None):
+        self.max_threads = max_threads
+        self.checkpoint = checkpoint
+        self.deadline = deadline
+        self.stages = {}
+        self.results = {}
+        self.logger = LoggerUtil().get_logger()
+        self.metrics = MetricsUtil()
+        self._started_at = None
+        self._finished_at = None
+
+    def add(self, name, func, deps=(), fallback=False):
+        """단계 추가 후 단계 이름 반환"""
+        if name in self.stages:
+            raise PipelineError(f"중복된 단계 이름: {name}")
+        self.stages[name] = Stage(name, func, deps, fallback)
+        return name
+
+    def add_stages(self, prefix, stages, deps=(), fallback=()):
+        """리포트가 선언한 (이름, 함수, 선행 단계) 목록을 접두어를 붙여 추가
+
+        리포트 내부 선행 단계도 접두어가 붙으며, 선행 단계가 없는 단계에는
+        deps 가 추가로 걸린다. fallback 에 포함된 단계는 시간 예산 초과 시 직전
+        데이터로 대체된다. 추가된 마지막 단계 이름을 반환한다.
+        """
+        last = None
+        for name, func, stage_deps in stages:
+            full_deps = [f"{prefix}.{dep}" for dep in stage_deps] or list(deps)
+            last = self.add(f"{prefix}.{name}", func, full_deps, fallback=name in fallback)
+        return last
+
+    @staticmethod
+    def _report_of(stage_name):
+        """'rs.compute_kospi' 형식의 단계 이름에서 리포트 이름 추출"""
+        return stage_name.partition('.')[0]
+
+    def _call(self, stage, args):
+        """스레드 풀에서 단계 실행 (단계 안에서 기록되는 메트릭에 리포트 label 지정)"""
+        with self.metrics.report(self._report_of(stage.name)):
+            return stage.func(*args)
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise PipelineError(f"{stage.name}: 존재하지 않는 선행 단계 {dep}")
+        # 순환 의존 확인
+        visiting, visited = set(), set()
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise PipelineError(f"순환 의존 발견: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+        for name in self.stages:
+            visit(name)
+
+    def _restore(self, stage):
+        """체크포인트에 저장된 단계 결과가 있으면 복원"""
+        if self.checkpoint is None:
+            return False
+        report, stage_key = self.checkpoint.split_stage(stage.name)
+        if not self.checkpoint.has(report, stage_key):
+            return False
+        try:
+            self.results[stage.name] = self.checkpoint.load(report, stage_key)
+        except Exception as e:
+            self.logger.warning(f"[파이프라인] {stage.name} 체크포인트 로드 실패, 다시 실행: {str(e)}")
+            return False
+        stage.status = 'done'
+        stage.restored = True
+        self.logger.info(f"[파이프라인] {stage.name} 체크포인트에서 복원")
+        return True
+
+    def _save(self, stage, result):
+        if self.checkpoint is None or degraded_note(result):
+            # 일부만 집계된 결과는 재실행 시 복원되지 않도록 저장하지 않음
+            return
+        report, stage_key = self.checkpoint.split_stage(stage.name)
+        try:
+            self.checkpoint.save(report, stage_key, result)
+        except Exception as e:
+            self.logger.warning(f"[파이프라인] {stage.name} 체크포인트 저장 실패: {str(e)}")
+
+    def _fall_back(self, stage, reason):
+        """직전 거래일 체크포인트의 결과로 단계를 대체 (없으면 False)
+
+        대체한 결과에는 기준일을 attrs['stale_as_of'] 로 표시해 렌더링 단계가
+        직전 데이터임을 안내할 수 있게 한다 (DataFrame 결과만 대상).
+        """
+        if not stage.fallback or self.checkpoint is None:
+            return False
+        report, stage_key = self.checkpoint.split_stage(stage.name)
+        last_good = self.checkpoint.latest_before(report, stage_key)
+        if last_good is None or not hasattr(last_good[1], 'attrs'):
+            self.logger.warning(f"[파이프라인] {stage.name} {reason}, 대체할 직전 데이터 없음")
+            return False
+        as_of, result = last_good
+        result.attrs['stale_as_of'] = as_of
+        self.results[stage.name] = result
+        stage.status = 'done'
+        stage.degraded = 'fallback'
+        self.metrics.incr('stage_fallbacks', stage=stage.name)
+        self.logger.warning(f"[파이프라인] {stage.name} {reason}, {as_of} 데이터로 대체")
+        return True
+
+    def _expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _abandonable(self):
+        """마감 시각에 기다리지 않을 단계 (fallback 단계와 그 선행 단계)"""
+        names = set()
+        def visit(name):
+            if name not in names:
+                names.add(name)
+                for dep in self.stages[name].deps:
+                    visit(dep)
+        for stage in self.stages.values():
+            if stage.fallback:
+                visit(stage.name)
+        return names
+
+    def run(self):
+        """모든 단계를 실행하고 {단계 이름: 결과} 반환
+
+        실패한 단계의 후속 단계는 건너뛰며, 나머지 독립 단계는 계속 진행한다.
+        체크포인트가 지정되면 이미 완료된 단계는 저장된 결과로 대체하고,
+        새로 완료된 단계의 결과는 저장한다. 시간 예산 초과로 실행하지 못했거나
+        끝나지 않은 fallback 단계는 직전 데이터로 대체한다.
+        """
+        self._validate()
+        self._started_at = time.monotonic()
+        thread_pool = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix='pipeline')
+        running = {}
+        abandoned = False
+        abandonable = self._abandonable() if self.deadline is not None else set()
+
+        def ready(stage):
+            return stage.status == 'pending' and all(self.stages[dep].status == 'done' for dep in stage.deps)
+
+        def blocked(stage):
+            return stage.status == 'pending' and any(self.stages[dep].status in ('failed', 'skipped') for dep in stage.deps)
+
+        try:
+            while True:
+                skipped = True
+                while skipped:
+                    skipped = False
+                    for stage in self.stages.values():
+                        if not blocked(stage):
+                            continue
+                        skipped = True
+                        timed_out = any(self.stages[dep].timed_out for dep in stage.deps)
+                        if timed_out and self._fall_back(stage, "선행 단계 시간 예산 초과"):
+                            continue
+                        stage.status = 'skipped'
+                        stage.timed_out = timed_out
+                        self.logger.warning(f"[파이프라인] {stage.name} 건너뜀 (선행 단계 실패)")
+
+                restored = True
+                while restored:
+                    restored = False
+                    for stage in self.stages.values():
+                        if ready(stage) and self._restore(stage):
+                            restored = True
+
+                for stage in self.stages.values():
+                    if not ready(stage):
+                        continue
+                    if stage.fallback and self._expired() and self._fall_back(stage, "시간 예산 초과로 실행 생략"):
+                        continue
+                    args = [self.results[dep] for dep in stage.deps]
+                    stage.status = 'running'
+                    stage.started_at = time.monotonic()
+                    self.logger.info(f"[파이프라인] {stage.name} 시작")
+                    running[thread_pool.submit(self._call, stage, args)] = stage
+
+                if not running:
+                    break
+
+                # 마감 시각이 지나도 끝나지 않은 fallback 단계(와 그 선행 단계)는 기다리지 않고
+                # 중단해 직전 데이터로 대체
+                timeout = None
+                if any(stage.name in abandonable for stage in running.values()):
+                    timeout = max(0.0, self.deadline - time.monotonic())
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    for future, stage in list(running.items()):
+                        if stage.name not in abandonable:
+                            continue
+                        running.pop(future)
+                        stage.finished_at = time.monotonic()
+                        stage.timed_out = True
+                        abandoned = True
+                        if not self._fall_back(stage, "시간 예산 초과로 중단"):
+                            stage.status = 'failed'
+                            stage.error = DeadlineExceeded('pipeline', stage.name, "시간 예산 초과")
+                            self.logger.error(f"[파이프라인] {stage.name} 시간 예산 초과로 중단 ({stage.duration:.1f}초)")
+                    continue
+
+                for future in done:
+                    stage = running.pop(future)
+                    stage.finished_at = time.monotonic()
+                    report = self._report_of(stage.name)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.metrics.observe('stage', stage.duration, error=True, stage=stage.name, report=report)
+                        stage.error = e
+                        stage.timed_out = isinstance(e, DeadlineExceeded)
+                        if stage.timed_out and self._fall_back(stage, "시간 예산 초과"):
+                            continue
+                        stage.status = 'failed'
+                        self.logger.error(f"[파이프라인] {stage.name} 실패 ({stage.duration:.1f}초): {str(e)}")
+                        continue
+                    self.metrics.observe('stage', stage.duration, stage=stage.name, report=report)
+                    self.results[stage.name] = result
+                    self._save(stage, result)
+                    stage.status = 'done'
+                    if degraded_note(result):
+                        stage.degraded = 'partial'
+                    self.logger.info(f"[파이프라인] {stage.name} 완료 ({stage.duration:.1f}초)")
+        finally:
+            # 중단한 단계가 있으면 그 스레드를 기다리지 않음 (결과는 버림)
+            thread_pool.shutdown(wait=not abandoned)
+            self._finished_at = time.monotonic()
+
+        return self.results
+
+    def critical_path(self):
+        """소요 시간 기준 가장 긴 의존 경로와 총 소요 시간 반환"""
+        memo = {}
+        def longest(name):
+            if name not in memo:
+                stage = self.stages[name]
+                best_path, best_time = [], 0.0
+                for dep in stage.deps:
+                    path, total = longest(dep)
+                    if total > best_time:
+                        best_path, best_time = path, total
+                memo[name] = (best_path + [name], best_time + stage.duration)
+            return memo[name]
+
+        paths = [longest(name) for name in self.stages]
+        return max(paths, key=lambda item: item[1]) if paths else ([], 0.0)
+
+    def log_summary(self):
+        """단계별 소요 시간과 임계 경로를 로그로 출력"""
+        wall_time = (self._finished_at or time.monotonic()) - (self._started_at or time.monotonic())
+        total = sum(stage.duration for stage in self.stages.values())
+        lines = ["[파이프라인] 단계별 소요 시간"]
+        for stage in sorted(self.stages.values(), key=lambda s: s.started_at or float('inf')):
+            status = 'restored' if stage.restored else stage.degraded or stage.status
+            lines.append(f"  {stage.name:<32} {status:<8} {stage.duration:8.1f}초")
+        path, path_time = self.critical_path()
+        lines.append(f"  전체 실행 시간: {wall_time:.1f}초 (단계 합계 {total:.1f}초)")
+        lines.append(f"  임계 경로 ({path_time:.1f}초): {' → '.join(path)}")
+        self.logger.info('\n'.join(lines))
@@ -0,0 +1,171 @@
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
+from utils.price_matrix_util import PriceMatrix
+
+class PriceHistoryUtil:
+    """종목/지수 종가 이력 공유 캐시
+
+    같은 종목을 여러 기간(예: 백필 날짜별 RS 계산)으로 요청해도 한 번 받아 둔
+    구간 안이면 잘라서 돌려주고, 벗어날 때만 합친 구간을 다시 조회한다.
+    reserve() 로 미리 넓은 구간을 지정하면 첫 조회에서 전체 구간을 받아온다.
+    store_path 를 지정하면 생성 시 저장된 이력을 불러오고 save() 로 다시 기록해,
+    미리 조회(--prefetch) 프로세스가 받아 둔 이력을 장 마감 후 실행이 이어서 쓴다.
+    """
+    def __init__(self, store_path=None):
+        self._series = {}
+        self._ranges = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        self._save_lock = threading.Lock()  # 여러 스레드가 같은 임시 파일에 기록하지 않도록
+        self._reserved = None
+        self.logger = LoggerUtil().get_logger()
+        self.store_path = Path(store_path) if store_path else None
+        if self.store_path and self.store_path.exists():
+            self.load()
+
+    @staticmethod
+    def default_store_path():
+        root_dir = Path(os.getenv('STATE_DIR') or Path(os.path.dirname(os.path.abspath(__file__))).parent)
+        return root_dir / 'cache' / 'price_history.pkl'
+
+    def load(self):
+        """저장된 이력 불러오기 (실패 시 빈 캐시로 시작)"""
+        try:
+            with open(self.store_path, 'rb') as f:
+                stored = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"종가 이력 저장소 로드 실패, 새로 조회: {str(e)}")
+            return
+        with self._guard:
+            self._series.update(stored['series'])
+            self._ranges.update(stored['ranges'])
+        self.logger.info(f"종가 이력 저장소 로드: {len(stored['ranges'])}건")
+
+    def save(self):
+        """현재 이력을 저장소에 원자적으로 기록"""
+        if self.store_path is None:
+            return
+        with self._save_lock:
+            with self._guard:
+                stored = {'series': dict(self._series), 'ranges': dict(self._ranges)}
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.store_path.with_name(f"{self.store_path.name}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.store_path)
+
+    def coverage(self):
+        """(이력 건수, 가장 많은 이력이 끝나는 날짜) 반환"""
+        with self._guard:
+            ends = [cached_range[1] for cached_range in self._ranges.values()]
+        if not ends:
+            return 0, None
+        return len(ends), max(set(ends), key=ends.count)
+
+    def reserve(self, start_date, end_date):
+        """이후 조회 시 최소한으로 받아올 구간 지정 (YYYYMMDD)"""
+        with self._guard:
+            if self._reserved:
+                start_date = min(start_date, self._reserved[0])
+                end_date = max(end_date, self._reserved[1])
+            self._reserved = (start_date, end_date)
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key, start_date, end_date, fetcher):
+        """key 의 [start_date, end_date] 구간 종가 Series 반환
+
+        fetcher(start_date, end_date) 는 캐시에 없을 때 호출되며 Series 또는 None 을 반환한다.
+        이미 받아 둔 구간이 있으면 앞뒤로 부족한 구간만 조회해 이어 붙인다
+        (예: 전날까지 받아 둔 이력에 오늘 하루치만 추가).
+        """
+        with self._lock(key):
+            cached_range = self._ranges.get(key)
+            if cached_range is None or start_date < cached_range[0] or end_date > cached_range[1]:
+                MetricsUtil().incr('cache_misses', cache='price_history')
+                fetch_start, fetch_end = start_date, end_date
+                if self._reserved:
+                    fetch_start, fetch_end = min(fetch_start, self._reserved[0]), max(fetch_end, self._reserved[1])
+
+                if cached_range is None:
+                    segments = [(fetch_start, fetch_end)]
+                    parts = []
+                else:
+                    segments = []
+                    if fetch_start < cached_range[0]:
+                        segments.append((fetch_start, self._shift(cached_range[0], -1)))
+                    if fetch_end > cached_range[1]:
+                        segments.append((self._shift(cached_range[1], 1), fetch_end))
+                    parts = [self._series[key]]
+                    fetch_start, fetch_end = min(fetch_start, cached_range[0]), max(fetch_end, cached_range[1])
+
+                for segment_start, segment_end in segments:
+                    part = fetcher(segment_start, segment_end)
+                    if part is None:
+                        return None
+                    parts.append(part)
+
+                series = pd.concat(parts).sort_index() if len(parts) > 1 else parts[0]
+                self._series[key] = series[~series.index.duplicated(keep='last')]
+                self._ranges[key] = (fetch_start, fetch_end)
+
+            else:
+                MetricsUtil().incr('cache_hits', cache='price_history')
+            series = self._series[key]
+
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        return series[(series.index >= start) & (series.index <= end)]
+
+    def matrix(self, keys, dates, labels=None, shared=False):
+        """캐시된 keys 의 종가를 dates 열에 맞춘 float32 PriceMatrix 로 반환
+
+        종목별 구간 Series 를 따로 만들지 않고 캐시에서 바로 행렬에 채운다.
+        행 이름은 labels(기본값 keys)이며, 캐시에 없는 key 의 행은 NaN 이다.
+        """
+        keys = list(keys)
+        matrix = PriceMatrix.empty(labels if labels is not None else keys, dates, shared=shared)
+        for label, key in zip(matrix.tickers, keys):
+            with self._lock(key):
+                series = self._series.get(key)
+            matrix.fill(label, series)
+        return matrix
+
+    @staticmethod
+    def _shift(date, days):
+        return (datetime.strptime(date, '%Y%m%d') + timedelta(days=days)).strftime('%Y%m%d')
+
+    def discard_before(self, date):
+        """date 이전 이력을 버림 (상주 실행 시 메모리 관리용)"""
+        with self._guard:
+            keys = list(self._ranges)
+        cutoff = pd.Timestamp(date)
+        for key in keys:
+            with self._lock(key):
+                cached_range = self._ranges.get(key)
+                if cached_range is None or cached_range[0] >= date:
+                    continue
+                if cached_range[1] < date:
+                    del self._series[key], self._ranges[key]
+                    continue
+                series = self._series[key]
+                self._series[key] = series[series.index >= cutoff]
+                self._ranges[key] = (date, cached_range[1])
+
+    def discard(self, key):
+        """key 의 캐시된 이력을 버림 (액면분할 등으로 과거 종가가 수정된 종목을 전체 구간 다시 조회)"""
+        with self._lock(key):
+            self._series.pop(key, None)
+            self._ranges.pop(key, None)
+
+    def clear(self):
+        with self._guard:
+            self._series.clear()
+            self._ranges.clear()
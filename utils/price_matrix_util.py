@@ -0,0 +1,98 @@
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+class PriceMatrix:
+    """종목 × 거래일 float32 종가 행렬
+
+    종목별 pandas Series 대신 하나의 float32 배열(행: 종목, 열: 거래일)과 공통
+    날짜 인덱스, 종목 → 행 번호 매핑으로 보관한다. 없는 값은 NaN 이다.
+    shared=True 로 만들면 배열이 multiprocessing.shared_memory 에 바로 채워지고,
+    handle() 을 넘겨받은 프로세스 작업자는 attach() 로 복사 없이 같은 메모리를 읽는다.
+
+    정수 종가는 2^24(약 1,677만)까지 float32 로 정확히 표현된다.
+    """
+    DTYPE = np.float32
+
+    def __init__(self, values, dates, tickers, shm=None, owner=False):
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.rows = {ticker: row for row, ticker in enumerate(self.tickers)}
+        self._shm = shm
+        self._owner = owner
+
+    @classmethod
+    def empty(cls, tickers, dates, shared=False):
+        """NaN 으로 채운 행렬 생성 (shared=True 면 공유 메모리에 할당)"""
+        tickers = list(tickers)
+        shape = (len(tickers), len(dates))
+        shm = None
+        if shared:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(cls.DTYPE).itemsize))
+            values = np.ndarray(shape, dtype=cls.DTYPE, buffer=shm.buf)
+        else:
+            values = np.empty(shape, dtype=cls.DTYPE)
+        values.fill(np.nan)
+        return cls(values, dates, tickers, shm=shm, owner=shared)
+
+    @classmethod
+    def from_series(cls, series_by_ticker, dates, shared=False):
+        """{종목: 종가 Series} 를 dates 열에 맞춰 행렬로 변환 (dates 에 없는 날짜는 버림)"""
+        matrix = cls.empty(series_by_ticker.keys(), dates, shared=shared)
+        for ticker, series in series_by_ticker.items():
+            matrix.fill(ticker, series)
+        return matrix
+
+    def fill(self, ticker, series):
+        """종목 행에 Series 값을 날짜 위치에 맞춰 기록"""
+        if series is None or series.empty:
+            return
+        positions = self.dates.get_indexer(series.index)
+        found = positions >= 0
+        self.values[self.rows[ticker], positions[found]] = series.to_numpy()[found]
+
+    def row(self, ticker):
+        return self.values[self.rows[ticker]]
+
+    def window(self, sessions):
+        """마지막 sessions 개 거래일 열 (복사 없는 view)"""
+        return self.values[:, -sessions:]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def handle(self):
+        """다른 프로세스에서 attach() 할 수 있는 pickle 가능한 정보 (공유 메모리 행렬만)"""
+        if self._shm is None:
+            raise ValueError("공유 메모리에 할당된 행렬이 아닙니다 (shared=True 로 생성)")
+        return {
+            'name': self._shm.name,
+            'shape': self.values.shape,
+            'dates': self.dates.asi8,
+            'tickers': self.tickers
+        }
+
+    @classmethod
+    def attach(cls, handle):
+        """handle() 로 넘겨받은 공유 메모리 행렬을 복사 없이 연결"""
+        shm = shared_memory.SharedMemory(name=handle['name'])
+        values = np.ndarray(handle['shape'], dtype=cls.DTYPE, buffer=shm.buf)
+        return cls(values, pd.to_datetime(handle['dates']), handle['tickers'], shm=shm)
+
+    def close(self):
+        """공유 메모리 연결 해제 (생성한 쪽이면 메모리도 반환)"""
+        if self._shm is None:
+            return
+        self.values = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,160 @@
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
+
+class ProfileUtil:
+    """리포트별 샘플링 프로파일러
+
+    백그라운드 스레드가 interval 마다 모든 스레드의 호출 스택을 채집하고,
+    MetricsUtil.report() 로 리포트가 지정된 스레드의 스택을 그 리포트에 누적한다
+    (파이프라인 단계, 텔레그램 전송 큐, 이미지 압축 스레드 모두 해당).
+    함수 호출마다 훅을 거는 cProfile 과 달리 실행 중인 코드에 손대지 않으므로
+    운영 실행에서 켜 두어도 부담이 적다. 리포트가 지정되지 않은 스레드는
+    UNLABELED 로 모은다.
+
+    write() 는 리포트마다 다음 파일을 남긴다.
+    - {report}.pstats: 샘플 수로 환산한 pstats (python -m pstats, snakeviz 등으로 확인)
+    - {report}.collapsed: flamegraph.pl / speedscope 용 collapsed stack
+    """
+    UNLABELED = 'unlabeled'
+    DEFAULT_INTERVAL = 0.01  # 샘플링 간격(초)
+    MAX_DEPTH = 128
+
+    def __init__(self, interval=None, profile_dir=None):
+        root_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent
+        self.interval = interval or float(os.getenv('PROFILE_INTERVAL', self.DEFAULT_INTERVAL))
+        self.profile_dir = Path(profile_dir) if profile_dir else root_dir / 'profiles'
+        self.logger = LoggerUtil().get_logger()
+        self.metrics = MetricsUtil()
+        self._stacks = {}  # 리포트 -> Counter[(프레임 키, ...)] (바깥 → 안쪽 순)
+        self._seconds = {}  # 리포트 -> Counter[(프레임 키, ...)] 누적 초
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _stack(frame, max_depth):
+        """프레임에서 (파일, 시작 줄, 함수명) 키 튜플을 바깥 호출부터 순서대로 반환"""
+        stack = []
+        while frame is not None and len(stack) < max_depth:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _sample(self, elapsed):
+        own = threading.get_ident()
+        reports = self.metrics.thread_reports()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            report = reports.get(ident, self.UNLABELED)
+            stack = self._stack(frame, self.MAX_DEPTH)
+            self._stacks.setdefault(report, Counter())[stack] += 1
+            self._seconds.setdefault(report, Counter())[stack] += elapsed
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+            self._thread.start()
+            self.logger.info(f"[프로파일] 샘플링 시작 (간격 {self.interval * 1000:.0f}ms)")
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @staticmethod
+    def _label(key):
+        filename, line, name = key
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def _pstats(self, report):
+        """샘플을 pstats 형식 {함수: (호출, 원시 호출, 자체 시간, 누적 시간, 호출자)}으로 환산
+
+        호출 횟수 자리에는 그 함수가 스택에 있던 샘플 수가 들어간다.
+        """
+        stats = {}
+        for stack, seconds in self._seconds[report].items():
+            samples = self._stacks[report][stack]
+            for depth, key in enumerate(stack):
+                calls, raw_calls, own, total, callers = stats.get(key, (0, 0, 0.0, 0.0, {}))
+                inclusive = key not in stack[:depth]  # 재귀 호출은 누적 시간을 한 번만 셈
+                stats[key] = (
+                    calls + samples if inclusive else calls,
+                    raw_calls + samples if inclusive else raw_calls,
+                    own + (seconds if depth == len(stack) - 1 else 0.0),
+                    total + (seconds if inclusive else 0.0),
+                    callers
+                )
+                if depth:
+                    caller = stack[depth - 1]
+                    c_calls, c_raw, c_own, c_total = callers.get(caller, (0, 0, 0.0, 0.0))
+                    callers[caller] = (c_calls + samples, c_raw + samples,
+                                       c_own + (seconds if depth == len(stack) - 1 else 0.0), c_total + seconds)
+        return stats
+
+    def summary(self, report, top=15):
+        """(누적 비율 상위 top 개 [(함수, 누적%, 자체%)], 전체 샘플 수)"""
+        stacks = self._stacks.get(report, Counter())
+        total = sum(stacks.values())
+        inclusive, own = Counter(), Counter()
+        for stack, samples in stacks.items():
+            for key in set(stack):
+                inclusive[key] += samples
+            own[stack[-1]] += samples
+        # 모든 샘플에 공통인 스레드 진입부(threading, 스레드 풀 등)는 제외
+        ranked = [(key, samples) for key, samples in inclusive.most_common()
+                  if samples < total or own[key]]
+        rows = [(self._label(key), samples / total * 100, own[key] / total * 100)
+                for key, samples in ranked[:top]]
+        return rows, total
+
+    def write(self, run, top=15):
+        """profiles/{run}/ 에 리포트별 pstats/collapsed 파일을 기록하고 상위 함수를 로그로 남김"""
+        self.stop()
+        output_dir = self.profile_dir / run
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            for report in sorted(self._stacks):
+                with open(output_dir / f"{report}.pstats", 'wb') as f:
+                    marshal.dump(self._pstats(report), f)
+                with open(output_dir / f"{report}.collapsed", 'w', encoding='utf-8') as f:
+                    for stack, samples in self._stacks[report].most_common():
+                        f.write(';'.join(self._label(key).replace(';', ':') for key in stack) + f" {samples}\n")
+        except Exception as e:
+            self.logger.warning(f"프로파일 기록 실패: {str(e)}")
+            return None
+
+        for report in sorted(self._stacks):
+            if report == self.UNLABELED:
+                continue
+            rows, total = self.summary(report, top)
+            lines = [f"[프로파일] {report}: 샘플 {total}개 (약 {total * self.interval:.1f}초), 누적 비율 상위 {len(rows)}개"]
+            lines += [f"  {inclusive:5.1f}% (자체 {own:5.1f}%) {label}" for label, inclusive, own in rows]
+            self.logger.info('\n'.join(lines))
+        self.logger.info(f"[프로파일] 기록 완료: {output_dir}")
+        return output_dir
@@ -0,0 +1,171 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
+
+class SlotTimeout(Exception):
+    """마감 시각까지 요청 순서가 돌아오지 않음"""
+    pass
+
+
+class AdaptiveLimiter:
+    """데이터 소스 하나의 요청 속도(초당 요청 수)를 AIMD 로 조절
+
+    응답이 정상이고 지연이 기준선 근처면 속도를 조금씩(가산) 올리고,
+    오류/타임아웃/빈 응답 또는 지연 급증이 보이면 절반으로(승산) 줄인다.
+    연속된 실패로 한꺼번에 여러 번 줄지 않도록 감소는 DECREASE_COOLDOWN 에 한 번만 한다.
+    """
+    INCREASE_STEP = 0.5  # 정상 응답이 이어질 때 초당 늘리는 요청 수
+    DECREASE_FACTOR = 0.5
+    DECREASE_COOLDOWN = 1.0  # 감소 후 다음 감소까지 최소 간격(초)
+    SLOW_FACTOR = 3.0  # 지연이 기준선의 이 배수를 넘으면 혼잡으로 판단
+    HOLD_FACTOR = 1.5  # 기준선의 이 배수를 넘으면 늘리지 않고 유지
+
+    def __init__(self, source, rate, min_rate, max_rate):
+        self.source = source
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.baseline = None  # 정상 응답 지연 기준선(초)
+        self._next_at = 0.0
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """다음 요청 시각까지 대기
+
+        deadline(time.monotonic 기준)까지 차례가 오지 않으면 SlotTimeout 을 던진다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            if deadline is not None and start_at >= deadline:
+                raise SlotTimeout(self.source)
+            self._next_at = start_at + 1.0 / self.rate
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    def release(self, latency, ok):
+        """요청 결과 반영 (ok=False 는 오류/타임아웃/빈 응답)"""
+        with self._lock:
+            if ok and self.baseline is None:
+                self.baseline = latency
+            slow = ok and latency > self.baseline * self.SLOW_FACTOR
+            if not ok or slow:
+                self._decrease(time.monotonic())
+            elif latency <= self.baseline * self.HOLD_FACTOR:
+                # 초당 INCREASE_STEP 만큼 늘도록 요청 1건당 step/rate 씩 증가
+                self.rate = min(self.max_rate, self.rate + self.INCREASE_STEP / self.rate)
+            if ok:
+                # 기준선은 느리게 따라가되 더 빠른 응답에는 바로 맞춤
+                self.baseline = min(latency, self.baseline * 0.95 + latency * 0.05)
+
+    def _decrease(self, now):
+        if now - self._decreased_at < self.DECREASE_COOLDOWN:
+            return
+        self._decreased_at = now
+        self.rate = max(self.min_rate, self.rate * self.DECREASE_FACTOR)
+        MetricsUtil().incr('rate_limit_decreases', source=self.source)
+
+    def state(self):
+        with self._lock:
+            return {'rate': round(self.rate, 3)}
+
+
+class RateLimitUtil:
+    """외부 데이터 요청의 소스별 적응형 한도 (AIMD), 실행 사이에 cache/rate_limits.json 으로 유지
+
+    고정 sleep 대신 FetchUtil 이 요청마다 slot() 을 거치며, 각 실행은 직전 실행이
+    끝났을 때의 속도에서 시작한다.
+    """
+    _instance = None
+    _initialized = False
+    # 소스별 (초기 초당 요청 수, 최소 속도, 최대 속도)
+    DEFAULTS = {
+        'pykrx': (5.0, 0.5, 50.0),
+        'naver': (5.0, 0.5, 20.0),
+        'dart': (5.0, 0.5, 15.0),
+    }
+    FALLBACK = (5.0, 0.5, 20.0)
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RateLimitUtil, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not RateLimitUtil._initialized:
+            root_dir = Path(os.getenv('STATE_DIR') or Path(os.path.dirname(os.path.abspath(__file__))).parent)
+            self.state_path = root_dir / 'cache' / 'rate_limits.json'
+            self.logger = LoggerUtil().get_logger()
+            self._lock = threading.Lock()
+            self._limiters = {}
+            self._saved = self._load()
+            atexit.register(self.save)
+            RateLimitUtil._initialized = True
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def limiter(self, source):
+        with self._lock:
+            if source not in self._limiters:
+                rate, min_rate, max_rate = self.DEFAULTS.get(source, self.FALLBACK)
+                saved = self._saved.get(source, {})
+                self._limiters[source] = AdaptiveLimiter(source, saved.get('rate', rate), min_rate, max_rate)
+                if saved:
+                    self.logger.info(f"[요청 한도] {source}: 이전 실행 값에서 시작 (초당 {saved['rate']:.1f}회)")
+            return self._limiters[source]
+
+    @contextmanager
+    def slot(self, source, deadline=None):
+        """요청 하나를 한도 안에서 실행 (블록에서 예외가 나면 실패로 반영)
+
+        블록 안에서 yield 된 dict 의 'ok' 를 False 로 바꾸면 빈 응답 등도 실패로 반영한다.
+        deadline 까지 차례가 오지 않으면 블록을 실행하지 않고 SlotTimeout 을 던진다.
+        """
+        limiter = self.limiter(source)
+        limiter.acquire(deadline)
+        outcome = {'ok': True}
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome['ok'] = False
+            raise
+        finally:
+            limiter.release(time.monotonic() - started, outcome['ok'])
+
+    def save(self):
+        """현재 소스별 속도를 기록 (다음 실행의 시작 값)"""
+        with self._lock:
+            states = {source: limiter.state() for source, limiter in self._limiters.items()}
+        if not states or all({key: self._saved.get(source, {}).get(key) for key in state} == state
+                             for source, state in states.items()):
+            return None
+        saved = dict(self._saved)
+        for source, state in states.items():
+            saved[source] = dict(state, updated_at=datetime.now().isoformat(timespec='seconds'))
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(saved, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            self.logger.warning(f"요청 한도 저장 실패: {str(e)}")
+            return None
+        self._saved = saved
+        self.logger.info("[요청 한도] " + ", ".join(
+            f"{source} 초당 {state['rate']:.1f}회" for source, state in states.items()))
+        return self.state_path
@@ -0,0 +1,192 @@
+import os
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.logger_util import LoggerUtil
+from utils.price_matrix_util import PriceMatrix
+
+class RollingPriceUtil:
+    """최근 SESSIONS 거래일 종가를 종목 × 거래일 행렬(PriceMatrix)로 유지하는 상태 저장소
+
+    매 거래일 advance() 로 하루치 종가만 덧붙이고 가장 오래된 거래일을 밀어내므로,
+    구간 첫 종가/마지막 종가로 계산하는 기간 수익률(RS 등)을 전체 구간 재조회 없이
+    종목 수에 비례하는 비용으로 갱신할 수 있다. 행 이름은 'stock:005930',
+    'index:1001' 형식이며 cache/rolling_prices.npz 에 저장해 다음 실행이 이어서 쓴다.
+    종목 행(matrix)은 float32, 지수 행(benchmarks)은 소수점 둘째 자리 종가를 그대로
+    유지하도록 float64 로 보관한다 (지수는 시장의 모든 종목 RS 에 공통으로 쓰임).
+    stale 은 전체 이력으로 다시 채워야 하는 행(새 종목, 과거 종가 수정)으로, put() 하면 빠진다.
+    """
+    SESSIONS = 120
+    CHANGE_TOLERANCE = 0.0001  # 등락률(소수점 둘째 자리 %) 반올림 오차를 넘는 차이면 과거 종가 수정 필요
+    INDEX_DTYPE = np.float64
+
+    def __init__(self, path=None, sessions=None):
+        self.path = Path(path) if path else self.default_path()
+        self.sessions = sessions or self.SESSIONS
+        self.matrix = None  # 종목 행 (float32)
+        self.benchmarks = None  # 지수 행 (float64), matrix 와 같은 날짜 열
+        self.stale = set()
+        self.logger = LoggerUtil().get_logger()
+        self._lock = threading.RLock()
+        if self.path.exists():
+            self.load()
+
+    @staticmethod
+    def default_path():
+        root_dir = Path(os.getenv('STATE_DIR') or Path(os.path.dirname(os.path.abspath(__file__))).parent)
+        return root_dir / 'cache' / 'rolling_prices.npz'
+
+    @staticmethod
+    def label(kind, code):
+        return f"{kind}:{code}"
+
+    @staticmethod
+    def _store(label):
+        """행 이름이 속한 행렬 속성 이름 (지수는 benchmarks, 종목은 matrix)"""
+        return 'benchmarks' if label.startswith('index:') else 'matrix'
+
+    @property
+    def lock(self):
+        """여러 스레드가 상태를 갱신할 때 함께 잡는 잠금 (재진입 가능)"""
+        return self._lock
+
+    @property
+    def last_session(self):
+        """상태에 반영된 마지막 거래일 (YYYYMMDD), 비어 있으면 None"""
+        if self.matrix is None or not len(self.matrix.dates):
+            return None
+        return self.matrix.dates[-1].strftime('%Y%m%d')
+
+    def load(self):
+        """저장된 상태 불러오기 (실패 시 빈 상태로 시작)"""
+        try:
+            with np.load(self.path, allow_pickle=False) as stored:
+                dates = pd.to_datetime(stored['dates'])
+                self.matrix = PriceMatrix(stored['values'], dates, stored['labels'].tolist())
+                self.benchmarks = PriceMatrix(stored['index_values'], dates, stored['index_labels'].tolist())
+                self.stale = set(stored['stale'].tolist())
+        except Exception as e:
+            self.logger.warning(f"종가 상태 로드 실패, 다시 구성: {str(e)}")
+            self.matrix = None
+            self.benchmarks = None
+            self.stale = set()
+            return
+        self.logger.info(f"종가 상태 로드: {len(self.matrix.tickers) + len(self.benchmarks.tickers)}건 ({self.last_session}까지)")
+
+    def save(self):
+        """현재 상태를 원자적으로 기록"""
+        with self._lock:
+            if self.matrix is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, values=self.matrix.values, dates=self.matrix.dates.asi8,
+                         labels=np.array(self.matrix.tickers, dtype=str),
+                         index_values=self.benchmarks.values,
+                         index_labels=np.array(self.benchmarks.tickers, dtype=str),
+                         stale=np.array(sorted(self.stale), dtype=str))
+            os.replace(tmp_path, self.path)
+
+    def reset(self, dates):
+        """dates(마지막 SESSIONS 개만 사용) 열로 빈 상태 구성"""
+        with self._lock:
+            dates = pd.DatetimeIndex(dates)[-self.sessions:]
+            self.matrix = PriceMatrix.empty([], dates)
+            self.benchmarks = PriceMatrix(np.empty((0, len(dates)), dtype=self.INDEX_DTYPE), dates, [])
+            self.stale = set()
+
+    def _add_rows(self, store, labels):
+        matrix = getattr(self, store)
+        labels = [label for label in dict.fromkeys(labels) if label not in matrix.rows]
+        if not labels:
+            return
+        added = np.full((len(labels), len(matrix.dates)), np.nan, dtype=matrix.values.dtype)
+        setattr(self, store, PriceMatrix(np.vstack([matrix.values, added]), matrix.dates, matrix.tickers + labels))
+
+    def put(self, label, series):
+        """행을 series 의 종가로 다시 채움 (없으면 추가)"""
+        with self._lock:
+            store = self._store(label)
+            self._add_rows(store, [label])
+            matrix = getattr(self, store)
+            matrix.values[matrix.rows[label]] = np.nan
+            matrix.fill(label, series)
+            self.stale.discard(label)
+
+    def put_matrix(self, matrix):
+        """같은 날짜 열을 가진 종목 PriceMatrix 의 행들을 한 번에 반영"""
+        with self._lock:
+            self._add_rows('matrix', matrix.tickers)
+            rows = [self.matrix.rows[label] for label in matrix.tickers]
+            positions = self.matrix.dates.get_indexer(matrix.dates)
+            found = positions >= 0
+            self.matrix.values[rows] = np.nan
+            self.matrix.values[np.ix_(rows, positions[found])] = matrix.values[:, found]
+            self.stale.difference_update(matrix.tickers)
+
+    def _roll(self, store, timestamp, closes):
+        """store 행렬에 timestamp 열을 덧붙이고 가장 오래된 열을 밀어냄
+
+        closes 순서대로 (이미 있던 행 여부, 직전 거래일 종가) 를 반환한다.
+        """
+        matrix = getattr(self, store)
+        known = len(matrix.tickers)
+        last = matrix.values[:, -1].astype(np.float64)
+        self._add_rows(store, closes.index)
+        matrix = getattr(self, store)
+
+        keep = min(len(matrix.dates), self.sessions - 1)
+        dates = matrix.dates[len(matrix.dates) - keep:].append(pd.DatetimeIndex([timestamp]))
+        values = np.full((len(matrix.tickers), keep + 1), np.nan, dtype=matrix.values.dtype)
+        if keep:
+            values[:, :keep] = matrix.values[:, -keep:]
+        rows = np.array([matrix.rows[label] for label in closes.index], dtype=int)
+        values[rows, -1] = closes.to_numpy(dtype=np.float64)
+        setattr(self, store, PriceMatrix(values, dates, matrix.tickers))
+        old = rows < known
+        previous = np.full(len(rows), np.nan)
+        previous[old] = last[rows[old]]
+        return old, previous
+
+    def advance(self, date, closes, changes=None):
+        """date(YYYYMMDD) 하루치 종가 Series(행 이름 → 종가)를 덧붙이고 가장 오래된 거래일을 밀어냄
+
+        changes(행 이름 → 등락률 %)가 주어지면 직전 종가 대비 수익률과 비교한다.
+        새로 생긴 행과 등락률이 맞지 않는 행(액면분할 등으로 과거 종가가 수정된
+        종목)은 stale 에 추가되며, 호출한 쪽은 이 행들을 전체 이력으로 put() 해야 한다.
+        """
+        with self._lock:
+            timestamp = pd.Timestamp(date)
+            if self.matrix.dates[-1] == timestamp:
+                return self.stale
+            is_index = closes.index.str.startswith('index:')
+            stale = set()
+            for store, part in [('matrix', closes[~is_index]), ('benchmarks', closes[is_index])]:
+                old, previous = self._roll(store, timestamp, part)
+                stale.update(part.index[~old])
+                if changes is None or not len(part):
+                    continue
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    actual = part.to_numpy(dtype=np.float64) / previous - 1
+                expected = changes.reindex(part.index).to_numpy(dtype=np.float64) / 100
+                # 등락률이 없는 행(지수)이나 직전 종가가 없는 행은 비교하지 않음
+                mismatch = ~(np.abs(actual - expected) <= self.CHANGE_TOLERANCE) & (previous > 0) & ~np.isnan(expected)
+                stale.update(part.index[old & mismatch])
+            self.stale.update(stale)
+            return self.stale
+
+    def values(self, labels):
+        """labels 행의 종가 배열 (상태에 없는 행은 NaN)
+
+        labels 는 같은 종류(종목 또는 지수)여야 하며, 종목은 float32, 지수는 float64 배열이다.
+        """
+        with self._lock:
+            matrix = getattr(self, self._store(labels[0])) if labels else self.matrix
+            rows = [matrix.rows.get(label, -1) for label in labels]
+            values = np.full((len(rows), len(matrix.dates)), np.nan, dtype=matrix.values.dtype)
+            found = np.array([row >= 0 for row in rows], dtype=bool)
+            if found.any():
+                values[found] = matrix.values[[row for row in rows if row >= 0]]
+            return values
@@ -1,80 +1,246 @@
 import os
-from urllib.request import urlopen
-import urllib.parse
+import hashlib
+import random
+import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import json
+from utils.logger_util import LoggerUtil
+from utils.metrics_util import MetricsUtil
 
 load_dotenv()
 
 class TelegramUtil:
+    MEDIA_GROUP_LIMIT = 10  # 텔레그램 미디어 그룹 최대 사진 수
+    CHAT_MIN_INTERVAL = 1.0  # 같은 채팅방 요청 간 최소 간격(초)
+    MAX_RETRY_AFTER = 3  # 429 응답 재시도 횟수
+    MAX_RETRIES = 3  # 5xx/비정상 응답/연결 오류 재시도 횟수
+    BACKOFF_BASE = 1.0  # 재시도 대기 기본값(초), 시도마다 2배
+    BACKOFF_MAX = 20.0
+    TIMEOUT = (5, 60)  # (연결, 읽기) 타임아웃(초)
+
+    # 모든 인스턴스가 연결 풀, 채팅방별 전송 시각, 전송 큐를 공유
+    _session = None
+    _session_lock = threading.Lock()
+    _chat_locks = {}
+    _chat_last_sent = {}
+    _file_id_cache = {}  # 이미지 해시 -> 업로드된 file_id (실행 중 재사용)
+    _delivery_executor = None
+    _pending = []
+
     def __init__(self):
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
         self.chat_test_id = os.getenv('TELEGRAM_CHAT_TEST_ID')
 
+    @classmethod
+    def _get_session(cls):
+        with cls._session_lock:
+            if cls._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+                session.mount('https://', adapter)
+                cls._session = session
+            return cls._session
+
+    @classmethod
+    def _chat_lock(cls, chat_id):
+        with cls._session_lock:
+            return cls._chat_locks.setdefault(chat_id, threading.Lock())
+
+    def _request(self, method, chat_id, data, files=None):
+        """채팅방별 전송 간격을 지키며 API 호출
+
+        429 응답은 retry_after 만큼 대기 후 재시도하고, 5xx/JSON 이 아닌 응답(프록시 오류 페이지 등)과
+        연결 오류는 지수 백오프 + 지터로 재시도한다. 재시도 후에도 실패하면 ok=False 응답을 반환한다.
+        """
+        url = f"https://api.telegram.org/bot{self.bot_token}/{method}"
+        data = dict(data, chat_id=chat_id)
+        rate_limited, failures = 0, 0
+
+        with self._chat_lock(chat_id):
+            while True:
+                elapsed = time.monotonic() - self._chat_last_sent.get(chat_id, 0)
+                if elapsed < self.CHAT_MIN_INTERVAL:
+                    time.sleep(self.CHAT_MIN_INTERVAL - elapsed)
+
+                try:
+                    with MetricsUtil().span(f'telegram.{method}'):
+                        response = self._get_session().post(url, data=data, files=files, timeout=self.TIMEOUT)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    result, reason = None, f"연결 오류: {str(e)}"
+                else:
+                    try:
+                        result, reason = response.json(), f"HTTP {response.status_code}"
+                    except ValueError:
+                        result, reason = None, f"JSON 이 아닌 응답 (HTTP {response.status_code})"
+                finally:
+                    self._chat_last_sent[chat_id] = time.monotonic()
+
+                if result is not None and response.status_code == 429:
+                    if rate_limited == self.MAX_RETRY_AFTER:
+                        return result
+                    rate_limited += 1
+                    delay = result.get('parameters', {}).get('retry_after', 5)
+                elif result is not None and response.status_code < 500:
+                    return result
+                else:
+                    if failures == self.MAX_RETRIES:
+                        return result if result is not None else {'ok': False, 'description': f"텔레그램 {method} 실패: {reason}"}
+                    failures += 1
+                    delay = random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** (failures - 1))))  # full jitter
+                    LoggerUtil().get_logger().warning(
+                        f"텔레그램 {method} 재시도 {failures}/{self.MAX_RETRIES} ({delay:.1f}초 후): {reason}")
+                MetricsUtil().incr('retries', function='TelegramUtil._request')
+                time.sleep(delay)
+
     def send_message(self, message):
         """일반 메시지 전송"""
-        message = urllib.parse.quote_plus(message)
-        urlopen(f"https://api.telegram.org/bot{self.bot_token}/sendMessage?chat_id={self.chat_id}&parse_mode=html&text={message}")
+        return self._request('sendMessage', self.chat_id, {'parse_mode': 'html', 'text': message})
 
     def send_photo(self, photo_path, caption=""):
         """이미지 전송"""
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendPhoto"
-        
-        with open(photo_path, 'rb') as photo:
-            payload = {
-                "chat_id": self.chat_id,
-                "caption": caption,
-                "parse_mode": "html"
-            }
-            files = {
-                "photo": photo
-            }
-            response = requests.post(url, data=payload, files=files)
-        
-        return response.json()
+        return self._send_photos_to_chat(self.chat_id, [self._read_photo(photo_path)], caption)
 
     def send_test_message(self, message):
         """테스트용 채팅방으로 메시지 전송"""
-        message = urllib.parse.quote_plus(message)
-        urlopen(f"https://api.telegram.org/bot{self.bot_token}/sendMessage?chat_id={self.chat_test_id}&parse_mode=html&text={message}") 
-    
-    def send_multiple_photo(self, photo_paths, caption=""):
-        """여러 장의 이미지 한 번에 전송"""
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMediaGroup"
-        
-        media = []
-        files = {}
-        
-        # 각 이미지에 대한 미디어 객체 생성
-        for index, photo_path in enumerate(photo_paths):
-            # 첫 번째 이미지에만 캡션 추가
-            media_caption = caption if index == 0 else ""
-            
-            media.append({
-                'type': 'photo',
-                'media': f'attach://photo{index}',
-                'caption': media_caption,
-                'parse_mode': 'html'
-            })
-            
-            files[f'photo{index}'] = open(photo_path, 'rb')
-        
-        try:
-            payload = {
-                'chat_id': self.chat_id,
-                'media': json.dumps(media)
-            }
-            
-            response = requests.post(url, data=payload, files=files)
-            for file in files.values():
-                file.close()
-            
-            return response.json()
-            
-        except Exception as e:
-            # 에러 발생시에도 파일들을 확실히 닫아줌
-            for file in files.values():
-                file.close()
-            raise e 
\ No newline at end of file
+        return self._request('sendMessage', self.chat_test_id, {'parse_mode': 'html', 'text': message})
+
+    @staticmethod
+    def _read_photo(photo):
+        """파일 경로 또는 메모리 이미지 아티팩트를 (파일명, 바이트, MIME 타입, 해시)로 변환"""
+        if isinstance(photo, (str, os.PathLike)):
+            with open(photo, 'rb') as f:
+                name, data, mime_type = os.path.basename(photo), f.read(), None
+        else:
+            # 메모리에 보관된 렌더링 결과를 디스크를 거치지 않고 그대로 전송
+            name, data, mime_type = photo.name, photo.data, photo.mime_type
+        return name, data, mime_type, hashlib.sha1(data).hexdigest()
+
+    def _chunk_photos(self, photos):
+        """미디어 그룹 제한(10장)에 맞춰 균등하게 분할 (1장짜리 묶음이 생기지 않도록)"""
+        chunk_count = -(-len(photos) // self.MEDIA_GROUP_LIMIT)
+        chunk_size = -(-len(photos) // chunk_count)
+        return [photos[i:i + chunk_size] for i in range(0, len(photos), chunk_size)]
+
+    def delivery_chat_ids(self):
+        """리포트를 받을 채팅방 목록 (기본 채팅방 + TELEGRAM_EXTRA_CHAT_IDS)"""
+        extra = os.getenv('TELEGRAM_EXTRA_CHAT_IDS', '')
+        chat_ids = [self.chat_id] + [chat_id.strip() for chat_id in extra.split(',') if chat_id.strip()]
+        return list(dict.fromkeys(chat_ids))
+
+    @staticmethod
+    def _photo_file_id(message):
+        """전송된 메시지에서 가장 큰 해상도 사진의 file_id 추출"""
+        sizes = message.get('photo') or []
+        return sizes[-1]['file_id'] if sizes else None
+
+    def _photo_source(self, photo, files, key):
+        """이미 업로드된 사진은 file_id, 아니면 첨부 파일로 전송할 값 반환"""
+        name, data, mime_type, digest = photo
+        file_id = self._file_id_cache.get(digest)
+        if file_id:
+            MetricsUtil().incr('cache_hits', cache='telegram_file_id')
+            return file_id
+        MetricsUtil().incr('cache_misses', cache='telegram_file_id')
+        MetricsUtil().incr('upload_bytes', len(data), target='telegram')
+        files[key] = (name, data, mime_type)
+        return f'attach://{key}'
+
+    def _send_photos_to_chat(self, chat_id, photos, caption):
+        """한 채팅방에 사진 전송 (업로드한 사진의 file_id는 캐시에 보관)"""
+        messages = []
+        for chunk_index, chunk in enumerate(self._chunk_photos(photos)):
+            chunk_caption = caption if chunk_index == 0 else ""
+            files = {}
+
+            if len(chunk) == 1:
+                payload = {'caption': chunk_caption, 'parse_mode': 'html'}
+                source = self._photo_source(chunk[0], files, 'photo')
+                if not files:
+                    payload['photo'] = source
+                result = self._request('sendPhoto', chat_id, payload, files=files or None)
+            else:
+                media = []
+                # 각 이미지에 대한 미디어 객체 생성
+                for index, photo in enumerate(chunk):
+                    # 첫 번째 이미지에만 캡션 추가
+                    media.append({
+                        'type': 'photo',
+                        'media': self._photo_source(photo, files, f'photo{index}'),
+                        'caption': chunk_caption if index == 0 else "",
+                        'parse_mode': 'html'
+                    })
+                result = self._request('sendMediaGroup', chat_id, {'media': json.dumps(media)}, files=files or None)
+
+            if not result.get('ok'):
+                return result
+
+            sent = result['result'] if isinstance(result['result'], list) else [result['result']]
+            for photo, message in zip(chunk, sent):
+                file_id = self._photo_file_id(message)
+                if file_id:
+                    self._file_id_cache.setdefault(photo[3], file_id)
+            messages.extend(sent)
+
+        return {'ok': True, 'result': messages}
+
+    def send_multiple_photo(self, photo_paths, caption="", chat_ids=None):
+        """여러 장의 이미지 한 번에 전송 (파일 경로 또는 메모리 이미지 아티팩트)
+
+        10장을 넘으면 여러 미디어 그룹으로 나눠 보내며 캡션은 첫 이미지에만 붙인다.
+        첫 채팅방에만 실제 이미지를 업로드하고, 나머지 채팅방에는 응답으로 받은
+        file_id로 전송하므로 채팅방 수와 관계없이 이미지당 업로드는 1회다.
+        모든 채팅방 전송이 성공하면 첫 채팅방의 메시지 목록을 result로 반환한다.
+        """
+        photos = [self._read_photo(photo) for photo in photo_paths]
+        if not photos:
+            return {'ok': False, 'description': '전송할 이미지가 없습니다.'}
+
+        first_result = None
+        for chat_id in chat_ids or self.delivery_chat_ids():
+            result = self._send_photos_to_chat(chat_id, photos, caption)
+            if not result.get('ok'):
+                return result
+            first_result = first_result or result
+
+        return first_result
+
+    @classmethod
+    def submit(cls, func, *args, **kwargs):
+        """전송 작업을 백그라운드 전송 큐에 넣고 Future 반환
+
+        리포트 생성 스레드는 업로드 완료를 기다리지 않고 다음 작업을 진행한다.
+        """
+        with cls._session_lock:
+            # 여러 리포트 스레드가 동시에 처음 제출해도 전송 큐(스레드 1개)는 하나만 생성
+            if cls._delivery_executor is None:
+                cls._delivery_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='telegram')
+        # 전송 큐 스레드에서도 제출한 리포트 기준으로 메트릭을 기록
+        report = MetricsUtil().current_report()
+        def run():
+            with MetricsUtil().report(report):
+                return func(*args, **kwargs)
+        future = cls._delivery_executor.submit(run)
+        cls._pending.append(future)
+        return future
+
+    @classmethod
+    def wait_deliveries(cls):
+        """전송 큐에 남은 작업이 모두 끝날 때까지 대기"""
+        while cls._pending:
+            future = cls._pending.pop(0)
+            try:
+                future.result()
+            except Exception:
+                # 개별 작업의 오류 처리는 작업 내부에서 수행
+                pass
+
+    @classmethod
+    def clear_file_ids(cls):
+        """업로드한 이미지의 file_id 캐시 비우기 (실행이 끝날 때마다 호출해 데몬에서 쌓이지 않게 함)"""
+        with cls._session_lock:
+            cls._file_id_cache.clear()